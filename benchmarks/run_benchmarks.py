@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+"""
+Benchmarks the Wyre client and integration hot paths against the fake Wyre
+and Horizon servers, at several concurrency levels::
+
+    python benchmarks/run_benchmarks.py --concurrency 1 4 16 --output results.json
+
+Each scenario reports its throughput and p50/p95/p99 latencies. The results,
+with the options used, are written as JSON so runs can be compared.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stellar_sdk import Keypair  # noqa: E402
+
+import polaris_wyre  # noqa: E402
+from polaris_wyre.testing.benchmark import run_benchmark  # noqa: E402
+from polaris_wyre.testing.fake_horizon import (  # noqa: E402
+    FakeHorizonServer,
+    FakeHorizonSettings,
+)
+from polaris_wyre.testing.fake_wyre import (  # noqa: E402
+    FakeWyreServer,
+    FakeWyreSettings,
+)
+from polaris_wyre.wyre.dtos import TransferData  # noqa: E402
+from polaris_wyre.wyre.polling import PollingPolicy  # noqa: E402
+
+SCENARIOS = (
+    "wyre_api.get_account",
+    "wyre.get_account",
+    "wyre.get_account_uncached",
+    "wyre.get_stellar_transaction_id",
+    "integration.submit_deposit_transaction",
+)
+
+
+def configure_django(horizon_url: str, database: str) -> None:
+    import django
+    from django.conf import settings
+
+    options = {"timeout": 60}
+    if django.VERSION >= (5, 1):
+        # Concurrent deposits would otherwise deadlock upgrading their SQLite
+        # read transactions to write transactions.
+        options["transaction_mode"] = "IMMEDIATE"
+    settings.configure(
+        SECRET_KEY="benchmarks",
+        MIDDLEWARE=(
+            "corsheaders.middleware.CorsMiddleware",
+            "django.contrib.sessions.middleware.SessionMiddleware",
+        ),
+        INSTALLED_APPS=(
+            "django.contrib.auth",
+            "django.contrib.contenttypes",
+            "django.contrib.sessions",
+            "polaris",
+            "polaris_wyre",
+        ),
+        DATABASES={
+            "default": {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": database,
+                "OPTIONS": options,
+            }
+        },
+        SESSION_COOKIE_SECURE=True,
+        POLARIS_ACTIVE_SEPS=["sep-24"],
+        POLARIS_SIGNING_SEED=Keypair.random().secret,
+        POLARIS_SERVER_JWT_KEY="benchmarks",
+        POLARIS_HOST_URL="https://example.com/",
+        POLARIS_HORIZON_URI=horizon_url,
+    )
+    django.setup()
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+
+def transfer_data() -> TransferData:
+    return TransferData(
+        currency="USDC",
+        amount=Decimal("100"),
+        destination=f"stellar:{Keypair.random().public_key}",
+    )
+
+
+def build_scenario(name: str, wyre_url: str, polling_policy: PollingPolicy):
+    """
+    :return: Returns the operation, setup and thread teardown of the scenario.
+    """
+    from polaris_wyre.wyre import Wyre
+    from polaris_wyre.wyre.wyre import parse_deposit_address
+
+    wyre = Wyre(
+        api_token="token",
+        account_id="AC_BENCHMARK",
+        api_url=wyre_url,
+        polling_policy=polling_policy,
+    )
+    if name == "wyre_api.get_account":
+        return wyre.wyre_api.get_account, None, None
+    if name == "wyre.get_account":
+        return wyre.get_account, None, None
+    if name == "wyre.get_account_uncached":
+        return (
+            lambda: tuple(parse_deposit_address(wyre.wyre_api.get_account())),
+            None,
+            None,
+        )
+    if name == "wyre.get_stellar_transaction_id":
+        return (
+            wyre.get_stellar_transaction_id,
+            lambda: wyre.create_transfer(transfer_data()),
+            None,
+        )
+    if name == "integration.submit_deposit_transaction":
+        from django.db import connections
+        from polaris.models import Asset, Transaction
+
+        from polaris_wyre.wyre.integration import WyreIntegration
+
+        integration = WyreIntegration(
+            api_token="token",
+            account_id="AC_BENCHMARK",
+            api_url=wyre_url,
+            polling_policy=polling_policy,
+        )
+        asset, _ = Asset.objects.get_or_create(
+            code="USDC",
+            defaults={"issuer": Keypair.random().public_key, "significant_decimals": 2},
+        )
+
+        def create_transaction() -> Transaction:
+            account = Keypair.random().public_key
+            return Transaction.objects.create(
+                asset=asset,
+                kind=Transaction.KIND.deposit,
+                stellar_account=account,
+                to_address=account,
+                amount_in=Decimal("100"),
+                amount_fee=Decimal("1"),
+            )
+
+        return (
+            integration.submit_deposit_transaction,
+            create_transaction,
+            connections.close_all,
+        )
+    raise ValueError(f"Unknown scenario {name}.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        choices=SCENARIOS,
+        default=list(SCENARIOS),
+        help="The scenarios to run, all of them by default.",
+    )
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument(
+        "--iterations", type=int, default=200, help="Operations per run."
+    )
+    parser.add_argument(
+        "--wyre-latency", type=float, default=0.0, help="Fake Wyre latency."
+    )
+    parser.add_argument(
+        "--horizon-latency", type=float, default=0.0, help="Fake Horizon latency."
+    )
+    parser.add_argument(
+        "--completion-delay",
+        type=float,
+        default=0.05,
+        help="Seconds until fake Wyre transfers complete.",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=0.01,
+        help="Initial interval between transfer status polls.",
+    )
+    parser.add_argument("--output", help="The JSON file the results are written to.")
+    options = parser.parse_args(argv)
+
+    wyre_server = FakeWyreServer(
+        FakeWyreSettings(
+            latency=options.wyre_latency, completion_delay=options.completion_delay
+        )
+    )
+    horizon_server = FakeHorizonServer(
+        FakeHorizonSettings(latency=options.horizon_latency)
+    )
+    polling_policy = PollingPolicy(
+        initial_delay=options.poll_interval, jitter=0, deadline=60
+    )
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory, wyre_server, horizon_server:
+        configure_django(horizon_server.url, os.path.join(directory, "db.sqlite3"))
+        for name in options.scenario:
+            for concurrency in options.concurrency:
+                operation, setup, teardown = build_scenario(
+                    name, wyre_server.url, polling_policy
+                )
+                summary = run_benchmark(
+                    operation,
+                    concurrency=concurrency,
+                    iterations=options.iterations,
+                    setup=setup,
+                    thread_teardown=teardown,
+                )
+                results.append(
+                    {"scenario": name, "concurrency": concurrency, **summary}
+                )
+                print(
+                    f"{name:42} c={concurrency:<4} {summary['throughput']:>10.1f} op/s"
+                    f"  p50={summary['p50_ms']:.2f}ms p95={summary['p95_ms']:.2f}ms"
+                    f"  p99={summary['p99_ms']:.2f}ms errors={summary['errors']}",
+                    flush=True,
+                )
+
+    report = {
+        "version": polaris_wyre.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "options": vars(options),
+        "results": results,
+    }
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,4 @@ from django.apps import AppConfig
 class PolarisWyre(AppConfig):
     name = "polaris_wyre"
     verbose_name = "Django Polaris Wyre"
+    default_auto_field = "django.db.models.AutoField"
@@ -1,5 +1,82 @@
+from typing import Optional
+
 from requests.exceptions import HTTPError
 
 
 class WyreAPIError(HTTPError):
     pass
+
+
+class WyreTransferTimeoutError(TimeoutError):
+    def __init__(self, transfer_id: str, polls: int, elapsed: float):
+        self.transfer_id = transfer_id
+        self.polls = polls
+        self.elapsed = elapsed
+        super().__init__(
+            f"Wyre transfer {transfer_id} did not complete after {polls} polls "
+            f"in {elapsed:.2f} seconds."
+        )
+
+
+class WyreTransferFailedError(RuntimeError):
+    """
+    Raised when Wyre reports that a transfer failed.
+    """
+
+    def __init__(
+        self,
+        transfer_id: Optional[str],
+        status: str = "FAILED",
+        failure_reason: Optional[str] = None,
+    ):
+        self.transfer_id = transfer_id
+        self.status = status
+        self.failure_reason = failure_reason
+        message = f"Wyre failed to complete transfer {transfer_id} ({status})"
+        if failure_reason:
+            message += f": {failure_reason}"
+        super().__init__(f"{message}.")
+
+
+class WyreTransferInProgressError(Exception):
+    """
+    Raised for a transaction whose Wyre transfer is being created by another
+    submission.
+    """
+
+    def __init__(self, transaction_id):
+        self.transaction_id = transaction_id
+        super().__init__(
+            f"The Wyre transfer of transaction {transaction_id} is being created "
+            "by another submission."
+        )
+
+
+class WyreCircuitOpenError(Exception):
+    """
+    Raised instead of sending a request while the circuit of its Wyre
+    endpoint is open, so the caller can defer its work right away.
+    """
+
+    def __init__(self, endpoint: str, retry_after: float):
+        self.endpoint = endpoint
+        self.retry_after = max(retry_after, 0.0)
+        super().__init__(
+            f"Wyre {endpoint} circuit is open, retry in {self.retry_after:.1f} seconds."
+        )
+
+
+class WyreInsufficientBalanceError(Exception):
+    """
+    Raised instead of creating a transfer that no Wyre account has the
+    available balance to cover.
+    """
+
+    def __init__(self, currency: str, amount, available):
+        self.currency = currency
+        self.amount = amount
+        self.available = available
+        super().__init__(
+            f"Insufficient {currency} balance for a transfer of {amount}, "
+            f"{available} available."
+        )
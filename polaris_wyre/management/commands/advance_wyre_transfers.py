@@ -0,0 +1,92 @@
+import time
+
+from django.core.management import BaseCommand, CommandError
+from polaris import integrations
+
+from polaris_wyre.wyre.integration import WyreIntegration
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_CONCURRENCY = 8
+DEFAULT_INTERVAL = 1.0
+DEFAULT_LEASE = 60.0
+
+
+class Command(BaseCommand):
+    """
+    Advances the Wyre transfers submitted with deferred settlement, polling
+    those whose next poll is due and settling their Polaris transactions
+    once Wyre completes or fails them. Several instances can run at once,
+    each claiming its own batches.
+
+    **Optional arguments:**
+
+        --batch-size BATCH_SIZE
+                              The number of transfers advanced at a time.
+        --concurrency CONCURRENCY
+                              The maximum number of concurrent Horizon requests.
+        --interval INTERVAL   The seconds waited when no batch was full.
+        --lease LEASE         The seconds a batch is claimed for.
+        --once                Advance a single batch and exit.
+    """
+
+    help = "Advances the Wyre transfers submitted with deferred settlement."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="The number of transfers advanced at a time.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help="The maximum number of concurrent Horizon requests.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=DEFAULT_INTERVAL,
+            help="The seconds waited when no batch was full.",
+        )
+        parser.add_argument(
+            "--lease",
+            type=float,
+            default=DEFAULT_LEASE,
+            help="The seconds a batch is claimed for.",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Advance a single batch and exit."
+        )
+
+    def handle(self, *_args, **options):
+        integration = integrations.registered_custody_integration
+        if not isinstance(integration, WyreIntegration):
+            raise CommandError("The registered custody integration is not Wyre's.")
+        if options["batch_size"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--batch-size and --concurrency must be positive.")
+
+        try:
+            while True:
+                outcomes = integration.advance_transfers(
+                    batch_size=options["batch_size"],
+                    max_concurrency=options["concurrency"],
+                    lease=options["lease"],
+                )
+                if outcomes:
+                    self.stderr.write(
+                        "Advanced "
+                        + ", ".join(
+                            f"{count} {outcome}"
+                            for outcome, count in sorted(outcomes.items())
+                        )
+                        + " transfers."
+                    )
+                if options["once"]:
+                    break
+                # A full batch means more transfers may be due already.
+                if sum(outcomes.values()) < options["batch_size"]:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
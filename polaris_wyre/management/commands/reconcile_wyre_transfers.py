@@ -0,0 +1,277 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Union
+
+from django.core.management import BaseCommand, CommandError
+from django.db.models import Q
+from polaris import integrations
+from polaris.models import Transaction
+from requests.exceptions import RequestException
+
+from polaris_wyre.helpers.exceptions import WyreAPIError, WyreCircuitOpenError
+from polaris_wyre.models import WyreTransfer
+from polaris_wyre.wyre.integration import WyreIntegration
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_CONCURRENCY = 8
+
+
+class Command(BaseCommand):
+    """
+    Reconciles Polaris transactions against their Wyre transfers, writing a
+    JSON line for each transaction that doesn't match.
+
+    Completed deposits and transactions with a Wyre transfer are streamed in
+    chunks ordered by id, so memory use doesn't grow with the table. The
+    transfers of each chunk are requested from Wyre concurrently. With
+    ``--checkpoint``, the last reconciled id is saved after each chunk and
+    the next run resumes after it.
+
+    **Optional arguments:**
+
+        --chunk-size CHUNK_SIZE
+                              The number of transactions reconciled at a time.
+        --concurrency CONCURRENCY
+                              The maximum number of concurrent Wyre requests.
+        --output OUTPUT       The file the report is appended to. Defaults to
+                              stdout.
+        --checkpoint CHECKPOINT
+                              The file keeping the progress of the run.
+        --restart             Ignore the checkpoint and start from the beginning.
+    """
+
+    help = "Reconciles Polaris transactions against their Wyre transfers."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="The number of transactions reconciled at a time.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help="The maximum number of concurrent Wyre requests.",
+        )
+        parser.add_argument("--output", help="The file the report is appended to.")
+        parser.add_argument(
+            "--checkpoint", help="The file keeping the progress of the run."
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint and start from the beginning.",
+        )
+
+    def handle(self, *_args, **options):
+        integration = integrations.registered_custody_integration
+        if not isinstance(integration, WyreIntegration):
+            raise CommandError("The registered custody integration is not Wyre's.")
+        self.accounts = integration.accounts
+
+        checkpoint_path = options.get("checkpoint")
+        progress = {"last_transaction_id": None, "processed": 0, "mismatched": 0}
+        if checkpoint_path and not options["restart"]:
+            progress.update(self.read_checkpoint(checkpoint_path))
+
+        output = open(options["output"], "a") if options.get("output") else None
+        report = output or self.stdout
+        try:
+            with ThreadPoolExecutor(
+                max_workers=options["concurrency"],
+                thread_name_prefix="wyre-reconcile",
+            ) as executor:
+                transactions = self.get_transactions(
+                    progress["last_transaction_id"], options["chunk_size"]
+                )
+                for chunk in chunked(transactions, options["chunk_size"]):
+                    for line in self.reconcile(chunk, executor):
+                        report.write(json.dumps(line) + "\n")
+                        progress["mismatched"] += 1
+                    if output is not None:
+                        output.flush()
+                    progress["last_transaction_id"] = str(chunk[-1].id)
+                    progress["processed"] += len(chunk)
+                    if checkpoint_path:
+                        self.write_checkpoint(checkpoint_path, progress)
+        finally:
+            if output is not None:
+                output.close()
+
+        self.stderr.write(
+            f"Reconciled {progress['processed']} transactions, "
+            f"{progress['mismatched']} mismatched."
+        )
+
+    @staticmethod
+    def get_transactions(
+        after: Optional[str], chunk_size: int
+    ) -> Iterable[Transaction]:
+        queryset = Transaction.objects.filter(
+            Q(kind=Transaction.KIND.deposit, status=Transaction.STATUS.completed)
+            | Q(pk__in=WyreTransfer.objects.values("transaction_id"))
+        )
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        return (
+            queryset.order_by("pk")
+            .only("id", "status", "stellar_transaction_id")
+            .iterator(chunk_size=chunk_size)
+        )
+
+    def reconcile(
+        self, transactions: List[Transaction], executor: ThreadPoolExecutor
+    ) -> Iterable[dict]:
+        """
+        Compares each transaction of the chunk with its latest Wyre transfer,
+        as recorded locally and as returned by Wyre.
+
+        :return: Yields a report line for each transaction that doesn't match.
+        """
+        wyre_transfers: Dict[str, WyreTransfer] = {}
+        for wyre_transfer in (
+            WyreTransfer.objects.filter(transaction__in=transactions)
+            .exclude(transfer_id=None)
+            .order_by("created_at", "pk")
+        ):
+            wyre_transfers[str(wyre_transfer.transaction_id)] = wyre_transfer
+
+        transfer_ids = [
+            wyre_transfer.transfer_id for wyre_transfer in wyre_transfers.values()
+        ]
+        account_ids = [
+            wyre_transfer.account_id for wyre_transfer in wyre_transfers.values()
+        ]
+        fetched = dict(
+            zip(
+                transfer_ids,
+                executor.map(self.fetch_transfer, transfer_ids, account_ids),
+            )
+        )
+
+        for transaction in transactions:
+            wyre_transfer = wyre_transfers.get(str(transaction.id))
+            transfer_data = None
+            if wyre_transfer is not None:
+                transfer_data = fetched[wyre_transfer.transfer_id]
+            issues = diff(transaction, wyre_transfer, transfer_data)
+            if issues:
+                yield report_line(transaction, wyre_transfer, transfer_data, issues)
+
+    def fetch_transfer(
+        self, transfer_id: str, account_id: Optional[str] = None
+    ) -> Union[dict, Exception, None]:
+        """
+        Runs in the executor's threads, so it must not access the database.
+
+        :return: Returns the transfer's data, ``None`` if Wyre doesn't know
+            it, or the error that prevented fetching it.
+        """
+        try:
+            wyre = self.accounts.get(account_id)
+        except KeyError:
+            return WyreAPIError(f"Unknown Wyre account {account_id}.")
+        try:
+            return wyre.wyre_api.get_transfer_by_id(transfer_id)
+        except WyreAPIError as error:
+            if error.response is not None and error.response.status_code == 404:
+                return None
+            return error
+        except (RequestException, WyreCircuitOpenError) as error:
+            return error
+
+    @staticmethod
+    def read_checkpoint(path: str) -> dict:
+        if not os.path.exists(path):
+            return {}
+        with open(path) as checkpoint:
+            return json.load(checkpoint)
+
+    @staticmethod
+    def write_checkpoint(path: str, progress: dict) -> None:
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as checkpoint:
+            json.dump(progress, checkpoint)
+        os.replace(temporary_path, path)
+
+
+def chunked(iterable: Iterable, size: int) -> Iterable[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def diff(
+    transaction: Transaction,
+    wyre_transfer: Optional[WyreTransfer],
+    transfer_data: Union[dict, Exception, None],
+) -> List[str]:
+    """
+    Lists what doesn't match between a transaction and its Wyre transfer.
+    """
+    completed = transaction.status == Transaction.STATUS.completed
+    if wyre_transfer is None:
+        return ["missing_transfer"] if completed else []
+    if isinstance(transfer_data, Exception):
+        return ["wyre_error"]
+    if transfer_data is None:
+        return ["transfer_not_found"]
+
+    issues = []
+    status = transfer_data.get("status")
+    local_status = wyre_transfer.status
+    if local_status == WyreTransfer.STATUS.CREATED:
+        # Not polled yet, so it's pending as far as we know.
+        local_status = WyreTransfer.STATUS.PENDING
+    if status != local_status:
+        issues.append("status_mismatch")
+    if completed and status != WyreTransfer.STATUS.COMPLETED:
+        issues.append("transfer_not_completed")
+    if status == WyreTransfer.STATUS.COMPLETED:
+        network_tx_id = get_network_tx_id(transfer_data)
+        if not completed:
+            issues.append("transaction_not_completed")
+        elif network_tx_id != transaction.stellar_transaction_id:
+            issues.append("stellar_transaction_mismatch")
+    return issues
+
+
+def get_network_tx_id(transfer_data: dict) -> Optional[str]:
+    return (transfer_data.get("blockchainTx") or {}).get("networkTxId")
+
+
+def report_line(
+    transaction: Transaction,
+    wyre_transfer: Optional[WyreTransfer],
+    transfer_data: Union[dict, Exception, None],
+    issues: List[str],
+) -> dict:
+    line = {
+        "transaction_id": str(transaction.id),
+        "issues": issues,
+        "polaris": {
+            "status": transaction.status,
+            "stellar_transaction_id": transaction.stellar_transaction_id,
+        },
+    }
+    if wyre_transfer is not None:
+        line["transfer_id"] = wyre_transfer.transfer_id
+        line["local"] = {
+            "status": wyre_transfer.status,
+            "network_tx_id": wyre_transfer.network_tx_id,
+        }
+    if isinstance(transfer_data, Exception):
+        line["error"] = str(transfer_data)
+    elif transfer_data is not None:
+        line["wyre"] = {
+            "status": transfer_data.get("status"),
+            "network_tx_id": get_network_tx_id(transfer_data),
+        }
+    return line
@@ -0,0 +1,190 @@
+import json
+from contextlib import ExitStack
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+from django.db import connections
+from polaris.models import Asset, Transaction
+from stellar_sdk import Keypair
+
+from polaris_wyre.testing.benchmark import run_benchmark
+from polaris_wyre.testing.fake_horizon import FakeHorizonServer
+from polaris_wyre.testing.fake_wyre import FakeWyreServer, FakeWyreSettings
+from polaris_wyre.wyre.api import TEST_BASE_URL
+from polaris_wyre.wyre.instrumentation import InMemoryInstrumentation
+from polaris_wyre.wyre.integration import WyreIntegration
+from polaris_wyre.wyre.polling import PollingPolicy
+
+LOAD_TEST_MESSAGE = "Wyre load test deposit"
+
+
+class Command(BaseCommand):
+    """
+    Creates synthetic deposit transactions and submits them through
+    ``WyreIntegration.submit_deposit_transaction``, at a target rate or as
+    fast as the given concurrency allows, then reports the achieved rate,
+    the latency distribution, the errors by type, the number of Wyre
+    requests per deposit and the latencies of the Wyre and Horizon requests.
+
+    **Optional arguments:**
+
+        --deposits DEPOSITS   The number of deposits submitted.
+        --concurrency CONCURRENCY
+                              The number of deposits submitted at a time.
+        --rate RATE           The target deposits per second.
+        --api-url API_URL     The Wyre API base URL.
+        --horizon-url HORIZON_URL
+                              The Horizon URL, defaulting to Polaris' setting.
+        --fake                Submit to in-process fake Wyre and Horizon servers.
+        --completion-delay COMPLETION_DELAY
+                              Seconds until the fake Wyre transfers complete.
+        --poll-interval POLL_INTERVAL
+                              The initial interval between transfer polls.
+        --asset ASSET         The code of the deposited asset.
+        --keep                Keep the synthetic transactions.
+        --output OUTPUT       The JSON file the report is written to.
+    """
+
+    help = "Submits synthetic deposits through WyreIntegration and reports on them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--deposits", type=int, default=100)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--rate", type=float, help="Target deposits per second.")
+        parser.add_argument("--api-url", default=TEST_BASE_URL)
+        parser.add_argument("--horizon-url")
+        parser.add_argument(
+            "--fake",
+            action="store_true",
+            help="Submit to in-process fake Wyre and Horizon servers.",
+        )
+        parser.add_argument("--completion-delay", type=float, default=0.5)
+        parser.add_argument("--poll-interval", type=float)
+        parser.add_argument("--asset", default="USDC")
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the synthetic transactions."
+        )
+        parser.add_argument("--output", help="The JSON file the report is written to.")
+
+    def handle(self, *_args, **options):
+        if options["deposits"] < 1 or options["concurrency"] < 1:
+            raise CommandError("--deposits and --concurrency must be positive.")
+
+        with ExitStack() as stack:
+            api_url, horizon_url = options["api_url"], options["horizon_url"]
+            if options["fake"]:
+                wyre_server = stack.enter_context(
+                    FakeWyreServer(
+                        FakeWyreSettings(completion_delay=options["completion_delay"])
+                    )
+                )
+                horizon_server = stack.enter_context(FakeHorizonServer())
+                api_url, horizon_url = wyre_server.url, horizon_server.url
+
+            instrumentation = InMemoryInstrumentation()
+            integration = self.build_integration(
+                api_url, horizon_url, instrumentation, options
+            )
+            stack.callback(integration.horizon.close)
+
+            asset = self.get_asset(options["asset"])
+            transactions = []
+
+            def create_transaction() -> Transaction:
+                transaction = create_deposit(asset)
+                transactions.append(transaction.pk)
+                return transaction
+
+            try:
+                summary = run_benchmark(
+                    integration.submit_deposit_transaction,
+                    concurrency=options["concurrency"],
+                    iterations=options["deposits"],
+                    setup=create_transaction,
+                    thread_teardown=connections.close_all,
+                    rate=options["rate"],
+                )
+            finally:
+                if not options["keep"]:
+                    Transaction.objects.filter(pk__in=transactions).delete()
+
+        wyre_requests = sum(
+            histogram.count
+            for (endpoint, _), histogram in instrumentation.durations.items()
+            if not endpoint.startswith("horizon.")
+        )
+        report = {
+            "deposits": options["deposits"],
+            "concurrency": options["concurrency"],
+            "target_rate": options["rate"],
+            "api_url": api_url,
+            **summary,
+            "wyre_requests": wyre_requests,
+            "wyre_requests_per_deposit": round(wyre_requests / options["deposits"], 3),
+            "requests": instrumentation.snapshot(),
+        }
+        self.stdout.write(
+            f"Submitted {summary['operations']} deposits at "
+            f"{summary['throughput']:.2f}/s with {summary['errors']} errors "
+            f"{summary['error_types']}.\n"
+            f"Latency: mean={summary['mean_ms']:.1f}ms p50={summary['p50_ms']:.1f}ms "
+            f"p95={summary['p95_ms']:.1f}ms p99={summary['p99_ms']:.1f}ms "
+            f"max={summary['max_ms']:.1f}ms.\n"
+            f"Wyre requests per deposit: {report['wyre_requests_per_deposit']}."
+        )
+        for name, measures in report["requests"].items():
+            duration = measures["duration"]
+            self.stdout.write(
+                f"{name}: {duration['count']} requests, "
+                f"p50<={duration['p50'] * 1000:g}ms p99<={duration['p99'] * 1000:g}ms, "
+                f"outcomes {measures['outcomes']}."
+            )
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(report, output, indent=2)
+
+    @staticmethod
+    def build_integration(
+        api_url: str,
+        horizon_url: str,
+        instrumentation: InMemoryInstrumentation,
+        options,
+    ) -> WyreIntegration:
+        polling_policy = None
+        if options["poll_interval"] is not None:
+            polling_policy = PollingPolicy(initial_delay=options["poll_interval"])
+        integration = WyreIntegration(
+            api_token=getattr(settings, "WYRE_API_TOKEN", ""),
+            account_id=getattr(settings, "WYRE_ACCOUNT_ID", ""),
+            api_url=api_url,
+            polling_policy=polling_policy,
+            instrumentation=instrumentation,
+        )
+        integration.horizon.horizon_url = horizon_url
+        return integration
+
+    @staticmethod
+    def get_asset(code: str) -> Asset:
+        asset = Asset.objects.filter(code=code).first()
+        if asset is None:
+            asset = Asset.objects.create(
+                code=code,
+                issuer=Keypair.random().public_key,
+                significant_decimals=2,
+            )
+        return asset
+
+
+def create_deposit(asset: Asset) -> Transaction:
+    account = Keypair.random().public_key
+    return Transaction.objects.create(
+        asset=asset,
+        kind=Transaction.KIND.deposit,
+        status=Transaction.STATUS.pending_anchor,
+        stellar_account=account,
+        to_address=account,
+        amount_in=Decimal("100"),
+        amount_fee=Decimal("1"),
+        status_message=LOAD_TEST_MESSAGE,
+    )
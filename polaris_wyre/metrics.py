@@ -0,0 +1,350 @@
+import atexit
+import itertools
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import Counter
+from glob import glob
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.db.models import Count
+
+from polaris_wyre.models import WyreTransfer
+from polaris_wyre.wyre.instrumentation import (
+    DEFAULT_BUCKETS,
+    Histogram,
+    InMemoryInstrumentation,
+    RequestEvent,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+NAMESPACE = "polaris_wyre"
+
+_instances = weakref.WeakSet()
+_instance_ids = itertools.count()
+
+
+class PrometheusMetrics(InMemoryInstrumentation):
+    """
+    Instrumentation exposing its measures in the Prometheus text format,
+    through :func:`render_metrics` and the ``metrics`` view.
+
+    With several worker processes, each one writes its measures to its own
+    file in ``directory``, at most every ``flush_interval`` seconds and when
+    it exits, and a scrape merges the files of all the processes. The
+    directory should be emptied when the application is deployed, since the
+    counters of processes that exited are kept. Without a directory, only
+    the measures of the scraped process are exposed.
+
+    :param directory: The directory shared by the processes, defaulting to
+        the ``WYRE_METRICS_DIR`` setting.
+    :param flush_interval: The minimum seconds between two writes of this
+        process' measures.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[str] = None,
+        flush_interval: float = 5.0,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        if directory is None:
+            directory = getattr(settings, "WYRE_METRICS_DIR", None)
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._id = next(_instance_ids)
+        self._pid = os.getpid()
+        self._flushed_at = 0.0
+        super().__init__(buckets)
+        _instances.add(self)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"metrics-{self._pid}-{self._id}.json")
+
+    def before_request(self, endpoint: str, method: str, retries: int) -> None:
+        self._check_fork()
+        super().before_request(endpoint, method, retries)
+
+    def after_request(self, event: RequestEvent) -> None:
+        self._check_fork()
+        super().after_request(event)
+        self._maybe_flush()
+
+    def after_polling(self, polls: int, elapsed: float) -> None:
+        self._check_fork()
+        super().after_polling(polls, elapsed)
+        self._maybe_flush()
+
+    def after_settling(self, status: str, duration: float) -> None:
+        self._check_fork()
+        super().after_settling(status, duration)
+        self._maybe_flush()
+
+    def _check_fork(self) -> None:
+        # A forked worker inherits the measures of its parent, which the
+        # parent reports itself.
+        if os.getpid() != self._pid:
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+            self._flushed_at = 0.0
+            self.reset()
+
+    def _maybe_flush(self) -> None:
+        if (
+            self.directory
+            and time.monotonic() - self._flushed_at >= self.flush_interval
+        ):
+            self.flush()
+
+    def state(self) -> dict:
+        """
+        :return: Returns the measures as a JSON serializable dict.
+        """
+        with self._lock:
+            return {
+                "pid": self._pid,
+                "requests": [
+                    [endpoint, method, outcome, count]
+                    for (endpoint, method, outcome), count in self.outcomes.items()
+                ],
+                "in_flight": [
+                    [endpoint, method, count]
+                    for (endpoint, method), count in self.in_flight.items()
+                ],
+                "durations": [
+                    [endpoint, method, histogram_state(histogram)]
+                    for (endpoint, method), histogram in self.durations.items()
+                ],
+                "polls": histogram_state(self.polls),
+                "settle_durations": [
+                    [status, histogram_state(histogram)]
+                    for status, histogram in self.settle_durations.items()
+                ],
+            }
+
+    def flush(self) -> None:
+        """
+        Atomically writes this process' measures to its file in the directory.
+        """
+        if not self.directory or os.getpid() != self._pid:
+            return
+        self._flushed_at = time.monotonic()
+        state = self.state()
+        fd, temporary_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as temporary_file:
+                json.dump(state, temporary_file)
+            os.replace(temporary_path, self.path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+
+@atexit.register
+def flush_all() -> None:
+    for instance in list(_instances):
+        try:
+            instance.flush()
+        except OSError:
+            pass
+
+
+def histogram_state(histogram: Histogram) -> dict:
+    return {
+        "buckets": list(histogram.buckets),
+        "counts": list(histogram.counts),
+        "sum": histogram.sum,
+    }
+
+
+def merge_histogram(histograms: dict, key, state: dict) -> None:
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = Histogram(state["buckets"])
+    if list(histogram.buckets) != state["buckets"]:
+        return
+    for index, count in enumerate(state["counts"]):
+        histogram.counts[index] += count
+    histogram.count += sum(state["counts"])
+    histogram.sum += state["sum"]
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_states(directory: Optional[str] = None) -> List[dict]:
+    """
+    Gets the measures of the live :class:`PrometheusMetrics` of this process
+    and, when a directory is given, of the other processes' files in it.
+    """
+    instances = list(_instances)
+    if not directory:
+        return [instance.state() for instance in instances]
+    for instance in instances:
+        if instance.directory == directory:
+            instance.flush()
+    states = []
+    for path in glob(os.path.join(directory, "metrics-*.json")):
+        try:
+            with open(path) as state_file:
+                states.append(json.load(state_file))
+        except (OSError, ValueError):
+            continue
+    states.extend(
+        instance.state() for instance in instances if instance.directory != directory
+    )
+    return states
+
+
+def collect(states: Iterable[dict]) -> dict:
+    """
+    Merges the measures of several processes. The requests in flight of the
+    processes that exited are left out.
+    """
+    merged = {
+        "requests": Counter(),
+        "in_flight": Counter(),
+        "durations": {},
+        "polls": {},
+        "settle_durations": {},
+    }
+    alive = {}
+    for state in states:
+        for endpoint, method, outcome, count in state["requests"]:
+            merged["requests"][(endpoint, method, outcome)] += count
+        pid = state["pid"]
+        if pid not in alive:
+            alive[pid] = is_alive(pid)
+        if alive[pid]:
+            for endpoint, method, count in state["in_flight"]:
+                merged["in_flight"][(endpoint, method)] += count
+        for endpoint, method, histogram in state["durations"]:
+            merge_histogram(merged["durations"], (endpoint, method), histogram)
+        merge_histogram(merged["polls"], (), state["polls"])
+        for status, histogram in state["settle_durations"]:
+            merge_histogram(merged["settle_durations"], (status,), histogram)
+    return merged
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    labels = ",".join(
+        f'{name}="{escape(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + labels + "}"
+
+
+def render_histogram(
+    lines: List[str],
+    name: str,
+    documentation: str,
+    label_names: Tuple[str, ...],
+    histograms: Dict[tuple, Histogram],
+) -> None:
+    lines.append(f"# HELP {name} {documentation}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets + (math.inf,), histogram.counts):
+            cumulative += count
+            labels = format_labels(label_names + ("le",), key + (format_value(bound),))
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = format_labels(label_names, key)
+        lines.append(f"{name}_sum{labels} {format_value(histogram.sum)}")
+        lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+def render_metrics(directory: Optional[str] = None) -> str:
+    """
+    Renders the merged measures of all the processes, and the number of Wyre
+    transfers in flight by status, in the Prometheus text exposition format.
+
+    :param directory: The directory the processes write their measures to,
+        defaulting to the ``WYRE_METRICS_DIR`` setting.
+    """
+    if directory is None:
+        directory = getattr(settings, "WYRE_METRICS_DIR", None)
+    merged = collect(read_states(directory))
+    lines = []
+
+    name = f"{NAMESPACE}_requests_total"
+    lines.append(f"# HELP {name} Wyre and Horizon request attempts by outcome.")
+    lines.append(f"# TYPE {name} counter")
+    for key, count in sorted(merged["requests"].items()):
+        labels = format_labels(("endpoint", "method", "outcome"), key)
+        lines.append(f"{name}{labels} {count}")
+
+    name = f"{NAMESPACE}_requests_in_flight"
+    lines.append(f"# HELP {name} Wyre and Horizon requests being sent.")
+    lines.append(f"# TYPE {name} gauge")
+    for key, count in sorted(merged["in_flight"].items()):
+        lines.append(f"{name}{format_labels(('endpoint', 'method'), key)} {count}")
+
+    render_histogram(
+        lines,
+        f"{NAMESPACE}_request_duration_seconds",
+        "Wyre and Horizon request attempt durations.",
+        ("endpoint", "method"),
+        merged["durations"],
+    )
+    render_histogram(
+        lines,
+        f"{NAMESPACE}_transfer_polls",
+        "Status polls per Wyre transfer.",
+        (),
+        merged["polls"],
+    )
+    render_histogram(
+        lines,
+        f"{NAMESPACE}_transfer_settle_seconds",
+        "Seconds from the creation of Wyre transfers to their final status.",
+        ("status",),
+        merged["settle_durations"],
+    )
+
+    name = f"{NAMESPACE}_transfers"
+    lines.append(f"# HELP {name} Wyre transfers in flight by status.")
+    lines.append(f"# TYPE {name} gauge")
+    # Settled transfers are counted by the settle histogram instead, so the
+    # query stays on the status index and doesn't grow with the history.
+    in_flight = [WyreTransfer.STATUS.CREATED, WyreTransfer.STATUS.PENDING]
+    counts = dict.fromkeys(in_flight, 0)
+    counts.update(
+        WyreTransfer.objects.filter(status__in=in_flight)
+        .values_list("status")
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    for status, count in sorted(counts.items()):
+        lines.append(f"{name}{format_labels(('status',), (status,))} {count}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris_wyre", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="wyretransfer",
+            name="idempotency_key",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AlterField(
+            model_name="wyretransfer",
+            name="transfer_id",
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
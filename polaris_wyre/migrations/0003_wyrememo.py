@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris", "0001_initial"),
+        ("polaris_wyre", "0002_wyretransfer_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WyreMemo",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("memo", models.CharField(max_length=28, unique=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "transaction",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="wyre_memo",
+                        to="polaris.transaction",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris_wyre", "0003_wyrememo"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="wyretransfer",
+            name="status",
+            field=models.CharField(
+                choices=[
+                    ("CREATED", "CREATED"),
+                    ("PENDING", "PENDING"),
+                    ("COMPLETED", "COMPLETED"),
+                    ("FAILED", "FAILED"),
+                ],
+                default="PENDING",
+                max_length=16,
+            ),
+        ),
+    ]
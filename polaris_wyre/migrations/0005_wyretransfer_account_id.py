@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris_wyre", "0004_wyretransfer_created_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="wyretransfer",
+            name="account_id",
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+    ]
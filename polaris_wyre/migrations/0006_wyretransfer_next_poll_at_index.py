@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("polaris_wyre", "0005_wyretransfer_account_id"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="wyretransfer",
+            index=models.Index(
+                condition=models.Q(("next_poll_at__isnull", False)),
+                fields=["next_poll_at"],
+                name="polaris_wyr_next_poll_idx",
+            ),
+        ),
+    ]
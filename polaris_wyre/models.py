@@ -0,0 +1,249 @@
+from datetime import timedelta
+from typing import List, Optional
+
+from django.db import models, transaction as db_transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+from model_utils import Choices
+
+
+class WyreTransfer(models.Model):
+    """
+    A Wyre transfer created to settle a Polaris ``Transaction``.
+
+    Transfers submitted with deferred settlement start as ``CREATED``, are
+    ``PENDING`` once Wyre reported them as such, and end as ``COMPLETED`` or
+    ``FAILED``. They are advanced by the ``advance_wyre_transfers`` command
+    whenever ``next_poll_at`` is due.
+    """
+
+    STATUS = Choices("CREATED", "PENDING", "COMPLETED", "FAILED")
+    """Choices object for the Wyre transfer statuses."""
+
+    transaction = models.ForeignKey(
+        "polaris.Transaction",
+        on_delete=models.CASCADE,
+        related_name="wyre_transfers",
+    )
+    """The Polaris transaction settled by the transfer."""
+
+    transfer_id = models.CharField(max_length=64, unique=True, null=True, blank=True)
+    """The Wyre transfer id, unset while the transfer is being created."""
+
+    account_id = models.CharField(max_length=64, null=True, blank=True)
+    """
+    The Wyre account the transfer was sent from, unset for transfers sent
+    before the accounts were recorded, which belong to the primary account.
+    """
+
+    idempotency_key = models.CharField(
+        max_length=64, unique=True, null=True, blank=True
+    )
+    """
+    The key identifying the transfer request, derived from the Polaris
+    transaction. It is released once the transfer fails, so the transaction
+    can be submitted again.
+    """
+
+    status = models.CharField(choices=STATUS, default=STATUS.PENDING, max_length=16)
+    """The last known status of the transfer."""
+
+    network_tx_id = models.CharField(max_length=64, null=True, blank=True)
+    """The Stellar transaction hash, once the transfer is completed."""
+
+    polls = models.PositiveIntegerField(default=0)
+    """The number of times the transfer status was requested from Wyre."""
+
+    next_poll_at = models.DateTimeField(null=True, blank=True)
+    """
+    When the transfer status should be requested next, for transfers with
+    deferred settlement.
+    """
+
+    last_polled_at = models.DateTimeField(null=True, blank=True)
+    """When the transfer status was last requested."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    """When the transfer reached ``COMPLETED`` or ``FAILED``."""
+
+    objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_poll_at"],
+                name="polaris_wyr_status_next_idx",
+            ),
+            # Covers claim_due, which only reads the scheduled transfers.
+            models.Index(
+                fields=["next_poll_at"],
+                name="polaris_wyr_next_poll_idx",
+                condition=Q(next_poll_at__isnull=False),
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.transfer_id} ({self.status})"
+
+    @classmethod
+    def record_polls(cls, transfer_id: str, polls: int) -> None:
+        """
+        Adds ``polls`` to the poll counter of the given transfer.
+        """
+        cls.objects.filter(transfer_id=transfer_id).update(
+            polls=F("polls") + polls, last_polled_at=timezone.now()
+        )
+
+    @classmethod
+    def record_status(
+        cls, transfer_id: str, status: str, network_tx_id: Optional[str] = None
+    ) -> int:
+        """
+        Records a status reported by Wyre for the given transfer. Statuses
+        other than ``COMPLETED`` and ``FAILED`` are recorded as ``PENDING``.
+        A settled transfer with deferred settlement is made due right away,
+        so its transaction is settled by the next ``advance_wyre_transfers``.
+
+        :return: Returns the number of updated transfers.
+        """
+        now = timezone.now()
+        fields = {"status": cls.STATUS.PENDING, "updated_at": now}
+        due = Case(
+            When(next_poll_at__isnull=False, then=Value(now)),
+            default=None,
+            output_field=models.DateTimeField(),
+        )
+        if status == cls.STATUS.COMPLETED and network_tx_id:
+            fields.update(
+                status=status,
+                network_tx_id=network_tx_id,
+                completed_at=now,
+                next_poll_at=due,
+            )
+        elif status == cls.STATUS.FAILED:
+            fields.update(
+                status=status, idempotency_key=None, completed_at=now, next_poll_at=due
+            )
+        return (
+            cls.objects.filter(transfer_id=transfer_id)
+            .exclude(status__in=[cls.STATUS.COMPLETED, cls.STATUS.FAILED])
+            .update(**fields)
+        )
+
+    @classmethod
+    def get_settled_transfer_data(cls, transfer_id: str) -> Optional[dict]:
+        """
+        Gets the transfer in the shape of Wyre's transfer data if it was
+        recorded as ``COMPLETED`` or ``FAILED``, e.g. by the transfer callback.
+        """
+        values = (
+            cls.objects.filter(
+                transfer_id=transfer_id,
+                status__in=[cls.STATUS.COMPLETED, cls.STATUS.FAILED],
+            )
+            .values("status", "network_tx_id")
+            .first()
+        )
+        if values is None:
+            return None
+        return {
+            "id": transfer_id,
+            "status": values["status"],
+            "blockchainTx": {"networkTxId": values["network_tx_id"]},
+        }
+
+    @classmethod
+    def claim_due(cls, limit: int, lease: float) -> List["WyreTransfer"]:
+        """
+        Claims up to ``limit`` transfers whose next poll is due, postponing it
+        by ``lease`` seconds so other workers skip them while they are being
+        advanced. Only transfers with deferred settlement have a next poll,
+        and it is cleared once their transaction is settled.
+
+        :return: Returns the claimed transfers, with their transactions.
+        """
+        now = timezone.now()
+        with db_transaction.atomic():
+            pks = list(
+                cls.objects.select_for_update(skip_locked=True)
+                .filter(transfer_id__isnull=False, next_poll_at__lte=now)
+                .order_by("next_poll_at")
+                .values_list("pk", flat=True)[:limit]
+            )
+            cls.objects.filter(pk__in=pks).update(
+                next_poll_at=now + timedelta(seconds=lease)
+            )
+        return list(
+            cls.objects.filter(pk__in=pks)
+            .select_related("transaction__asset")
+            .order_by("next_poll_at")
+        )
+
+    def schedule_poll(self, delay: float) -> None:
+        self.next_poll_at = timezone.now() + timedelta(seconds=delay)
+        self.save(update_fields=["next_poll_at", "updated_at"])
+
+    def mark_pending(self, delay: float) -> None:
+        """
+        Records that Wyre reported the transfer as pending, scheduling its
+        next poll in ``delay`` seconds.
+        """
+        self.status = self.STATUS.PENDING
+        self.next_poll_at = timezone.now() + timedelta(seconds=delay)
+        self.save(update_fields=["status", "next_poll_at", "updated_at"])
+
+    def mark_completed(self, network_tx_id: str) -> None:
+        self.status = self.STATUS.COMPLETED
+        self.network_tx_id = network_tx_id
+        self.completed_at = timezone.now()
+        self.next_poll_at = None
+        self.save(
+            update_fields=[
+                "status",
+                "network_tx_id",
+                "completed_at",
+                "next_poll_at",
+                "updated_at",
+            ]
+        )
+
+    def mark_failed(self) -> None:
+        self.status = self.STATUS.FAILED
+        self.idempotency_key = None
+        self.completed_at = timezone.now()
+        self.next_poll_at = None
+        self.save(
+            update_fields=[
+                "status",
+                "idempotency_key",
+                "completed_at",
+                "next_poll_at",
+                "updated_at",
+            ]
+        )
+
+
+class WyreMemo(models.Model):
+    """
+    A memo allocated to a Polaris ``Transaction``, indexed for payment
+    matching.
+    """
+
+    memo = models.CharField(max_length=28, unique=True)
+    """The text memo the client attaches to its payment."""
+
+    transaction = models.OneToOneField(
+        "polaris.Transaction",
+        on_delete=models.CASCADE,
+        related_name="wyre_memo",
+    )
+    """The Polaris transaction the memo was allocated to."""
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = models.Manager()
+
+    def __str__(self):
+        return self.memo
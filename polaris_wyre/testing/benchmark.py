@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+from collections import Counter
+from queue import Empty, SimpleQueue
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: Sequence[float], percent: float) -> float:
+    """
+    Gets the nearest-rank percentile of already sorted values.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(percent / 100 * len(sorted_values))
+    return sorted_values[max(rank, 1) - 1]
+
+
+def summarize(
+    latencies: List[float], elapsed: float, errors: Optional[Dict[str, int]] = None
+) -> dict:
+    """
+    Summarizes the latencies, in seconds, of the operations completed in
+    ``elapsed`` seconds.
+
+    :return: Returns a JSON serializable dict with the number of operations
+        and errors, the throughput in operations per second and the mean,
+        p50, p95, p99 and max latencies in milliseconds.
+    """
+    errors = dict(errors or {})
+    latencies = sorted(latencies)
+    summary = {
+        "operations": len(latencies),
+        "errors": sum(errors.values()),
+        "error_types": errors,
+        "elapsed": round(elapsed, 6),
+        "throughput": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        "mean_ms": (
+            round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0
+        ),
+    }
+    for percent in PERCENTILES:
+        summary[f"p{percent}_ms"] = round(percentile(latencies, percent) * 1000, 3)
+    summary["max_ms"] = round(latencies[-1] * 1000, 3) if latencies else 0.0
+    return summary
+
+
+def run_benchmark(
+    operation: Callable[..., Any],
+    concurrency: int,
+    iterations: int,
+    setup: Optional[Callable[[], Any]] = None,
+    thread_teardown: Optional[Callable[[], None]] = None,
+    rate: Optional[float] = None,
+) -> dict:
+    """
+    Calls ``operation`` ``iterations`` times from ``concurrency`` threads and
+    summarizes the latencies with :func:`summarize`. Failed calls are counted
+    by exception type instead of being timed.
+
+    :param setup: Called ``iterations`` times before the clock starts, each
+        result being passed to a call of ``operation``.
+    :param thread_teardown: Called by each thread once it is done, e.g. to
+        close its database connections.
+    :param rate: The target operations per second. Operations are started on
+        schedule, as long as a thread is free, instead of back to back.
+    """
+    arguments = SimpleQueue()
+    for index in range(iterations):
+        arguments.put((index, (setup(),) if setup is not None else ()))
+
+    latencies: List[float] = []
+    errors = Counter()
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            while True:
+                try:
+                    index, args = arguments.get_nowait()
+                except Empty:
+                    return
+                if rate:
+                    delay = first_started_at + index / rate - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                started_at = time.perf_counter()
+                try:
+                    operation(*args)
+                except Exception as error:
+                    with lock:
+                        errors[type(error).__name__] += 1
+                    continue
+                latency = time.perf_counter() - started_at
+                with lock:
+                    latencies.append(latency)
+        finally:
+            if thread_teardown is not None:
+                thread_teardown()
+
+    threads = [
+        threading.Thread(target=worker, name=f"benchmark-{index}")
+        for index in range(concurrency)
+    ]
+    first_started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - first_started_at
+    return summarize(latencies, elapsed, errors)
@@ -0,0 +1,123 @@
+"""
+A fake Horizon server answering ``GET /transactions/:id`` for any hash, so
+deposits submitted through the fake Wyre API can be fetched without the
+Stellar network::
+
+    python -m polaris_wyre.testing.fake_horizon --port 8000 --latency 0.02
+"""
+
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Optional
+
+from .server import BackgroundServer, FakeHTTPServer, JSONRequestHandler, parse_settings
+
+
+@dataclass(frozen=True)
+class FakeHorizonSettings:
+    """
+    Describes how the fake server behaves. Every request is delayed by
+    ``latency`` seconds, and transactions are reported as not found with a
+    ``not_found_rate`` probability, as if not ingested yet.
+    """
+
+    latency: float = 0.0
+    not_found_rate: float = 0.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if not 0 <= self.not_found_rate <= 1:
+            raise ValueError("not_found_rate must be between 0 and 1.")
+
+
+class FakeHorizonState:
+    def __init__(self, settings: FakeHorizonSettings):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self._ledger = 1000
+
+    def not_found(self) -> bool:
+        with self._lock:
+            return self.random.random() < self.settings.not_found_rate
+
+    def transaction(self, transaction_hash: str) -> dict:
+        with self._lock:
+            self._ledger += 1
+            ledger = self._ledger
+        return {
+            "id": transaction_hash,
+            "hash": transaction_hash,
+            "successful": True,
+            "ledger": ledger,
+            "created_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "operation_count": 1,
+            "memo_type": "none",
+        }
+
+
+class FakeHorizonRequestHandler(JSONRequestHandler):
+    def do_GET(self):
+        path = self.path.split("?")[0].strip("/")
+        state = self.server.state
+        if state.settings.latency:
+            time.sleep(state.settings.latency)
+
+        if path.startswith("transactions/"):
+            self.server.record("GET", "transactions/:id")
+            if state.not_found():
+                self.respond(HTTPStatus.NOT_FOUND, not_found_problem())
+            else:
+                self.respond(HTTPStatus.OK, state.transaction(path.split("/", 1)[1]))
+        else:
+            self.server.record("GET", path)
+            self.respond(HTTPStatus.NOT_FOUND, not_found_problem())
+
+
+def not_found_problem() -> dict:
+    return {
+        "type": "https://stellar.org/horizon-errors/not_found",
+        "title": "Resource Missing",
+        "status": 404,
+    }
+
+
+class FakeHorizonServer(BackgroundServer):
+    """
+    Runs the fake Horizon in a background thread. ``url`` is the Horizon URL
+    to pass to :class:`polaris_wyre.wyre.horizon.HorizonClient`.
+    """
+
+    thread_name = "fake-horizon"
+
+    def __init__(
+        self,
+        settings: Optional[FakeHorizonSettings] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.settings = settings or FakeHorizonSettings()
+        super().__init__(
+            FakeHTTPServer(
+                (host, port),
+                FakeHorizonRequestHandler,
+                FakeHorizonState(self.settings),
+            )
+        )
+
+
+def main(argv=None):
+    host, port, settings = parse_settings(
+        FakeHorizonSettings, "Runs a fake Horizon server.", argv
+    )
+    server = FakeHorizonServer(settings, host=host, port=port)
+    print(f"Serving a fake Horizon at {server.url}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
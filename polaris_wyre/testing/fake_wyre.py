@@ -0,0 +1,266 @@
+"""
+A fake Wyre API server for tests and load tests.
+
+It implements the endpoints used by :class:`polaris_wyre.wyre.api.WyreAPI`
+(``v2/account`` and ``v3/transfers``) on top of the standard library's HTTP
+server, keeping transfers in memory. It can be started in a thread::
+
+    with FakeWyreServer(FakeWyreSettings(completion_delay=1)) as server:
+        wyre = Wyre(api_token="token", account_id="AC_1", api_url=server.url)
+
+or in a separate process::
+
+    python -m polaris_wyre.testing.fake_wyre --port 8080 --latency 0.05
+"""
+
+import json
+import random
+import secrets
+import string
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from .server import BackgroundServer, FakeHTTPServer, JSONRequestHandler, parse_settings
+
+ALPHABET = string.ascii_uppercase + string.digits
+DEFAULT_STELLAR_ADDRESS = "GD7WXI7AOAK2CIPZVBEFYLS2NQZI2J4WN4HFYQQ4A2OMFVWGWAL3IW7K"
+
+
+@dataclass(frozen=True)
+class FakeWyreSettings:
+    """
+    Describes how the fake server behaves.
+
+    Transfers stay ``PENDING`` for ``completion_delay`` seconds and then
+    become ``COMPLETED``, or ``FAILED`` with a ``failure_rate`` probability.
+    Every request is delayed by ``latency`` plus up to ``latency_jitter``
+    seconds. Then it is answered with a 429 with a ``rate_limit_rate``
+    probability, with a 5xx with an ``error_rate`` probability, or left
+    unanswered for ``timeout_delay`` seconds with a ``timeout_rate``
+    probability. When ``api_token`` is set, requests with another bearer
+    token are answered with a 401. ``seed`` makes the random choices
+    reproducible.
+    """
+
+    account_id: str = "AC_FAKE"
+    api_token: Optional[str] = None
+    stellar_address: str = DEFAULT_STELLAR_ADDRESS
+    completion_delay: float = 0.0
+    failure_rate: float = 0.0
+    latency: float = 0.0
+    latency_jitter: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: int = 1
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_delay: float = 30.0
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        for name in ("failure_rate", "rate_limit_rate", "error_rate", "timeout_rate"):
+            if not 0 <= getattr(self, name) <= 1:
+                raise ValueError(f"{name} must be between 0 and 1.")
+
+
+class FakeWyreState:
+    """
+    The account and transfers served by the fake server.
+    """
+
+    def __init__(self, settings: FakeWyreSettings):
+        self.settings = settings
+        self.user_id = "".join(secrets.choice(ALPHABET) for _ in range(11))
+        self.random = random.Random(settings.seed)
+        self._lock = threading.Lock()
+        self._transfers: Dict[str, dict] = {}
+        self._custom_ids: Dict[str, str] = {}
+
+    def account(self) -> dict:
+        return {
+            "id": self.settings.account_id,
+            "status": "APPROVED",
+            "depositAddresses": {
+                "XLM": f"{self.settings.stellar_address}:{self.user_id}"
+            },
+        }
+
+    def chance(self, probability: float) -> bool:
+        with self._lock:
+            return self.random.random() < probability
+
+    def latency(self) -> float:
+        with self._lock:
+            return self.settings.latency + self.random.uniform(
+                0, self.settings.latency_jitter
+            )
+
+    def error_status(self) -> HTTPStatus:
+        with self._lock:
+            return self.random.choice(
+                [HTTPStatus.BAD_GATEWAY, HTTPStatus.SERVICE_UNAVAILABLE]
+            )
+
+    def create_transfer(self, payload: dict) -> dict:
+        """
+        Creates a transfer, or returns the one created with the same
+        ``customId``.
+        """
+        with self._lock:
+            custom_id = payload.get("customId")
+            if custom_id in self._custom_ids:
+                return self._view(self._transfers[self._custom_ids[custom_id]])
+            transfer_id = "TF_" + "".join(
+                self.random.choice(ALPHABET) for _ in range(11)
+            )
+            now = time.time()
+            transfer = {
+                "id": transfer_id,
+                "customId": custom_id,
+                "source": payload.get("source"),
+                "sourceCurrency": payload.get("sourceCurrency"),
+                "sourceAmount": payload.get("sourceAmount"),
+                "dest": payload.get("dest"),
+                "destCurrency": payload.get("destCurrency"),
+                "notifyUrl": payload.get("notifyUrl"),
+                "createdAt": int(now * 1000),
+                "_settles_at": now + self.settings.completion_delay,
+                "_fails": self.random.random() < self.settings.failure_rate,
+                "_network_tx_id": "%064x" % self.random.getrandbits(256),
+            }
+            self._transfers[transfer_id] = transfer
+            if custom_id:
+                self._custom_ids[custom_id] = transfer_id
+            return self._view(transfer)
+
+    def get_transfer(self, transfer_id: str) -> Optional[dict]:
+        with self._lock:
+            transfer = self._transfers.get(transfer_id)
+            return None if transfer is None else self._view(transfer)
+
+    def list_transfers(self, offset: int, limit: int) -> Tuple[list, int]:
+        """
+        :return: Returns the page of transfers, newest first, and the total
+            number of transfers.
+        """
+        with self._lock:
+            transfers = list(reversed(self._transfers.values()))
+            page = transfers[offset : offset + limit]
+            return [self._view(transfer) for transfer in page], len(transfers)
+
+    @staticmethod
+    def _view(transfer: dict) -> dict:
+        data = {key: value for key, value in transfer.items() if key[0] != "_"}
+        if time.time() < transfer["_settles_at"]:
+            data["status"] = "PENDING"
+        elif transfer["_fails"]:
+            data["status"] = "FAILED"
+        else:
+            data["status"] = "COMPLETED"
+            data["blockchainTx"] = {"networkTxId": transfer["_network_tx_id"]}
+        return data
+
+
+class FakeWyreRequestHandler(JSONRequestHandler):
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method: str):
+        url = urlsplit(self.path)
+        path = url.path.strip("/")
+        body = self.read_body()
+        if path.startswith("v3/transfers/"):
+            self.server.record(method, "v3/transfers/:id")
+        else:
+            self.server.record(method, path)
+        state = self.server.state
+        settings = state.settings
+
+        latency = state.latency()
+        if latency:
+            time.sleep(latency)
+        if state.chance(settings.timeout_rate):
+            time.sleep(settings.timeout_delay)
+            self.close_connection = True
+            return
+        if state.chance(settings.rate_limit_rate):
+            self.respond(
+                HTTPStatus.TOO_MANY_REQUESTS,
+                {"message": "Rate limit exceeded."},
+                {"Retry-After": str(settings.retry_after)},
+            )
+            return
+        if state.chance(settings.error_rate):
+            self.respond(state.error_status(), {"message": "Injected error."})
+            return
+        authorization = self.headers.get("Authorization")
+        if settings.api_token and authorization != f"Bearer {settings.api_token}":
+            self.respond(HTTPStatus.UNAUTHORIZED, {"message": "Unauthorized."})
+            return
+
+        if method == "GET" and path == "v2/account":
+            self.respond(HTTPStatus.OK, state.account())
+        elif method == "POST" and path == "v3/transfers":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                self.respond(HTTPStatus.BAD_REQUEST, {"message": "Invalid JSON."})
+                return
+            self.respond(HTTPStatus.OK, state.create_transfer(payload))
+        elif method == "GET" and path == "v3/transfers":
+            query = parse_qs(url.query)
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["25"])[0])
+            transfers, total = state.list_transfers(offset, limit)
+            self.respond(HTTPStatus.OK, {"data": transfers, "recordsTotal": total})
+        elif method == "GET" and path.startswith("v3/transfers/"):
+            transfer = state.get_transfer(path[len("v3/transfers/") :])
+            if transfer is None:
+                self.respond(HTTPStatus.NOT_FOUND, {"message": "Transfer not found."})
+            else:
+                self.respond(HTTPStatus.OK, transfer)
+        else:
+            self.respond(HTTPStatus.NOT_FOUND, {"message": "Not found."})
+
+
+class FakeWyreServer(BackgroundServer):
+    """
+    Runs the fake Wyre API in a background thread. ``url`` is the base URL to
+    pass as ``api_url`` to the Wyre clients, ``state`` holds the account and
+    the transfers and ``request_counts`` counts the requests received by
+    method and path.
+    """
+
+    thread_name = "fake-wyre"
+
+    def __init__(
+        self,
+        settings: Optional[FakeWyreSettings] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.settings = settings or FakeWyreSettings()
+        super().__init__(
+            FakeHTTPServer(
+                (host, port), FakeWyreRequestHandler, FakeWyreState(self.settings)
+            )
+        )
+
+
+def main(argv=None):
+    host, port, settings = parse_settings(
+        FakeWyreSettings, "Runs a fake Wyre API server.", argv
+    )
+    server = FakeWyreServer(settings, host=host, port=port)
+    print(f"Serving a fake Wyre API at {server.url}", flush=True)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
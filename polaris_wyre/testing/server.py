@@ -0,0 +1,145 @@
+import argparse
+import json
+import threading
+from collections import Counter
+from dataclasses import fields
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Tuple, Type
+
+
+class JSONRequestHandler(BaseHTTPRequestHandler):
+    """
+    A quiet HTTP/1.1 request handler answering with JSON bodies, so clients
+    can keep their connections alive.
+    """
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which Nagle's algorithm would
+    # delay until the client acknowledges the headers.
+    disable_nagle_algorithm = True
+    server: "FakeHTTPServer"
+
+    def log_message(self, format, *args):
+        pass
+
+    def read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def respond(self, status: HTTPStatus, data: dict, headers: Optional[dict] = None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeHTTPServer(ThreadingHTTPServer):
+    """
+    A threaded HTTP server holding the fake's ``state`` and counting the
+    requests received by method and route.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        handler_class: Type[JSONRequestHandler],
+        state: Any,
+    ):
+        super().__init__(address, handler_class)
+        self.state = state
+        self.request_counts = Counter()
+        self._counts_lock = threading.Lock()
+
+    def record(self, method: str, route: str) -> None:
+        with self._counts_lock:
+            self.request_counts[(method, route)] += 1
+
+
+class BackgroundServer:
+    """
+    Runs a :class:`FakeHTTPServer` in a background thread. ``url`` is the
+    server's base URL.
+    """
+
+    thread_name = "fake-server"
+
+    def __init__(self, httpd: FakeHTTPServer):
+        self.httpd = httpd
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    @property
+    def state(self) -> Any:
+        return self.httpd.state
+
+    @property
+    def request_counts(self) -> Counter:
+        return self.httpd.request_counts
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            name=self.thread_name,
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
+
+    def serve_forever(self) -> None:
+        """
+        Serves in the calling thread until interrupted.
+        """
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def parse_settings(settings_class: Type, description: str, argv=None):
+    """
+    Parses ``--host``, ``--port`` and an option per field of the settings
+    dataclass from the command line.
+
+    :return: Returns the host, the port and the settings.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    for field in fields(settings_class):
+        option = "--" + field.name.replace("_", "-")
+        if field.type in (float, int):
+            parser.add_argument(option, type=field.type, default=field.default)
+        elif field.type == Optional[int]:
+            parser.add_argument(option, type=int, default=field.default)
+        else:
+            parser.add_argument(option, default=field.default)
+    options = vars(parser.parse_args(argv))
+    host, port = options.pop("host"), options.pop("port")
+    return host, port, settings_class(**options)
@@ -0,0 +1,10 @@
+from django.urls import path
+
+from . import views
+
+app_name = "polaris_wyre"
+
+urlpatterns = [
+    path("transfers/callback/", views.transfer_callback, name="transfer_callback"),
+    path("metrics/", views.metrics, name="metrics"),
+]
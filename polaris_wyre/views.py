@@ -0,0 +1,109 @@
+import base64
+import hmac
+import json
+import logging
+
+from django.conf import settings
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    JsonResponse,
+)
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from polaris import integrations
+
+from polaris_wyre.metrics import CONTENT_TYPE, render_metrics
+from polaris_wyre.models import WyreTransfer
+from polaris_wyre.wyre.dtos import Transfer
+from polaris_wyre.wyre.integration import WyreIntegration
+from polaris_wyre.wyre.notifications import transfer_notifier
+
+logger = logging.getLogger(__name__)
+
+
+@csrf_exempt
+@require_POST
+def transfer_callback(request) -> HttpResponse:
+    """
+    Receives the transfer status updates Wyre posts to the ``notifyUrl`` of
+    its transfers.
+
+    Wyre doesn't sign its callbacks, so they are authenticated by the
+    ``WYRE_WEBHOOK_SECRET`` setting, sent in the ``Authorization`` header as
+    the password of basic authentication (the credentials of the
+    ``notifyUrl``) or as a bearer token. The body is only trusted for the
+    transfer id: the transfer is fetched from Wyre before its status is
+    recorded and the threads waiting on it in this process are woken up.
+    """
+    secret = getattr(settings, "WYRE_WEBHOOK_SECRET", "")
+    if not secret or not hmac.compare_digest(
+        get_authorization_secret(request).encode(), secret.encode()
+    ):
+        return HttpResponseForbidden()
+
+    try:
+        transfer_data = json.loads(request.body)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid JSON body.")
+    if not isinstance(transfer_data, dict) or not transfer_data.get("id"):
+        return HttpResponseBadRequest("Missing transfer id.")
+    transfer_id = str(transfer_data["id"])
+
+    integration = integrations.registered_custody_integration
+    if not isinstance(integration, WyreIntegration):
+        return HttpResponse("Wyre isn't the custody integration.", status=503)
+    account_id = (
+        WyreTransfer.objects.filter(transfer_id=transfer_id)
+        .values_list("account_id", flat=True)
+        .first()
+    )
+    try:
+        wyre = integration.accounts.get(account_id)
+        transfer = Transfer.of(wyre.wyre_api.get_transfer_by_id(transfer_id))
+    except Exception:
+        logger.exception("Could not get Wyre transfer %s.", transfer_id)
+        return HttpResponse("Could not get the transfer.", status=502)
+
+    status = transfer.status
+    WyreTransfer.record_status(transfer_id, status, transfer.network_tx_id)
+    if status == WyreTransfer.STATUS.FAILED or (
+        status == WyreTransfer.STATUS.COMPLETED and transfer.network_tx_id
+    ):
+        transfer_notifier.notify(transfer_id, transfer)
+
+    return JsonResponse({"status": "ok"})
+
+
+def get_authorization_secret(request) -> str:
+    """
+    Gets the password of a basic ``Authorization`` header, or its bearer
+    token.
+    """
+    scheme, _, credentials = request.headers.get("Authorization", "").partition(" ")
+    if scheme.lower() == "bearer":
+        return credentials.strip()
+    if scheme.lower() == "basic":
+        try:
+            decoded = base64.b64decode(credentials.strip(), validate=True).decode()
+        except (ValueError, UnicodeDecodeError):
+            return ""
+        return decoded.partition(":")[2]
+    return ""
+
+
+@require_GET
+def metrics(request) -> HttpResponse:
+    """
+    Exposes the Wyre custody metrics in the Prometheus text format.
+
+    When the ``WYRE_METRICS_TOKEN`` setting is set, scrapers must send it as
+    a bearer token.
+    """
+    token = getattr(settings, "WYRE_METRICS_TOKEN", "")
+    if token:
+        authorization = request.headers.get("Authorization", "")
+        if not hmac.compare_digest(authorization.encode(), f"Bearer {token}".encode()):
+            return HttpResponseForbidden()
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
@@ -1 +1,2 @@
 from .wyre import Wyre
+from .wyre_async import AsyncWyre
@@ -0,0 +1,196 @@
+import itertools
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from .dtos import TransferData
+from .ledger import BalanceLedger
+from .retry import TokenBucket
+from .wyre import Wyre
+
+
+@dataclass(frozen=True)
+class WyreAccount:
+    """
+    The credentials of a Wyre account transfers can be sent from.
+
+    :param rate_limiter: A token bucket throttling the requests made with the
+        account, since Wyre limits each account separately. Defaults to the
+        integration's ``rate_limiter``.
+    """
+
+    account_id: str
+    api_token: str
+    rate_limiter: Optional[TokenBucket] = None
+
+
+class RoutingStrategy:
+    """
+    Chooses the account each new transfer is sent from.
+    """
+
+    def choose(self, pool: "AccountPool", transfer_data: TransferData) -> str:
+        """
+        Called with the pool's lock held, so it must not block.
+
+        :return: Returns the id of the chosen account.
+        """
+        raise NotImplementedError()
+
+
+class RoundRobinRouting(RoutingStrategy):
+    """
+    Uses the accounts in turn.
+    """
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+    def choose(self, pool: "AccountPool", transfer_data: TransferData) -> str:
+        return pool.account_ids[next(self._counter) % len(pool.account_ids)]
+
+
+class LeastInFlightRouting(RoutingStrategy):
+    """
+    Uses the account with the fewest transfers in flight, the first one
+    breaking ties.
+    """
+
+    def choose(self, pool: "AccountPool", transfer_data: TransferData) -> str:
+        return min(pool.account_ids, key=pool.in_flight)
+
+
+class BalanceRouting(RoutingStrategy):
+    """
+    Uses the account with the largest available balance of the transfer's
+    currency in the pool's :class:`BalanceLedger`.
+    """
+
+    def choose(self, pool: "AccountPool", transfer_data: TransferData) -> str:
+        return max(
+            pool.account_ids,
+            key=lambda account_id: pool.ledger.available(
+                account_id, transfer_data.currency
+            ),
+        )
+
+
+class AccountPool:
+    """
+    The Wyre clients of several accounts, spreading the new transfers over
+    them according to ``routing``, round-robin by default.
+
+    The pool counts, per account, the transfers in flight in this process,
+    i.e. being created or polled until they settle. With a ``ledger``, the
+    amount of each new transfer is reserved from the chosen account's
+    balance, and a transfer the account can't cover is refused.
+    :class:`BalanceRouting` always uses a ledger, a default
+    :class:`BalanceLedger` if none is given.
+
+    :param wyres: The clients of the accounts, the first one being the
+        primary account, which receives the payments.
+    """
+
+    def __init__(
+        self,
+        wyres: Sequence[Wyre],
+        routing: Optional[RoutingStrategy] = None,
+        ledger: Optional[BalanceLedger] = None,
+    ):
+        if not wyres:
+            raise ValueError("At least one Wyre account is required.")
+        self._wyres: Dict[str, Wyre] = {
+            wyre.wyre_api.ACCOUNT_ID: wyre for wyre in wyres
+        }
+        if len(self._wyres) < len(wyres):
+            raise ValueError("Wyre accounts must be unique.")
+        self.account_ids: Tuple[str, ...] = tuple(self._wyres)
+        self.routing = routing or RoundRobinRouting()
+        if ledger is None and isinstance(self.routing, BalanceRouting):
+            ledger = BalanceLedger()
+        self.ledger = ledger
+        self._in_flight = Counter()
+        self._lock = threading.Lock()
+
+    @property
+    def primary(self) -> Wyre:
+        return self._wyres[self.account_ids[0]]
+
+    def get(self, account_id: Optional[str]) -> Wyre:
+        """
+        :return: Returns the client of the account, or of the primary account
+            if ``account_id`` is unset, as for transfers created before the
+            accounts were recorded.
+        :raises KeyError: If the account isn't in the pool.
+        """
+        if account_id is None:
+            return self.primary
+        return self._wyres[account_id]
+
+    def in_flight(self, account_id: str) -> int:
+        return self._in_flight[account_id]
+
+    def refresh_balances(self, force: bool = False) -> None:
+        """
+        Seeds the ledger with the balances Wyre reports for the accounts
+        whose balances are stale, or for all of them if ``force`` is set.
+        """
+        if self.ledger is None:
+            return
+        for account_id in self.account_ids:
+            if force or self.ledger.is_stale(account_id):
+                account = self.get(account_id).wyre_api.get_account()
+                self.ledger.seed(account_id, account.available_balances)
+
+    def acquire(self, transfer_data: TransferData) -> str:
+        """
+        Chooses the account of a new transfer, reserving its amount in the
+        ledger, and counts the transfer as in flight until :meth:`release`
+        is called. It doesn't call Wyre: :meth:`refresh_balances` must be
+        called first, outside of any database transaction.
+
+        :raises WyreInsufficientBalanceError: If the ledger's balance of the
+            chosen account can't cover the transfer.
+        :return: Returns the id of the chosen account.
+        """
+        with self._lock:
+            account_id = self.routing.choose(self, transfer_data)
+            if self.ledger is not None:
+                self.ledger.reserve(
+                    account_id, transfer_data.currency, transfer_data.amount
+                )
+            self._in_flight[account_id] += 1
+        return account_id
+
+    def release(self, account_id: Optional[str]) -> None:
+        """
+        Stops counting a transfer of the account as in flight.
+        """
+        with self._lock:
+            self._in_flight[account_id or self.account_ids[0]] -= 1
+
+    @contextmanager
+    def hold(self, account_id: Optional[str]):
+        """
+        Counts a transfer of the account as in flight within the block.
+        """
+        with self._lock:
+            self._in_flight[account_id or self.account_ids[0]] += 1
+        try:
+            yield
+        finally:
+            self.release(account_id)
+
+    def refund(self, account_id: Optional[str], transfer_data: TransferData):
+        """
+        Returns the amount of a transfer that wasn't created or failed to the
+        ledger's balance of its account.
+        """
+        if self.ledger is not None:
+            self.ledger.release(
+                account_id or self.account_ids[0],
+                transfer_data.currency,
+                transfer_data.amount,
+            )
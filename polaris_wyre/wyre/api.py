@@ -1,85 +1,473 @@
+import copy
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Iterator, Mapping, Optional
 from urllib.parse import urljoin
 
 import requests
 
 from polaris_wyre.helpers.exceptions import WyreAPIError
-from .dtos import TransferData
+from .breaker import CircuitBreaker
+from .connection import ConnectionSettings, get_adapter
+from .dtos import Account, Transfer, TransferData, json_loads
+from .instrumentation import NO_INSTRUMENTATION, Instrumentation, RequestEvent
+from .retry import RetryPolicy, RetryStats, TokenBucket
 
 TEST_BASE_URL = "https://api.testwyre.com"
+TRANSFERS_PAGE_SIZE = 25
+# The pages of the history searched for a transfer before creating it again.
+CUSTOM_ID_LOOKUP_PAGES = 2
 
+Recovery = Callable[[], Optional[Mapping]]
+
+logger = logging.getLogger(__name__)
+
+
+class BaseWyreAPI:
+    """
+    Holds what is shared between the sync and async Wyre API clients: the
+    credentials, how URLs and payloads are built, how errors are reported and
+    when failed requests are retried.
+
+    Requests are throttled by ``rate_limiter``, if given, and retried
+    according to ``retry_policy``. Only idempotent requests are retried:
+    GETs, and transfers whose :class:`TransferData` has an idempotency key.
+    Since a failed attempt may still have created the transfer, the latest
+    transfers are searched for its key, Wyre's ``customId``, before it is
+    sent again, and the transfer found is returned instead. Retry counts
+    and wait times are kept in ``retry_stats``. When ``notify_url`` is set,
+    Wyre posts the transfers' status updates to it. Every attempt of a
+    request is reported to ``instrumentation``, if given. When
+    ``circuit_breaker`` is given, requests to an endpoint whose circuit is
+    open raise :class:`WyreCircuitOpenError` instead of being sent.
+
+    When ``coalesce_requests`` is set, identical GETs made while one of them
+    is in flight share its response, or its error, instead of being sent.
+    """
 
-class WyreAPI:
     def __init__(
         self,
         api_token: str = "",
         account_id: str = "",
         api_url: str = TEST_BASE_URL,
+        connection_settings: Optional[ConnectionSettings] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        notify_url: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        coalesce_requests: bool = True,
     ):
         self.API_TOKEN = api_token
         self.ACCOUNT_ID = account_id
         self.API_URL = api_url
+        self.connection_settings = connection_settings or ConnectionSettings()
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.notify_url = notify_url
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self.circuit_breaker = circuit_breaker
+        self.coalesce_requests = coalesce_requests
+        self.retry_stats = RetryStats()
 
-        base_headers = {
+    @property
+    def base_headers(self) -> dict:
+        return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.API_TOKEN}",
         }
 
-        self.session = requests.Session()
-        self.session.headers.update(**base_headers)
+    def _url(self, path: str) -> str:
+        return urljoin(self.API_URL, path)
+
+    def _transfer_payload(self, transfer_data: TransferData) -> dict:
+        data = {
+            "autoConfirm": True,
+            "source": f"account:{self.ACCOUNT_ID}",
+            "sourceCurrency": transfer_data.currency,
+            "sourceAmount": str(transfer_data.amount),
+            "dest": transfer_data.destination,
+            "destCurrency": transfer_data.currency,
+        }
+        if transfer_data.idempotency_key:
+            data["customId"] = transfer_data.idempotency_key
+        if self.notify_url:
+            data["notifyUrl"] = self.notify_url
+        return data
+
+    def _rate_limit_wait(self) -> float:
+        """
+        :return: Returns the seconds to wait before sending a request.
+        """
+        if self.rate_limiter is None:
+            return 0.0
+        wait = self.rate_limiter.reserve()
+        if wait:
+            self.retry_stats.record_rate_limit_wait(wait)
+        return wait
+
+    def _retry_wait(
+        self,
+        url: str,
+        attempt: int,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None,
+        reason: str = "",
+    ) -> Optional[float]:
+        """
+        Decides whether a failed retryable request is sent again.
+
+        :return: Returns the seconds to wait before retrying, or ``None`` if
+            the request must not be retried.
+        """
+        if not self.retry_policy.should_retry(attempt, status_code):
+            return None
+        wait = self.retry_policy.wait_time(attempt, retry_after)
+        reason = str(status_code) if status_code is not None else reason
+        self.retry_stats.record_retry(reason, wait)
+        logger.warning(
+            "Retrying Wyre request to %s in %.2f seconds (%s, retry %d).",
+            url,
+            wait,
+            reason,
+            attempt + 1,
+        )
+        return wait
+
+    def _record_attempt(
+        self,
+        endpoint: str,
+        method: str,
+        retries: int,
+        started_at: float,
+        status: Optional[int] = None,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        error: Optional[Exception] = None,
+    ) -> None:
+        self.instrumentation.after_request(
+            RequestEvent(
+                endpoint=endpoint,
+                method=method,
+                retries=retries,
+                duration=time.perf_counter() - started_at,
+                status=status,
+                bytes_sent=bytes_sent,
+                bytes_received=bytes_received,
+                error=type(error).__name__ if error is not None else None,
+            )
+        )
+
+    def _coalescing_key(self, method: str, url: str, kwargs: dict) -> Optional[tuple]:
+        """
+        :return: Returns the key identical requests share, or ``None`` if the
+            request must be sent on its own.
+        """
+        if not self.coalesce_requests or method != "GET":
+            return None
+        params = kwargs.get("params") or {}
+        return url, tuple(sorted(params.items()))
 
     @staticmethod
-    def _handle_response(response: requests.Response) -> dict:
+    def _is_last_page(response_data: Mapping, offset: int, page_size: int) -> bool:
+        """
+        :param offset: The number of transfers listed so far, including the
+            page's.
+        :return: Returns whether the page is the last one of the transfer
+            history.
+        """
+        transfers = response_data.get("data") or []
+        total = response_data.get("recordsTotal")
+        return len(transfers) < page_size or (total is not None and offset >= total)
+
+    def _check_circuit(self, endpoint: str) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_request(endpoint)
+
+    def _record_circuit(self, endpoint: str, status_code: Optional[int] = None) -> None:
+        """
+        Reports an attempt to the circuit breaker, a missing ``status_code``
+        meaning that the connection failed.
+        """
+        if self.circuit_breaker is None:
+            return
+        if status_code is None:
+            self.circuit_breaker.record_failure(endpoint)
+        else:
+            self.circuit_breaker.record_response(endpoint, status_code)
+
+    @staticmethod
+    def _error(
+        status_code: int, reason: str, url: str, text: str, response
+    ) -> WyreAPIError:
+        msg = f"{status_code} Error: {reason} for url {url}. Response Text: {text}"
+        return WyreAPIError(msg, response=response)
+
+
+class WyreAPI(BaseWyreAPI):
+    def __init__(
+        self,
+        api_token: str = "",
+        account_id: str = "",
+        api_url: str = TEST_BASE_URL,
+        connection_settings: Optional[ConnectionSettings] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        notify_url: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        coalesce_requests: bool = True,
+    ):
+        super().__init__(
+            api_token=api_token,
+            account_id=account_id,
+            api_url=api_url,
+            connection_settings=connection_settings,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            notify_url=notify_url,
+            instrumentation=instrumentation,
+            circuit_breaker=circuit_breaker,
+            coalesce_requests=coalesce_requests,
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update(**self.base_headers)
+        adapter = get_adapter(self.API_URL, self.connection_settings)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._in_flight_lock = threading.Lock()
+
+    @classmethod
+    def _handle_response(cls, response: requests.Response) -> dict:
         """
         Handle the Wyre's API response. In case the response is not
         successful, it raises a :class:`WyreAPIError`, otherwise it
-        returns the response's JSON.
+        returns the response's JSON, decoded by :func:`json_loads`.
 
         :return: Returns Wyre's API response's JSON.
         """
         if response.ok:
-            return response.json()
-        msg = f"{response.status_code} Error: {response.reason} for url {response.url}. Response Text: {response.text}"
-        raise WyreAPIError(msg, response=response)
+            return json_loads(response.content)
+        raise cls._error(
+            response.status_code, response.reason, response.url, response.text, response
+        )
+
+    def _request(
+        self, method: str, url: str, retryable: bool, endpoint: str = "", **kwargs
+    ) -> dict:
+        """
+        Sends the request, unless an identical GET is in flight, in which case
+        its outcome is waited for. Each waiter gets its own copy of the
+        response's JSON.
+
+        :return: Returns Wyre's API response's JSON.
+        """
+        key = self._coalescing_key(method, url, kwargs)
+        if key is None:
+            return self._send(method, url, retryable, endpoint, **kwargs)
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            return copy.deepcopy(future.result())
+        try:
+            response_data = self._send(method, url, retryable, endpoint, **kwargs)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(response_data)
+            return response_data
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[key]
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        retryable: bool,
+        endpoint: str = "",
+        recover: Optional[Recovery] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Sends the request through the session, throttling it and retrying it
+        when it is retryable.
 
-    def get_account(self) -> dict:
+        :param endpoint: The name the request is reported to the
+            instrumentation with.
+        :param recover: Called before each retry. If it returns the outcome
+            of a failed attempt, that is returned instead of retrying.
+        :return: Returns Wyre's API response's JSON.
+        """
+        send = getattr(self.session, method.lower())
+        instrumented = self.instrumentation.enabled
+        attempt = 0
+        while True:
+            if attempt and recover is not None:
+                recovered = recover()
+                if recovered is not None:
+                    return recovered
+            wait = self._rate_limit_wait()
+            if wait:
+                time.sleep(wait)
+            self._check_circuit(endpoint)
+            if instrumented:
+                self.instrumentation.before_request(endpoint, method, attempt)
+                started_at = time.perf_counter()
+            try:
+                response = send(url, **kwargs)
+            except Exception as exc:
+                if instrumented:
+                    self._record_attempt(
+                        endpoint, method, attempt, started_at, error=exc
+                    )
+                if not isinstance(exc, (requests.ConnectionError, requests.Timeout)):
+                    raise
+                self._record_circuit(endpoint)
+                wait = (
+                    self._retry_wait(url, attempt, reason=type(exc).__name__)
+                    if retryable
+                    else None
+                )
+                if wait is None:
+                    raise
+            else:
+                if instrumented:
+                    self._record_attempt(
+                        endpoint,
+                        method,
+                        attempt,
+                        started_at,
+                        status=response.status_code,
+                        bytes_sent=len(response.request.body or b""),
+                        bytes_received=len(response.content),
+                    )
+                self._record_circuit(endpoint, response.status_code)
+                wait = (
+                    self._retry_wait(
+                        url,
+                        attempt,
+                        status_code=response.status_code,
+                        retry_after=response.headers.get("Retry-After"),
+                    )
+                    if retryable and not response.ok
+                    else None
+                )
+                if wait is None:
+                    return self._handle_response(response)
+            time.sleep(wait)
+            attempt += 1
+
+    def get_account(self) -> Account:
         """
         Gets the Wyre's account information.
 
-        :return: Returns a dict containing the account data.
+        :return: Returns an :class:`Account` containing the account data.
         """
-        url = urljoin(self.API_URL, "v2/account")
-        response = self.session.get(url)
-        return self._handle_response(response)
+        url = self._url("v2/account")
+        return Account(
+            self._request("GET", url, retryable=True, endpoint="get_account")
+        )
 
-    def get_transfer_by_id(self, transfer_id: str) -> dict:
+    def get_transfer_by_id(self, transfer_id: str) -> Transfer:
         """
         Gets Wyre's transfer information by its id.
 
         :param: The transfer id.
-        :return: Returns a dict containing the transfer data.
+        :return: Returns a :class:`Transfer` containing the transfer data.
+        """
+        url = self._url(f"v3/transfers/{transfer_id}")
+        return Transfer(
+            self._request("GET", url, retryable=True, endpoint="get_transfer")
+        )
+
+    def get_transfers(self, offset: int = 0, limit: int = TRANSFERS_PAGE_SIZE) -> dict:
         """
-        url = urljoin(self.API_URL, f"v3/transfers/{transfer_id}")
-        response = self.session.get(url)
-        return self._handle_response(response)
+        Gets a page of the account's transfer history.
 
-    def create_transfer(self, transfer_data: TransferData) -> dict:
+        :param offset: The number of transfers to skip.
+        :param limit: The number of transfers in the page.
+        :return: Returns a dict containing the transfers in ``data`` and the
+            total number of transfers in ``recordsTotal``.
         """
-        Builds a transfer based on the given transfer data.
+        url = self._url("v3/transfers")
+        return self._request(
+            "GET",
+            url,
+            retryable=True,
+            endpoint="get_transfers",
+            params={"offset": offset, "limit": limit},
+        )
+
+    def list_transfers(
+        self, page_size: int = TRANSFERS_PAGE_SIZE, max_pages: Optional[int] = None
+    ) -> Iterator[Transfer]:
+        """
+        Lazily iterates over the account's transfer history, fetching a page
+        only once the previous one is consumed.
+
+        :param page_size: The number of transfers fetched per request.
+        :param max_pages: The maximum number of pages fetched, if any.
+        :return: Returns an iterator of :class:`Transfer` instances.
+        """
+        offset = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            response_data = self.get_transfers(offset=offset, limit=page_size)
+            pages += 1
+            transfers = response_data.get("data") or []
+            for transfer in transfers:
+                yield Transfer(transfer)
+            offset += len(transfers)
+            if self._is_last_page(response_data, offset, page_size):
+                return
+
+    def find_transfer(
+        self, custom_id: str, max_pages: int = CUSTOM_ID_LOOKUP_PAGES
+    ) -> Optional[Transfer]:
+        """
+        Looks for the transfer created with the given ``customId`` among the
+        latest transfers of the account's history.
+
+        :param custom_id: The idempotency key the transfer was created with.
+        :param max_pages: The maximum number of pages searched.
+        :return: Returns the :class:`Transfer`, or ``None`` if not found.
+        """
+        for transfer in self.list_transfers(max_pages=max_pages):
+            if transfer.custom_id == custom_id:
+                return transfer
+        return None
+
+    def create_transfer(self, transfer_data: TransferData) -> Transfer:
+        """
+        Builds a transfer based on the given transfer data. The request is
+        only retried if the transfer data carries an idempotency key, and
+        only if no transfer was created with that key in the meantime.
 
         :param: A :class:`TransferData` instance containing the transfer
         information.
-        :return: Returns a dict containing the Wyre's transfer data.
+        :return: Returns a :class:`Transfer` containing the Wyre's transfer
+            data.
         """
-        url = urljoin(self.API_URL, "v3/transfers")
-        data = {
-            "autoConfirm": True,
-            "source": f"account:{self.ACCOUNT_ID}",
-            "sourceCurrency": transfer_data.currency,
-            "sourceAmount": str(transfer_data.amount),
-            "dest": transfer_data.destination,
-            "destCurrency": transfer_data.currency,
-        }
-
-        response = self.session.post(url, json=data)
+        url = self._url("v3/transfers")
+        data = self._transfer_payload(transfer_data)
+        key = transfer_data.idempotency_key
 
-        return self._handle_response(response)
+        return Transfer.of(
+            self._request(
+                "POST",
+                url,
+                retryable=bool(key),
+                endpoint="create_transfer",
+                recover=(lambda: self.find_transfer(key)) if key else None,
+                json=data,
+            )
+        )
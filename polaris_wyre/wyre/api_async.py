@@ -0,0 +1,316 @@
+import asyncio
+import copy
+import json
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Hashable, Mapping, Optional
+
+import aiohttp
+
+from .api import (
+    CUSTOM_ID_LOOKUP_PAGES,
+    TEST_BASE_URL,
+    TRANSFERS_PAGE_SIZE,
+    BaseWyreAPI,
+)
+from .breaker import CircuitBreaker
+from .connection import ConnectionSettings
+from .dtos import Account, Transfer, TransferData, json_loads
+from .instrumentation import Instrumentation
+from .retry import RetryPolicy, TokenBucket
+
+AsyncRecovery = Callable[[], Awaitable[Optional[Mapping]]]
+
+
+class AsyncWyreAPI(BaseWyreAPI):
+    """
+    The asyncio counterpart of :class:`WyreAPI`, built on ``aiohttp``.
+
+    The underlying ``aiohttp.ClientSession`` is created on the first request,
+    so instances may be built outside of a running event loop. Call
+    :meth:`close` (or use the instance as an async context manager) once done.
+    The pool size and timeouts of ``connection_settings`` are applied to the
+    session; ``share_pool`` is ignored since sessions are bound to their loop.
+    """
+
+    def __init__(
+        self,
+        api_token: str = "",
+        account_id: str = "",
+        api_url: str = TEST_BASE_URL,
+        connection_settings: Optional[ConnectionSettings] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        notify_url: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        coalesce_requests: bool = True,
+    ):
+        super().__init__(
+            api_token=api_token,
+            account_id=account_id,
+            api_url=api_url,
+            connection_settings=connection_settings,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            notify_url=notify_url,
+            instrumentation=instrumentation,
+            circuit_breaker=circuit_breaker,
+            coalesce_requests=coalesce_requests,
+        )
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.base_headers,
+                connector=aiohttp.TCPConnector(
+                    limit=self.connection_settings.pool_maxsize,
+                    force_close=not self.connection_settings.keepalive,
+                ),
+                timeout=self.connection_settings.client_timeout(),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncWyreAPI":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def _request(
+        self, method: str, url: str, retryable: bool, endpoint: str = "", **kwargs
+    ) -> dict:
+        """
+        Sends the request, unless an identical GET is in flight, in which case
+        its outcome is awaited. The shared request runs in its own task, so
+        cancelling one of its waiters doesn't cancel it for the others.
+        """
+        key = self._coalescing_key(method, url, kwargs)
+        if key is None:
+            return await self._send(method, url, retryable, endpoint, **kwargs)
+        task = self._in_flight.get(key)
+        leader = task is None
+        if leader:
+            task = asyncio.ensure_future(
+                self._send(method, url, retryable, endpoint, **kwargs)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        response_data = await asyncio.shield(task)
+        return response_data if leader else copy.deepcopy(response_data)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        del self._in_flight[key]
+        # Marks the error as retrieved, in case every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        retryable: bool,
+        endpoint: str = "",
+        recover: Optional[AsyncRecovery] = None,
+        **kwargs,
+    ) -> dict:
+        instrumented = self.instrumentation.enabled
+        attempt = 0
+        while True:
+            if attempt and recover is not None:
+                recovered = await recover()
+                if recovered is not None:
+                    return recovered
+            wait = self._rate_limit_wait()
+            if wait:
+                await asyncio.sleep(wait)
+            self._check_circuit(endpoint)
+            if instrumented:
+                self.instrumentation.before_request(endpoint, method, attempt)
+                started_at = time.perf_counter()
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    body = await response.read()
+            except Exception as exc:
+                if instrumented:
+                    self._record_attempt(
+                        endpoint, method, attempt, started_at, error=exc
+                    )
+                if not isinstance(
+                    exc, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+                ):
+                    raise
+                self._record_circuit(endpoint)
+                wait = (
+                    self._retry_wait(url, attempt, reason=type(exc).__name__)
+                    if retryable
+                    else None
+                )
+                if wait is None:
+                    raise
+            else:
+                if instrumented:
+                    self._record_attempt(
+                        endpoint,
+                        method,
+                        attempt,
+                        started_at,
+                        status=response.status,
+                        bytes_sent=(
+                            len(json.dumps(kwargs["json"]).encode())
+                            if "json" in kwargs
+                            else 0
+                        ),
+                        bytes_received=len(body),
+                    )
+                self._record_circuit(endpoint, response.status)
+                wait = (
+                    self._retry_wait(
+                        url,
+                        attempt,
+                        status_code=response.status,
+                        retry_after=response.headers.get("Retry-After"),
+                    )
+                    if retryable and not response.ok
+                    else None
+                )
+                if wait is None:
+                    return self._handle_response(response, body)
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    @classmethod
+    def _handle_response(cls, response: aiohttp.ClientResponse, body: bytes) -> dict:
+        """
+        Handle the Wyre's API response. In case the response is not
+        successful, it raises a :class:`WyreAPIError`, otherwise it
+        returns the response's JSON, decoded by :func:`json_loads`.
+
+        :return: Returns Wyre's API response's JSON.
+        """
+        if response.ok:
+            return json_loads(body)
+        text = body.decode(response.get_encoding(), errors="replace")
+        raise cls._error(
+            response.status, response.reason, str(response.url), text, response
+        )
+
+    async def get_account(self) -> Account:
+        """
+        Gets the Wyre's account information.
+
+        :return: Returns an :class:`Account` containing the account data.
+        """
+        return Account(
+            await self._request(
+                "GET", self._url("v2/account"), retryable=True, endpoint="get_account"
+            )
+        )
+
+    async def get_transfer_by_id(self, transfer_id: str) -> Transfer:
+        """
+        Gets Wyre's transfer information by its id.
+
+        :param: The transfer id.
+        :return: Returns a :class:`Transfer` containing the transfer data.
+        """
+        return Transfer(
+            await self._request(
+                "GET",
+                self._url(f"v3/transfers/{transfer_id}"),
+                retryable=True,
+                endpoint="get_transfer",
+            )
+        )
+
+    async def get_transfers(
+        self, offset: int = 0, limit: int = TRANSFERS_PAGE_SIZE
+    ) -> dict:
+        """
+        Gets a page of the account's transfer history.
+
+        :param offset: The number of transfers to skip.
+        :param limit: The number of transfers in the page.
+        :return: Returns a dict containing the transfers in ``data`` and the
+            total number of transfers in ``recordsTotal``.
+        """
+        return await self._request(
+            "GET",
+            self._url("v3/transfers"),
+            retryable=True,
+            endpoint="get_transfers",
+            params={"offset": offset, "limit": limit},
+        )
+
+    async def list_transfers(
+        self, page_size: int = TRANSFERS_PAGE_SIZE, max_pages: Optional[int] = None
+    ) -> AsyncIterator[Transfer]:
+        """
+        Lazily iterates over the account's transfer history, fetching a page
+        only once the previous one is consumed.
+
+        :param page_size: The number of transfers fetched per request.
+        :param max_pages: The maximum number of pages fetched, if any.
+        :return: Returns an async iterator of :class:`Transfer` instances.
+        """
+        offset = 0
+        pages = 0
+        while max_pages is None or pages < max_pages:
+            response_data = await self.get_transfers(offset=offset, limit=page_size)
+            pages += 1
+            transfers = response_data.get("data") or []
+            for transfer in transfers:
+                yield Transfer(transfer)
+            offset += len(transfers)
+            if self._is_last_page(response_data, offset, page_size):
+                return
+
+    async def find_transfer(
+        self, custom_id: str, max_pages: int = CUSTOM_ID_LOOKUP_PAGES
+    ) -> Optional[Transfer]:
+        """
+        Looks for the transfer created with the given ``customId`` among the
+        latest transfers of the account's history.
+
+        :param custom_id: The idempotency key the transfer was created with.
+        :param max_pages: The maximum number of pages searched.
+        :return: Returns the :class:`Transfer`, or ``None`` if not found.
+        """
+        transfers = self.list_transfers(max_pages=max_pages)
+        try:
+            async for transfer in transfers:
+                if transfer.custom_id == custom_id:
+                    return transfer
+        finally:
+            await transfers.aclose()
+        return None
+
+    async def create_transfer(self, transfer_data: TransferData) -> Transfer:
+        """
+        Builds a transfer based on the given transfer data. The request is
+        only retried if the transfer data carries an idempotency key, and
+        only if no transfer was created with that key in the meantime.
+
+        :param: A :class:`TransferData` instance containing the transfer
+        information.
+        :return: Returns a :class:`Transfer` containing the Wyre's transfer
+            data.
+        """
+        key = transfer_data.idempotency_key
+        return Transfer.of(
+            await self._request(
+                "POST",
+                self._url("v3/transfers"),
+                retryable=bool(key),
+                endpoint="create_transfer",
+                recover=(lambda: self.find_transfer(key)) if key else None,
+                json=self._transfer_payload(transfer_data),
+            )
+        )
@@ -0,0 +1,154 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from polaris_wyre.helpers.exceptions import WyreCircuitOpenError
+from .cache import MISSING, LocalCacheBackend
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CircuitBreakerPolicy:
+    """
+    Describes when requests to a Wyre endpoint stop being sent.
+
+    The circuit of an endpoint opens after ``failure_threshold`` consecutive
+    failures, each within ``failure_window`` seconds of the previous one. A
+    failure is a connection error, a timeout or a response with one of
+    ``failure_statuses``. While open, requests fail right away. After
+    ``open_interval`` seconds the circuit is half-open: up to
+    ``half_open_probes`` requests are let through, the first success closing
+    the circuit and a failure opening it again.
+    """
+
+    failure_threshold: int = 5
+    failure_window: float = 60.0
+    open_interval: float = 30.0
+    half_open_probes: int = 1
+    failure_statuses: Tuple[int, ...] = (500, 502, 503, 504)
+
+    def __post_init__(self):
+        if self.failure_threshold < 1 or self.half_open_probes < 1:
+            raise ValueError("Failure threshold and half-open probes must be positive.")
+        if self.open_interval <= 0:
+            raise ValueError("Open interval must be positive.")
+
+
+class CircuitBreaker:
+    """
+    Keeps a circuit per Wyre endpoint, according to ``policy``.
+
+    The circuits are kept in ``backend``, a
+    :class:`~polaris_wyre.wyre.cache.LocalCacheBackend` by default. Use a
+    :class:`~polaris_wyre.wyre.cache.DjangoCacheBackend` to share them between
+    processes, so the failures seen by one worker open the circuit for all
+    of them. Updates from different processes aren't atomic, so the
+    thresholds are approximate when shared.
+    """
+
+    def __init__(self, policy: Optional[CircuitBreakerPolicy] = None, backend=None):
+        self.policy = policy or CircuitBreakerPolicy()
+        self.backend = backend if backend is not None else LocalCacheBackend()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(endpoint: str) -> str:
+        return f"circuit:{endpoint}"
+
+    def _get(self, endpoint: str) -> dict:
+        circuit = self.backend.get(self._key(endpoint))
+        return {} if circuit is MISSING else circuit
+
+    def _set(self, endpoint: str, circuit: dict, ttl: float) -> None:
+        self.backend.set(self._key(endpoint), circuit, ttl)
+
+    def state(self, endpoint: str) -> str:
+        """
+        :return: Returns ``"closed"``, ``"open"`` or ``"half-open"``.
+        """
+        opened_at = self._get(endpoint).get("opened_at")
+        if opened_at is None:
+            return "closed"
+        if time.time() < opened_at + self.policy.open_interval:
+            return "open"
+        return "half-open"
+
+    def before_request(self, endpoint: str) -> None:
+        """
+        Lets a request to ``endpoint`` through, or fails it.
+
+        :raises WyreCircuitOpenError: If the circuit is open, or half-open
+            with all its probes already sent.
+        """
+        with self._lock:
+            circuit = self._get(endpoint)
+            opened_at = circuit.get("opened_at")
+            if opened_at is None:
+                return
+            now = time.time()
+            half_opened_at = opened_at + self.policy.open_interval
+            if now < half_opened_at:
+                raise WyreCircuitOpenError(endpoint, half_opened_at - now)
+            # Probes that never reported back are given up on after another
+            # interval.
+            probes_at = circuit.get("probes_at") or half_opened_at
+            if now >= probes_at + self.policy.open_interval:
+                circuit["probes"], probes_at = 0, now
+            if circuit.get("probes", 0) >= self.policy.half_open_probes:
+                raise WyreCircuitOpenError(
+                    endpoint, probes_at + self.policy.open_interval - now
+                )
+            circuit["probes"] = circuit.get("probes", 0) + 1
+            circuit["probes_at"] = probes_at
+            self._set(endpoint, circuit, self._open_ttl)
+
+    def record_success(self, endpoint: str) -> None:
+        with self._lock:
+            circuit = self._get(endpoint)
+            if not circuit:
+                return
+            self.backend.delete(self._key(endpoint))
+            if circuit.get("opened_at") is not None:
+                logger.info("Wyre %s circuit closed.", endpoint)
+
+    def record_failure(self, endpoint: str) -> None:
+        with self._lock:
+            circuit = self._get(endpoint)
+            now = time.time()
+            if circuit.get("opened_at") is not None:
+                if now >= circuit["opened_at"] + self.policy.open_interval:
+                    self._open(endpoint, now)
+                return
+            failures = circuit.get("failures", 0) + 1
+            if failures >= self.policy.failure_threshold:
+                self._open(endpoint, now)
+            else:
+                self._set(endpoint, {"failures": failures}, self.policy.failure_window)
+
+    def record_response(self, endpoint: str, status_code: int) -> None:
+        if status_code in self.policy.failure_statuses:
+            self.record_failure(endpoint)
+        else:
+            self.record_success(endpoint)
+
+    def reset(self, endpoint: str) -> None:
+        """
+        Closes the circuit of ``endpoint``.
+        """
+        self.backend.delete(self._key(endpoint))
+
+    @property
+    def _open_ttl(self) -> float:
+        # Long enough to cover the open interval and the half-open probes.
+        return self.policy.open_interval * 3
+
+    def _open(self, endpoint: str, now: float) -> None:
+        self._set(endpoint, {"opened_at": now}, self._open_ttl)
+        logger.warning(
+            "Wyre %s circuit opened for %.0f seconds.",
+            endpoint,
+            self.policy.open_interval,
+        )
@@ -0,0 +1,115 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+MISSING = object()
+
+
+class LocalCacheBackend:
+    """
+    A thread-safe in-process cache backend.
+    """
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return MISSING
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class DjangoCacheBackend:
+    """
+    A cache backend on top of Django's cache framework, so that every process
+    configured with the same cache shares the cached values.
+
+    :param alias: The alias of the cache in the ``CACHES`` setting.
+    :param key_prefix: The prefix added to every cache key.
+    """
+
+    def __init__(self, alias: str = "default", key_prefix: str = "polaris_wyre"):
+        self.alias = alias
+        self.key_prefix = key_prefix
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+
+        return caches[self.alias]
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}:{key}"
+
+    def get(self, key: str) -> Any:
+        return self.cache.get(self._key(key), MISSING)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.cache.set(self._key(key), value, timeout=ttl)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(self._key(key))
+
+
+class TTLCache:
+    """
+    Caches values for ``ttl`` seconds in the given backend.
+
+    Concurrent misses for the same key are coalesced: only one thread calls
+    the loader while the others wait for its result, so an expired entry
+    doesn't cause a stampede of identical requests.
+
+    :param ttl: The seconds a loaded value is kept.
+    :param backend: A :class:`LocalCacheBackend` (the default) or a
+        :class:`DjangoCacheBackend`.
+    """
+
+    def __init__(self, ttl: float = 300.0, backend=None):
+        self.ttl = ttl
+        self.backend = backend if backend is not None else LocalCacheBackend()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._key_locks_lock = threading.Lock()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._key_locks_lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Gets the cached value of ``key``, calling ``loader`` to load it if it
+        is missing or expired.
+        """
+        value = self.backend.get(key)
+        if value is not MISSING:
+            return value
+        with self._key_lock(key):
+            value = self.backend.get(key)
+            if value is not MISSING:
+                return value
+            value = loader()
+            self.backend.set(key, value, self.ttl)
+            return value
+
+    def invalidate(self, key: str) -> None:
+        """
+        Removes ``key`` from the cache, so the next read loads it again.
+        """
+        self.backend.delete(key)
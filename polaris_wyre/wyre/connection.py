@@ -0,0 +1,102 @@
+import os
+import socket
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+import aiohttp
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+
+
+@dataclass(frozen=True)
+class ConnectionSettings:
+    """
+    Describes the HTTP connection pool used to reach Wyre's API.
+
+    ``pool_connections`` is the number of hosts kept in the pool and
+    ``pool_maxsize`` the number of connections kept per host; with
+    ``pool_block`` set, requests wait for a free connection instead of opening
+    a throwaway one. ``connect_timeout`` and ``read_timeout`` are applied to
+    every request that doesn't set its own timeout. ``keepalive`` enables TCP
+    keep-alive probes so idle pooled connections aren't silently dropped.
+    With ``share_pool`` set, every client built with the same settings and
+    API URL reuses the same pool.
+    """
+
+    pool_connections: int = 10
+    pool_maxsize: int = 10
+    pool_block: bool = False
+    connect_timeout: Optional[float] = 3.05
+    read_timeout: Optional[float] = 30.0
+    keepalive: bool = True
+    share_pool: bool = False
+
+    @property
+    def timeout(self) -> Tuple[Optional[float], Optional[float]]:
+        return self.connect_timeout, self.read_timeout
+
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(
+            sock_connect=self.connect_timeout, sock_read=self.read_timeout
+        )
+
+
+class WyreHTTPAdapter(HTTPAdapter):
+    """
+    A :class:`HTTPAdapter` that applies the :class:`ConnectionSettings` pool
+    size, default timeouts and TCP keep-alive.
+    """
+
+    def __init__(self, connection_settings: ConnectionSettings):
+        self.connection_settings = connection_settings
+        super().__init__(
+            pool_connections=connection_settings.pool_connections,
+            pool_maxsize=connection_settings.pool_maxsize,
+            pool_block=connection_settings.pool_block,
+        )
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        if self.connection_settings.keepalive:
+            pool_kwargs.setdefault(
+                "socket_options",
+                HTTPConnection.default_socket_options
+                + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)],
+            )
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        if timeout is None:
+            timeout = self.connection_settings.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+_shared_adapters: Dict[Tuple[str, ConnectionSettings], WyreHTTPAdapter] = {}
+_shared_adapters_lock = threading.Lock()
+
+
+def get_adapter(api_url: str, connection_settings: ConnectionSettings) -> HTTPAdapter:
+    """
+    Gets the adapter to mount on a client session. When the settings allow
+    it, the adapter (and so its connection pool) is shared by every client
+    pointing at the same API URL.
+    """
+    if not connection_settings.share_pool:
+        return WyreHTTPAdapter(connection_settings)
+    key = (api_url, connection_settings)
+    with _shared_adapters_lock:
+        adapter = _shared_adapters.get(key)
+        if adapter is None:
+            adapter = _shared_adapters[key] = WyreHTTPAdapter(connection_settings)
+        return adapter
+
+
+def _reset_shared_adapters() -> None:
+    # Pooled sockets must not be shared between a parent and a forked child.
+    global _shared_adapters_lock
+    _shared_adapters.clear()
+    _shared_adapters_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_shared_adapters)
@@ -1,5 +1,47 @@
+import copy
+import json
+from collections.abc import Mapping
 from dataclasses import dataclass
 from decimal import Decimal
+from types import MappingProxyType
+from typing import Any, Mapping as MappingType, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_loads(content: Union[bytes, str]) -> Any:
+    """
+    Decodes a JSON document with ``orjson``, when it is installed, or with
+    the standard library otherwise.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def to_decimal(value: Any) -> Optional[Decimal]:
+    """
+    Converts a JSON amount to a :class:`Decimal`. Floats are converted
+    through their shortest representation, which is how Wyre wrote them.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value)
+
+
+def to_decimals(amounts: Optional[dict]) -> MappingType[str, Decimal]:
+    """
+    Converts JSON amounts by currency into a read-only mapping of
+    :class:`Decimal`, since it is cached and shared by its model.
+    """
+    return MappingProxyType(
+        {currency: to_decimal(amount) for currency, amount in (amounts or {}).items()}
+    )
 
 
 @dataclass
@@ -7,3 +49,165 @@ class TransferData:
     currency: str
     amount: Decimal
     destination: str
+    idempotency_key: Optional[str] = None
+
+
+class lazy_field:
+    """
+    A field of a :class:`WyreModel` converted from the decoded JSON the first
+    time it is accessed, and kept in the model's ``_<name>`` slot afterwards.
+    """
+
+    def __init__(self, decode):
+        self.decode = decode
+        self.__doc__ = decode.__doc__
+
+    def __set_name__(self, owner, name):
+        self.slot = owner.__dict__[f"_{name}"]
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return self.slot.__get__(instance, owner)
+        except AttributeError:
+            value = self.decode(instance)
+            self.slot.__set__(instance, value)
+            return value
+
+
+class WyreModel(Mapping):
+    """
+    A typed view of a Wyre response. The response body is decoded as a
+    whole; only the conversion of typed fields, e.g. amounts into
+    :class:`Decimal`, is deferred to their first access. The decoded JSON is
+    still available through the mapping interface, e.g. ``model["status"]``,
+    so the models can be used wherever Wyre's dicts were.
+
+    The model's attributes can't be set, but the nested values returned by
+    the mapping interface, e.g. ``model["blockchainTx"]``, are the decoded
+    JSON itself and must not be modified. :meth:`to_dict` returns a copy that
+    can be.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: dict):
+        object.__setattr__(self, "_data", data)
+
+    @classmethod
+    def from_json(cls, content: Union[bytes, str]) -> "WyreModel":
+        return cls(json_loads(content))
+
+    @classmethod
+    def of(cls, data: Mapping) -> "WyreModel":
+        """
+        :return: Returns ``data`` if it is already a model of this class,
+            otherwise a model of this class wrapping it.
+        """
+        return data if isinstance(data, cls) else cls(data)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} attributes are read-only.")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} attributes are read-only.")
+
+    def __reduce__(self):
+        return type(self), (self._data,)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(id={self._data.get('id')!r})"
+
+    def to_dict(self) -> dict:
+        return copy.deepcopy(self._data)
+
+
+class Account(WyreModel):
+    """
+    A Wyre account, as returned by ``v2/account``.
+    """
+
+    __slots__ = ("_stellar_deposit_address", "_available_balances", "_total_balances")
+
+    @property
+    def id(self) -> str:
+        return self._data["id"]
+
+    @property
+    def status(self) -> Optional[str]:
+        return self._data.get("status")
+
+    @lazy_field
+    def stellar_deposit_address(self) -> Tuple[str, str]:
+        """The Stellar address and memo (user id) deposits are sent to."""
+        address, user_id = self._data["depositAddresses"]["XLM"].split(":")
+        return address, user_id
+
+    @lazy_field
+    def available_balances(self) -> MappingType[str, Decimal]:
+        """The available balance of each currency."""
+        return to_decimals(self._data.get("availableBalances"))
+
+    @lazy_field
+    def total_balances(self) -> MappingType[str, Decimal]:
+        """The total balance of each currency, including unavailable funds."""
+        return to_decimals(self._data.get("totalBalances"))
+
+
+class Transfer(WyreModel):
+    """
+    A Wyre transfer, as returned by ``v3/transfers``.
+    """
+
+    __slots__ = ("_source_amount", "_dest_amount")
+
+    @property
+    def id(self) -> str:
+        return self._data["id"]
+
+    @property
+    def status(self) -> Optional[str]:
+        return self._data.get("status")
+
+    @property
+    def custom_id(self) -> Optional[str]:
+        return self._data.get("customId")
+
+    @property
+    def source_currency(self) -> Optional[str]:
+        return self._data.get("sourceCurrency")
+
+    @property
+    def dest_currency(self) -> Optional[str]:
+        return self._data.get("destCurrency")
+
+    @property
+    def dest(self) -> Optional[str]:
+        return self._data.get("dest")
+
+    @property
+    def failure_reason(self) -> Optional[str]:
+        return self._data.get("failureReason")
+
+    @property
+    def network_tx_id(self) -> Optional[str]:
+        """The Stellar transaction hash, once the transfer is completed."""
+        return (self._data.get("blockchainTx") or {}).get("networkTxId")
+
+    @lazy_field
+    def source_amount(self) -> Optional[Decimal]:
+        return to_decimal(self._data.get("sourceAmount"))
+
+    @lazy_field
+    def dest_amount(self) -> Optional[Decimal]:
+        return to_decimal(self._data.get("destAmount"))
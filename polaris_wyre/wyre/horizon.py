@@ -0,0 +1,143 @@
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from polaris import settings as polaris_settings
+from stellar_sdk.client.requests_client import RequestsClient
+from stellar_sdk.exceptions import NotFoundError
+from stellar_sdk.server import Server
+
+from .instrumentation import NO_INSTRUMENTATION, Instrumentation, RequestEvent
+from .polling import PollingPolicy
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class HorizonSettings:
+    """
+    Describes the Horizon client used to fetch deposit transactions.
+
+    ``pool_size``, ``num_retries``, ``request_timeout`` and ``backoff_factor``
+    configure the underlying :class:`RequestsClient`. A transaction Wyre has
+    just reported may not be ingested by Horizon yet; while Horizon answers
+    with 404, the fetch is retried according to ``ingestion_policy``.
+    """
+
+    pool_size: int = 10
+    num_retries: int = 3
+    request_timeout: int = 11
+    backoff_factor: float = 0.5
+    ingestion_policy: PollingPolicy = field(
+        default_factory=lambda: PollingPolicy(
+            initial_delay=1.0, multiplier=1.5, max_interval=5.0, deadline=30.0
+        )
+    )
+
+
+class HorizonClient:
+    """
+    A long-lived Horizon client, created on first use and re-created in
+    forked processes so pooled connections are never shared between them.
+
+    :param horizon_settings: The :class:`HorizonSettings` of the client.
+    :param horizon_url: The Horizon URL, defaulting to Polaris'
+        ``HORIZON_URI`` setting.
+    :param instrumentation: The :class:`Instrumentation` every attempt to
+        fetch a transaction is reported to.
+    """
+
+    def __init__(
+        self,
+        horizon_settings: Optional[HorizonSettings] = None,
+        horizon_url: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
+        self.horizon_settings = horizon_settings or HorizonSettings()
+        self.horizon_url = horizon_url
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self._server: Optional[Server] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def server(self) -> Server:
+        with self._lock:
+            if self._server is None or self._pid != os.getpid():
+                self._server = Server(
+                    horizon_url=self.horizon_url or polaris_settings.HORIZON_URI,
+                    client=RequestsClient(
+                        pool_size=self.horizon_settings.pool_size,
+                        num_retries=self.horizon_settings.num_retries,
+                        request_timeout=self.horizon_settings.request_timeout,
+                        backoff_factor=self.horizon_settings.backoff_factor,
+                    ),
+                )
+                self._pid = os.getpid()
+            return self._server
+
+    def close(self) -> None:
+        with self._lock:
+            server, self._server = self._server, None
+        if server is not None and self._pid == os.getpid():
+            server.close()
+
+    def get_transaction(self, transaction_id: str) -> dict:
+        """
+        Gets the JSON body of Horizon's ``GET /transactions/:id`` response,
+        waiting for Horizon to ingest the transaction if needed.
+
+        :raises NotFoundError: if the transaction isn't ingested before the
+            ingestion policy's deadline.
+        """
+        policy = self.horizon_settings.ingestion_policy
+        intervals = policy.intervals()
+        started_at = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                return self._fetch_transaction(transaction_id, attempt)
+            except NotFoundError:
+                interval = policy.next_interval(
+                    intervals, time.monotonic() - started_at
+                )
+                if interval is None:
+                    raise
+                logger.debug(
+                    "Transaction %s not found on Horizon, retrying in %.2f seconds.",
+                    transaction_id,
+                    interval,
+                )
+                time.sleep(interval)
+                attempt += 1
+
+    def _fetch_transaction(self, transaction_id: str, attempt: int) -> dict:
+        call = self.server.transactions().transaction(transaction_id).call
+        if not self.instrumentation.enabled:
+            return call()
+        endpoint = "horizon.get_transaction"
+        self.instrumentation.before_request(endpoint, "GET", attempt)
+        started_at = time.perf_counter()
+        status, error = 200, None
+        try:
+            return call()
+        except NotFoundError:
+            status = 404
+            raise
+        except Exception as exc:
+            status, error = getattr(exc, "status", None), type(exc).__name__
+            raise
+        finally:
+            self.instrumentation.after_request(
+                RequestEvent(
+                    endpoint=endpoint,
+                    method="GET",
+                    retries=attempt,
+                    duration=time.perf_counter() - started_at,
+                    status=status,
+                    error=error,
+                )
+            )
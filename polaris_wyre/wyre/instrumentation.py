@@ -0,0 +1,193 @@
+import math
+import threading
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+POLL_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+SETTLE_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+@dataclass(frozen=True)
+class RequestEvent:
+    """
+    Describes an attempt of a request, each retry being a new attempt.
+
+    ``status`` is the response's status code, unset when no response was
+    received, in which case ``error`` names the exception raised. ``retries``
+    is the number of earlier attempts of the same request.
+    """
+
+    endpoint: str
+    method: str
+    retries: int
+    duration: float
+    status: Optional[int] = None
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    error: Optional[str] = None
+
+    @property
+    def outcome(self) -> str:
+        return str(self.status) if self.status is not None else self.error or ""
+
+
+class Instrumentation:
+    """
+    Receives the requests sent to Wyre and Horizon, and the transfers
+    settled by the integration. This base class ignores them; subclasses set
+    ``enabled`` and override the hooks. The clients skip timing and
+    measuring requests entirely while ``enabled`` is unset.
+    """
+
+    enabled = False
+
+    def before_request(self, endpoint: str, method: str, retries: int) -> None:
+        """
+        Called right before an attempt of a request is sent.
+        """
+
+    def after_request(self, event: RequestEvent) -> None:
+        """
+        Called once an attempt of a request got a response or failed.
+        """
+
+    def after_polling(self, polls: int, elapsed: float) -> None:
+        """
+        Called once a transfer stopped being polled, with the number of polls
+        and the seconds spent polling it.
+        """
+
+    def after_settling(self, status: str, duration: float) -> None:
+        """
+        Called once a transfer is recorded as ``COMPLETED`` or ``FAILED``,
+        with the seconds since it was created.
+        """
+
+
+NO_INSTRUMENTATION = Instrumentation()
+
+
+class Histogram:
+    """
+    Counts observed values in cumulative-friendly buckets, given by their
+    upper bounds, plus an implicit ``+Inf`` bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def percentile(self, percent: float) -> float:
+        """
+        Estimates a percentile as the upper bound of the bucket holding it,
+        which is ``inf`` when it falls past the last bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(percent / 100 * self.count), 1)
+        seen = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip(self.buckets + (math.inf,), self.counts)),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+class InMemoryInstrumentation(Instrumentation):
+    """
+    Keeps, per endpoint and method, a histogram of the request durations in
+    seconds, the outcomes (status codes or error names), the bytes sent and
+    received, the retries and the requests in flight. It also keeps
+    histograms of the polls per transfer and, per status, of the seconds
+    transfers took to settle.
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.durations: Dict[Tuple[str, str], Histogram] = {}
+            self.outcomes = Counter()
+            self.bytes_sent = Counter()
+            self.bytes_received = Counter()
+            self.retries = Counter()
+            self.in_flight = Counter()
+            self.polls = Histogram(POLL_BUCKETS)
+            self.settle_durations: Dict[str, Histogram] = {}
+
+    def before_request(self, endpoint: str, method: str, retries: int) -> None:
+        with self._lock:
+            self.in_flight[(endpoint, method)] += 1
+
+    def after_request(self, event: RequestEvent) -> None:
+        key = (event.endpoint, event.method)
+        with self._lock:
+            self.in_flight[key] -= 1
+            histogram = self.durations.get(key)
+            if histogram is None:
+                histogram = self.durations[key] = Histogram(self.buckets)
+            histogram.observe(event.duration)
+            self.outcomes[key + (event.outcome,)] += 1
+            self.bytes_sent[key] += event.bytes_sent
+            self.bytes_received[key] += event.bytes_received
+            if event.retries:
+                self.retries[key] += 1
+
+    def after_polling(self, polls: int, elapsed: float) -> None:
+        with self._lock:
+            self.polls.observe(polls)
+
+    def after_settling(self, status: str, duration: float) -> None:
+        with self._lock:
+            histogram = self.settle_durations.get(status)
+            if histogram is None:
+                histogram = self.settle_durations[status] = Histogram(SETTLE_BUCKETS)
+            histogram.observe(duration)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """
+        :return: Returns a dict mapping ``"<METHOD> <endpoint>"`` to the
+            endpoint's measures.
+        """
+        with self._lock:
+            snapshot = {}
+            for (endpoint, method), histogram in self.durations.items():
+                key = (endpoint, method)
+                snapshot[f"{method} {endpoint}"] = {
+                    "duration": histogram.snapshot(),
+                    "outcomes": {
+                        outcome: count
+                        for (*outcome_key, outcome), count in self.outcomes.items()
+                        if tuple(outcome_key) == key
+                    },
+                    "bytes_sent": self.bytes_sent[key],
+                    "bytes_received": self.bytes_received[key],
+                    "retries": self.retries[key],
+                    "in_flight": self.in_flight[key],
+                }
+            return snapshot
@@ -1,19 +1,113 @@
-from polaris import settings as polaris_settings
+import logging
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone as django_timezone
+from polaris import integrations
+from polaris.exceptions import TransactionSubmissionBlocked
 from polaris.models import Asset, Transaction
 from polaris.integrations import CustodyIntegration
+from polaris.utils import maybe_make_callback
+from polaris_wyre.helpers.exceptions import (
+    WyreCircuitOpenError,
+    WyreInsufficientBalanceError,
+    WyreTransferFailedError,
+    WyreTransferInProgressError,
+    WyreTransferTimeoutError,
+)
+from polaris_wyre.models import WyreTransfer
 from polaris_wyre.wyre.dtos import TransferData
+from requests.exceptions import RequestException
 from rest_framework.request import Request
-from stellar_sdk.server import Server
 
 from . import Wyre
+from .accounts import AccountPool, RoutingStrategy, WyreAccount
 from .api import TEST_BASE_URL
+from .breaker import CircuitBreaker
+from .cache import TTLCache
+from .connection import ConnectionSettings
+from .horizon import HorizonClient, HorizonSettings
+from .instrumentation import NO_INSTRUMENTATION, Instrumentation
+from .ledger import BalanceLedger
+from .memo import MemoAllocator
+from .polling import PollingPolicy
+from .retry import RetryPolicy, TokenBucket
+from .wyre import parse_transfer_status
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DepositResult:
+    """
+    The outcome of submitting one transaction with
+    :meth:`WyreIntegration.submit_deposit_transactions`.
+    """
+
+    transaction: Transaction
+    transfer_id: Optional[str] = None
+    stellar_transaction: Optional[dict] = None
+    error: Optional[Exception] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and self.stellar_transaction is not None
 
 
 class WyreIntegration(CustodyIntegration):
     def __init__(
-        self, api_token: str = "", account_id: str = "", api_url: str = TEST_BASE_URL
+        self,
+        api_token: str = "",
+        account_id: str = "",
+        api_url: str = TEST_BASE_URL,
+        polling_policy: Optional[PollingPolicy] = None,
+        connection_settings: Optional[ConnectionSettings] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        account_cache: Optional[TTLCache] = None,
+        memo_allocator: Optional[MemoAllocator] = None,
+        horizon_settings: Optional[HorizonSettings] = None,
+        notify_url: Optional[str] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        deferred_settlement: bool = False,
+        accounts: Optional[Sequence[WyreAccount]] = None,
+        routing: Optional[RoutingStrategy] = None,
+        balance_ledger: Optional[BalanceLedger] = None,
     ):
-        self.wyre = Wyre(api_token=api_token, account_id=account_id, api_url=api_url)
+        if accounts is None:
+            accounts = [WyreAccount(account_id=account_id, api_token=api_token)]
+        wyres = [
+            Wyre(
+                api_token=account.api_token,
+                account_id=account.account_id,
+                api_url=api_url,
+                polling_policy=polling_policy,
+                connection_settings=connection_settings,
+                retry_policy=retry_policy,
+                rate_limiter=account.rate_limiter or rate_limiter,
+                account_cache=account_cache,
+                poll_listener=self._record_polls,
+                notify_url=notify_url,
+                transfer_lookup=WyreTransfer.get_settled_transfer_data,
+                instrumentation=instrumentation,
+                circuit_breaker=circuit_breaker,
+            )
+            for account in accounts
+        ]
+        self.accounts = AccountPool(wyres, routing=routing, ledger=balance_ledger)
+        self.wyre = self.accounts.primary
+        self.memo_allocator = memo_allocator
+        self.deferred_settlement = deferred_settlement
+        self.instrumentation = instrumentation or NO_INSTRUMENTATION
+        self.horizon = HorizonClient(horizon_settings, instrumentation=instrumentation)
 
     def get_distribution_account(self, asset: Asset) -> str:
         """
@@ -62,9 +156,13 @@ class WyreIntegration(CustodyIntegration):
         """
         stellar_account_address, user_id = self.wyre.get_account()
         transaction.receiving_anchor_account = stellar_account_address
-        # TODO: Find a way to let the memo unique when integrating with Wyre
         transaction.memo_type = Transaction.MEMO_TYPES.text
-        transaction.memo = user_id
+        if self.memo_allocator is not None:
+            transaction.memo = self.memo_allocator.allocate(transaction)
+        else:
+            # Wyre credits payments to the account by its own memo (the user
+            # id), so the memo is only unique when a memo allocator is set.
+            transaction.memo = user_id
         transaction.save()
 
     def submit_deposit_transaction(
@@ -82,26 +180,573 @@ class WyreIntegration(CustodyIntegration):
         If ``self.claimable_balances_supported`` is ``False``, this method will only
         be called when the destination account exists and has a trustline to
         ``Transaction.asset``.
+        With ``deferred_settlement``, this method only creates the Wyre transfer
+        and raises ``TransactionSubmissionBlocked``, so Polaris moves on right
+        away; :meth:`advance_transfers` then completes the transaction once the
+        transfer settles.
         :param transaction: the ``Transaction`` object representing the Stellar
             transaction that should be submitted to the network
         :param has_trustline: whether or not the destination account has a trustline
             for the requested asset
         """
+        transfer_data = self._build_transfer_data(transaction)
+        wyre_transfer, created = self._create_transfer(transaction, transfer_data)
+        if self.deferred_settlement:
+            return self._defer_settlement(wyre_transfer)
+        transfer_id = wyre_transfer.transfer_id
+        wyre = self.accounts.get(wyre_transfer.account_id)
+        try:
+            with self.accounts.hold(wyre_transfer.account_id):
+                transaction_id = wyre.get_stellar_transaction_id(transfer_id)
+        except WyreTransferFailedError:
+            wyre_transfer.mark_failed()
+            # Only the call that created the transfer reserved its amount.
+            if created:
+                self.accounts.refund(wyre_transfer.account_id, transfer_data)
+            self._record_settled(wyre_transfer)
+            raise
+        wyre_transfer.mark_completed(transaction_id)
+        self._record_settled(wyre_transfer)
+
+        return self.horizon.get_transaction(transaction_id)
+
+    def submit_deposit_transactions(
+        self,
+        transactions: Iterable[Transaction],
+        max_concurrency: int = 8,
+    ) -> List[DepositResult]:
+        """
+        Submit many transactions at once. The Wyre transfers are created
+        concurrently, at most `max_concurrency` at a time, and then waited on
+        together: each polling round checks the updates pushed by Wyre first
+        and reads the rest from the account's transfer history, a request per
+        page instead of a request per transfer. The Horizon transactions are
+        fetched concurrently as well.
+        Database access stays in the calling thread; only the requests to Wyre
+        and Horizon run in the worker threads.
+        A failure only affects its own transaction, and is returned in its
+        result instead of being raised.
+        :param transactions: the ``Transaction`` objects to submit
+        :param max_concurrency: the maximum number of concurrent requests
+        :return: a :class:`DepositResult` per transaction, in the same order
+        """
+        results = [
+            DepositResult(transaction=transaction) for transaction in transactions
+        ]
+        with ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="wyre-deposit"
+        ) as executor:
+            wyre_transfers, created = self._create_transfers(results, executor)
+
+            pending = {}
+            for index, wyre_transfer in wyre_transfers.items():
+                if results[index].error is None:
+                    results[index].transfer_id = wyre_transfer.transfer_id
+                    pending[wyre_transfer.transfer_id] = index
+            completed = self._wait_for_transfers(
+                pending, wyre_transfers, results, created
+            )
+
+            fetches = {
+                executor.submit(self.horizon.get_transaction, transaction_id): index
+                for index, transaction_id in completed.items()
+            }
+            for future in as_completed(fetches):
+                index = fetches[future]
+                try:
+                    results[index].stellar_transaction = future.result()
+                except Exception as error:
+                    results[index].error = error
+        return results
+
+    def _create_transfers(
+        self, results: List[DepositResult], executor: ThreadPoolExecutor
+    ) -> Tuple[Dict[int, WyreTransfer], Set[int]]:
+        """
+        Create the Wyre transfers of the results' transactions that don't have
+        one yet. Like in :meth:`_create_transfer`, the rows of their
+        idempotency keys are locked while the transfers are created, so
+        another submission of the same transactions can't create them again.
+        Rows already locked by another submission are skipped, with a
+        :class:`WyreTransferInProgressError` as their result's error. The
+        transfers of rows left by a failed creation are looked up first.
+        :return: the transfers by result index, and the indexes of the
+            transfers created by this call
+        """
+        transfer_datas = {
+            index: self._build_transfer_data(result.transaction)
+            for index, result in enumerate(results)
+        }
+        wyre_transfers: Dict[int, WyreTransfer] = {}
+        created = set()
+        refresh_error = self._refresh_balances()
+        with db_transaction.atomic():
+            for index, transfer_data in transfer_datas.items():
+                WyreTransfer.objects.get_or_create(
+                    idempotency_key=transfer_data.idempotency_key,
+                    defaults={"transaction": results[index].transaction},
+                )
+            locked = {
+                wyre_transfer.idempotency_key: wyre_transfer
+                for wyre_transfer in WyreTransfer.objects.select_for_update(
+                    skip_locked=True
+                ).filter(
+                    idempotency_key__in=[
+                        transfer_data.idempotency_key
+                        for transfer_data in transfer_datas.values()
+                    ]
+                )
+            }
+
+            lookups = {}
+            for index, transfer_data in transfer_datas.items():
+                # A transaction given twice is only submitted once.
+                wyre_transfer = locked.pop(transfer_data.idempotency_key, None)
+                if wyre_transfer is None:
+                    results[index].error = WyreTransferInProgressError(
+                        results[index].transaction.id
+                    )
+                    continue
+                wyre_transfers[index] = wyre_transfer
+                if wyre_transfer.transfer_id is None:
+                    future = executor.submit(
+                        self._find_transfer,
+                        wyre_transfer.account_id,
+                        wyre_transfer.idempotency_key,
+                    )
+                    lookups[future] = index
+
+            creations = {}
+            for future in as_completed(lookups):
+                index = lookups[future]
+                wyre_transfer = wyre_transfers[index]
+                try:
+                    wyre_transfer.transfer_id = future.result()
+                except Exception as error:
+                    results[index].error = error
+                    continue
+                if wyre_transfer.transfer_id is not None:
+                    wyre_transfer.save(update_fields=["transfer_id", "updated_at"])
+                    continue
+                transfer_data = transfer_datas[index]
+                try:
+                    account_id = self._acquire_account(transfer_data, refresh_error)
+                except Exception as error:
+                    results[index].error = error
+                    continue
+                self._mark_attempted(wyre_transfer, account_id)
+                future = executor.submit(
+                    self.accounts.get(account_id).create_transfer, transfer_data
+                )
+                creations[future] = index, account_id, transfer_data
+
+            for future in as_completed(creations):
+                index, account_id, transfer_data = creations[future]
+                self.accounts.release(account_id)
+                try:
+                    transfer_id = future.result()
+                except Exception as error:
+                    self.accounts.refund(account_id, transfer_data)
+                    results[index].error = error
+                    continue
+                wyre_transfer = wyre_transfers[index]
+                wyre_transfer.transfer_id = transfer_id
+                wyre_transfer.save(update_fields=["transfer_id", "updated_at"])
+                created.add(index)
+        return wyre_transfers, created
+
+    def _wait_for_transfers(
+        self,
+        pending: Dict[str, int],
+        wyre_transfers: Dict[int, WyreTransfer],
+        results: List[DepositResult],
+        created: Set[int],
+    ) -> Dict[int, str]:
+        """
+        Poll the pending transfers, keyed by transfer id, in rounds until they
+        are all settled or the polling policy's deadline is reached. The
+        amounts of the failed transfers in `created` are refunded to the
+        balance ledger. A transfer whose status couldn't be fetched is polled
+        again next round; if the deadline is reached first, its result gets
+        the fetch error.
+        :return: the Stellar transaction ids of the completed transfers, keyed
+            by result index
+        """
+        policy = self.wyre.polling_policy
+        intervals = policy.intervals()
+        started_at = time.monotonic()
+        completed = {}
+        polls = 0
+        errors = {}
+        while pending:
+            polls += 1
+            transfer_accounts = {
+                transfer_id: wyre_transfers[index].account_id
+                for transfer_id, index in pending.items()
+            }
+            errors.clear()
+            for transfer_id, transfer_data in self._get_transfers(
+                transfer_accounts, errors=errors
+            ).items():
+                index = pending[transfer_id]
+                try:
+                    transaction_id = parse_transfer_status(transfer_data)
+                except WyreTransferFailedError as error:
+                    wyre_transfers[index].mark_failed()
+                    if index in created:
+                        self._refund(wyre_transfers[index])
+                    self._record_settled(wyre_transfers[index])
+                    results[index].error = error
+                else:
+                    if transaction_id is None:
+                        continue
+                    wyre_transfers[index].mark_completed(transaction_id)
+                    self._record_settled(wyre_transfers[index])
+                    completed[index] = transaction_id
+                del pending[transfer_id]
+                self._finish_polling(transfer_id, polls, started_at)
+            if not pending:
+                break
+
+            elapsed = time.monotonic() - started_at
+            interval = policy.next_interval(intervals, elapsed)
+            if interval is None:
+                for transfer_id, index in pending.items():
+                    results[index].error = errors.get(
+                        transfer_id
+                    ) or WyreTransferTimeoutError(transfer_id, polls, elapsed)
+                    self._finish_polling(transfer_id, polls, started_at)
+                break
+            time.sleep(interval)
+        return completed
+
+    def _defer_settlement(self, wyre_transfer: WyreTransfer) -> dict:
+        """
+        Leave the transfer to :meth:`advance_transfers`, unless it already
+        settled the transaction, e.g. when Polaris submits an unblocked
+        transaction again.
+        """
+        if (
+            wyre_transfer.status == WyreTransfer.STATUS.COMPLETED
+            and wyre_transfer.next_poll_at is None
+        ):
+            return self.horizon.get_transaction(wyre_transfer.network_tx_id)
+        if wyre_transfer.next_poll_at is None:
+            wyre_transfer.schedule_poll(self.wyre.polling_policy.interval_after(0))
+        raise TransactionSubmissionBlocked(
+            f"Wyre transfer {wyre_transfer.transfer_id} is settling."
+        )
+
+    def advance_transfers(
+        self, batch_size: int = 100, max_concurrency: int = 8, lease: float = 60.0
+    ) -> Counter:
+        """
+        Advance a batch of the transfers submitted with deferred settlement
+        whose next poll is due. Their statuses are read like in
+        :meth:`submit_deposit_transactions`. Pending transfers are polled again
+        according to the polling policy, which has no deadline here. Settled
+        transfers complete or fail their Polaris transaction.
+        The batch is claimed for `lease` seconds, so concurrent workers don't
+        advance the same transfers. A transfer whose status or Horizon
+        transaction couldn't be fetched is retried once the lease expires.
+        :param batch_size: the maximum number of transfers advanced
+        :param max_concurrency: the maximum number of concurrent Horizon requests
+        :param lease: the seconds the batch is claimed for
+        :return: the number of transfers by outcome: ``completed``, ``failed``,
+            ``pending`` or ``error``
+        """
+        outcomes = Counter()
+        wyre_transfers = {
+            wyre_transfer.transfer_id: wyre_transfer
+            for wyre_transfer in WyreTransfer.claim_due(batch_size, lease)
+        }
+        if not wyre_transfers:
+            return outcomes
+
+        errors = {}
+        found = self._get_transfers(
+            {
+                transfer_id: wyre_transfer.account_id
+                for transfer_id, wyre_transfer in wyre_transfers.items()
+            },
+            errors=errors,
+        )
+        WyreTransfer.objects.filter(transfer_id__in=found).update(
+            polls=F("polls") + 1, last_polled_at=django_timezone.now()
+        )
+        completed = {}
+        for transfer_id, wyre_transfer in wyre_transfers.items():
+            if transfer_id in errors:
+                logger.warning(
+                    "Could not get Wyre transfer %s: %s",
+                    transfer_id,
+                    errors[transfer_id],
+                )
+                outcomes["error"] += 1
+                continue
+            wyre_transfer.polls += 1
+            try:
+                network_tx_id = parse_transfer_status(found[transfer_id])
+            except WyreTransferFailedError as error:
+                # The amount was reserved in the ledger of the process that
+                # created the transfer, which sees it back at its next refresh.
+                with db_transaction.atomic():
+                    wyre_transfer.mark_failed()
+                    fail_deposit(wyre_transfer.transaction, str(error))
+                self._finish_deferred(wyre_transfer)
+                outcomes["failed"] += 1
+                continue
+            if network_tx_id is None:
+                wyre_transfer.mark_pending(
+                    self.wyre.polling_policy.interval_after(wyre_transfer.polls)
+                )
+                outcomes["pending"] += 1
+            else:
+                completed[transfer_id] = network_tx_id
+        if not completed:
+            return outcomes
+
+        with ThreadPoolExecutor(
+            max_workers=min(max_concurrency, len(completed)),
+            thread_name_prefix="wyre-advance",
+        ) as executor:
+            fetches = {
+                executor.submit(
+                    self.horizon.get_transaction, network_tx_id
+                ): transfer_id
+                for transfer_id, network_tx_id in completed.items()
+            }
+            for future in as_completed(fetches):
+                wyre_transfer = wyre_transfers[fetches[future]]
+                try:
+                    transaction_json = future.result()
+                except Exception:
+                    logger.exception(
+                        "Could not get the Stellar transaction of Wyre transfer %s",
+                        wyre_transfer.transfer_id,
+                    )
+                    outcomes["error"] += 1
+                    continue
+                with db_transaction.atomic():
+                    wyre_transfer.mark_completed(completed[wyre_transfer.transfer_id])
+                    complete_deposit(wyre_transfer.transaction, transaction_json)
+                self._finish_deferred(wyre_transfer)
+                outcomes["completed"] += 1
+        return outcomes
+
+    def _finish_deferred(self, wyre_transfer: WyreTransfer) -> None:
+        transaction = wyre_transfer.transaction
+        self._record_settled(wyre_transfer)
+        self.instrumentation.after_polling(
+            wyre_transfer.polls,
+            (wyre_transfer.completed_at - wyre_transfer.created_at).total_seconds(),
+        )
+        maybe_make_callback(transaction)
+        if transaction.status != Transaction.STATUS.completed:
+            return
+        try:
+            integrations.registered_deposit_integration.after_deposit(transaction)
+        except NotImplementedError:
+            pass
+        except Exception:
+            logger.exception("after_deposit() threw an unexpected exception")
+
+    def _get_transfers(
+        self,
+        transfer_accounts: Dict[str, Optional[str]],
+        errors: Optional[dict] = None,
+    ) -> Dict[str, dict]:
+        """
+        Get the data of the transfers, preferring the updates pushed by Wyre,
+        then the transfer history of their accounts and only then a request
+        per transfer for those not found in the history. If the history can't
+        be listed, all the account's transfers are requested one by one.
+        :param transfer_accounts: the account id of each transfer, by
+            transfer id
+        :param errors: if given, the errors of the requests per transfer are
+            saved in it by transfer id instead of being raised
+        """
+        found = {}
+        missing = defaultdict(list)
+        for transfer_id, account_id in transfer_accounts.items():
+            transfer_data = self.wyre.notifier.get(
+                transfer_id
+            ) or WyreTransfer.get_settled_transfer_data(transfer_id)
+            if transfer_data is None:
+                missing[account_id].append(transfer_id)
+            else:
+                found[transfer_id] = transfer_data
+        for account_id, transfer_ids in missing.items():
+            try:
+                wyre = self.accounts.get(account_id)
+            except KeyError as error:
+                if errors is None:
+                    raise
+                errors.update(dict.fromkeys(transfer_ids, error))
+                continue
+            try:
+                found.update(wyre.sync_statuses(transfer_ids))
+            except (RequestException, WyreCircuitOpenError) as error:
+                logger.warning(
+                    "Could not list the transfers of Wyre account %s: %s",
+                    account_id or wyre.wyre_api.ACCOUNT_ID,
+                    error,
+                )
+            for transfer_id in transfer_ids:
+                if transfer_id in found:
+                    continue
+                try:
+                    found[transfer_id] = wyre.wyre_api.get_transfer_by_id(transfer_id)
+                except Exception as error:
+                    if errors is None:
+                        raise
+                    errors[transfer_id] = error
+        return found
+
+    def _finish_polling(self, transfer_id: str, polls: int, started_at: float):
+        self.wyre.notifier.discard(transfer_id)
+        self._record_polls(transfer_id, polls, time.monotonic() - started_at)
+
+    def _refresh_balances(self) -> Optional[Exception]:
+        """
+        Refresh the stale balances of the ledger. It is called before the
+        transfers' rows are locked, so the requests to Wyre don't hold the
+        locks or the database transaction.
+        :return: the error of the refresh, which is only raised by
+            :meth:`_acquire_account` since a reused transfer doesn't need it
+        """
+        try:
+            self.accounts.refresh_balances()
+        except Exception as error:
+            return error
+        return None
+
+    def _acquire_account(
+        self, transfer_data: TransferData, refresh_error: Optional[Exception] = None
+    ) -> str:
+        """
+        Choose the account of a new transfer. A transfer the balance ledger
+        can't cover fails, or blocks its transaction if the ledger defers
+        overdrafts.
+        """
+        if refresh_error is not None:
+            raise refresh_error
+        try:
+            return self.accounts.acquire(transfer_data)
+        except WyreInsufficientBalanceError as error:
+            if self.accounts.ledger.defer_overdrafts:
+                raise TransactionSubmissionBlocked(str(error)) from error
+            raise
+
+    def _refund(self, wyre_transfer: WyreTransfer) -> None:
+        self.accounts.refund(
+            wyre_transfer.account_id,
+            self._build_transfer_data(wyre_transfer.transaction),
+        )
+
+    def _build_transfer_data(self, transaction: Transaction) -> TransferData:
         amount = round(
             transaction.amount_in - transaction.amount_fee,
             transaction.asset.significant_decimals,
         )
-        transfer_data = TransferData(
+        return TransferData(
             currency=transaction.asset.code,
             amount=amount,
             destination=f"stellar:{transaction.to_address}",
+            idempotency_key=self.get_idempotency_key(transaction),
         )
 
-        transfer_id = self.wyre.create_transfer(transfer_data)
-        transaction_id = self.wyre.get_stellar_transaction_id(transfer_id)
+    @staticmethod
+    def get_idempotency_key(transaction: Transaction) -> str:
+        """
+        Return the idempotency key of the Wyre transfer settling `transaction`.
+        """
+        return f"polaris:{transaction.id}"
+
+    def _create_transfer(
+        self, transaction: Transaction, transfer_data: TransferData
+    ) -> Tuple[WyreTransfer, bool]:
+        """
+        Create the Wyre transfer unless one was already created with the same
+        idempotency key, in which case the recorded transfer is returned
+        without calling Wyre. The key's row is locked while the transfer is
+        created, so concurrent submissions of the same transaction don't
+        create it twice. The row is kept if the creation fails, so the next
+        submission looks the transfer up before creating it again.
+        :return: the transfer, and whether this call created it
+        """
+        defaults = {"transaction": transaction}
+        if self.deferred_settlement:
+            # Scheduled along with the creation, so a transfer settled by a
+            # callback before the submission returns is still advanced.
+            defaults.update(
+                status=WyreTransfer.STATUS.CREATED,
+                next_poll_at=django_timezone.now()
+                + timedelta(seconds=self.wyre.polling_policy.interval_after(0)),
+            )
+        created = False
+        creation_error = None
+        refresh_error = self._refresh_balances()
+        with db_transaction.atomic():
+            wyre_transfer, _ = WyreTransfer.objects.select_for_update().get_or_create(
+                idempotency_key=transfer_data.idempotency_key, defaults=defaults
+            )
+            if wyre_transfer.transfer_id is None:
+                wyre_transfer.transfer_id = self._find_transfer(
+                    wyre_transfer.account_id, wyre_transfer.idempotency_key
+                )
+            if wyre_transfer.transfer_id is None:
+                account_id = self._acquire_account(transfer_data, refresh_error)
+                self._mark_attempted(wyre_transfer, account_id)
+                try:
+                    wyre = self.accounts.get(account_id)
+                    wyre_transfer.transfer_id = wyre.create_transfer(transfer_data)
+                    created = True
+                except Exception as error:
+                    self.accounts.refund(account_id, transfer_data)
+                    # Raised once the attempt is committed.
+                    creation_error = error
+                finally:
+                    self.accounts.release(account_id)
+            if wyre_transfer.transfer_id is not None:
+                wyre_transfer.save(update_fields=["transfer_id", "updated_at"])
+        if creation_error is not None:
+            raise creation_error
+        return wyre_transfer, created
 
-        with Server(horizon_url=polaris_settings.HORIZON_URI) as server:
-            return server.transactions().transaction(transaction_id).call()
+    @staticmethod
+    def _mark_attempted(wyre_transfer: WyreTransfer, account_id: str) -> None:
+        """
+        Record the account of a transfer about to be created, which also marks
+        the creation as attempted: if no response is received, the transfer
+        may still exist at Wyre.
+        """
+        wyre_transfer.account_id = account_id
+        wyre_transfer.save(update_fields=["account_id", "updated_at"])
+
+    def _find_transfer(
+        self, account_id: Optional[str], idempotency_key: str
+    ) -> Optional[str]:
+        """
+        Look up the transfer of an attempted creation that got no transfer id,
+        by its idempotency key, Wyre's ``customId``. Creations that were never
+        attempted have no account and aren't looked up.
+        :return: the id of the transfer, if Wyre created it
+        """
+        if account_id is None:
+            return None
+        transfer = self.accounts.get(account_id).wyre_api.find_transfer(idempotency_key)
+        return None if transfer is None else transfer.id
+
+    def _record_polls(self, transfer_id: str, polls: int, elapsed: float) -> None:
+        WyreTransfer.record_polls(transfer_id, polls)
+        self.instrumentation.after_polling(polls, elapsed)
+
+    def _record_settled(self, wyre_transfer: WyreTransfer) -> None:
+        duration = wyre_transfer.completed_at - wyre_transfer.created_at
+        self.instrumentation.after_settling(
+            wyre_transfer.status, duration.total_seconds()
+        )
 
     def create_destination_account(self, transaction: Transaction) -> dict:
         """
@@ -143,3 +788,45 @@ class WyreIntegration(CustodyIntegration):
         accounts not in custody by the provider, ``False`` otherwise.
         """
         return False
+
+
+def complete_deposit(transaction: Transaction, transaction_json: dict) -> None:
+    """
+    Complete a deposit the way Polaris does once its Stellar transaction was
+    submitted, for deposits settled by :meth:`WyreIntegration.advance_transfers`.
+    """
+    if not transaction_json.get("successful", True):
+        fail_deposit(
+            transaction,
+            "transaction submission failed unexpectedly: "
+            f"{transaction_json.get('result_xdr')}",
+        )
+        return
+    transaction.paging_token = transaction_json["paging_token"]
+    transaction.stellar_transaction_id = transaction_json["id"]
+    transaction.status = Transaction.STATUS.completed
+    if hasattr(Transaction, "SUBMISSION_STATUS"):
+        transaction.submission_status = Transaction.SUBMISSION_STATUS.completed
+    transaction.completed_at = datetime.now(timezone.utc)
+    transaction.status_message = None
+    transaction.queue = None
+    transaction.queued_at = None
+    if not transaction.quote:
+        transaction.amount_out = round(
+            Decimal(transaction.amount_in) - Decimal(transaction.amount_fee),
+            transaction.asset.significant_decimals,
+        )
+    transaction.save()
+
+
+def fail_deposit(transaction: Transaction, message: str) -> None:
+    """
+    Mark a deposit whose Wyre transfer failed as errored.
+    """
+    transaction.status = Transaction.STATUS.error
+    if hasattr(Transaction, "SUBMISSION_STATUS"):
+        transaction.submission_status = Transaction.SUBMISSION_STATUS.failed
+    transaction.status_message = message
+    transaction.queue = None
+    transaction.queued_at = None
+    transaction.save()
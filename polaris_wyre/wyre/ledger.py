@@ -0,0 +1,73 @@
+import threading
+import time
+from decimal import Decimal
+from typing import Dict, Mapping
+
+from polaris_wyre.helpers.exceptions import WyreInsufficientBalanceError
+
+
+class BalanceLedger:
+    """
+    A local view of the available balance of each currency of Wyre accounts,
+    so transfers the accounts can't cover are rejected before being sent.
+
+    The balances of an account are seeded from ``v2/account`` and seeded
+    again every ``refresh_interval`` seconds. In between, the amount of each
+    transfer is reserved before it is created, and returned if its creation
+    fails or the transfer fails. The view is only kept in this process, and
+    transfers settling around a refresh may be counted twice, so it is
+    approximate between refreshes.
+
+    :param defer_overdrafts: Whether the integration blocks the transactions
+        that would overdraw the accounts, so they can be unblocked once the
+        accounts are funded, instead of failing them.
+    """
+
+    def __init__(self, refresh_interval: float = 60.0, defer_overdrafts: bool = False):
+        if refresh_interval <= 0:
+            raise ValueError("Balance refresh interval must be positive.")
+        self.refresh_interval = refresh_interval
+        self.defer_overdrafts = defer_overdrafts
+        self._balances: Dict[str, Dict[str, Decimal]] = {}
+        self._seeded_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def is_stale(self, account_id: str) -> bool:
+        seeded_at = self._seeded_at.get(account_id)
+        return (
+            seeded_at is None or time.monotonic() - seeded_at >= self.refresh_interval
+        )
+
+    def seed(self, account_id: str, balances: Mapping[str, Decimal]) -> None:
+        """
+        Replaces the account's balances with the ones reported by Wyre.
+        """
+        with self._lock:
+            self._balances[account_id] = {
+                currency: Decimal(amount or 0) for currency, amount in balances.items()
+            }
+            self._seeded_at[account_id] = time.monotonic()
+
+    def available(self, account_id: str, currency: str) -> Decimal:
+        return self._balances.get(account_id, {}).get(currency, Decimal(0))
+
+    def reserve(self, account_id: str, currency: str, amount: Decimal) -> None:
+        """
+        Takes ``amount`` from the account's balance of ``currency``.
+
+        :raises WyreInsufficientBalanceError: If the balance can't cover it.
+        """
+        with self._lock:
+            available = self.available(account_id, currency)
+            if available < amount:
+                raise WyreInsufficientBalanceError(currency, amount, available)
+            self._balances.setdefault(account_id, {})[currency] = available - amount
+
+    def release(self, account_id: str, currency: str, amount: Decimal) -> None:
+        """
+        Returns a reserved ``amount`` to the account's balance of ``currency``.
+        """
+        with self._lock:
+            self._balances.setdefault(account_id, {})[currency] = (
+                self.available(account_id, currency) + amount
+            )
@@ -0,0 +1,72 @@
+import base64
+import hashlib
+from typing import Optional
+
+from django.db import IntegrityError, transaction as db_transaction
+from polaris.models import Transaction
+
+from polaris_wyre.models import WyreMemo
+
+MAX_TEXT_MEMO_LENGTH = 28
+
+
+class MemoAllocator:
+    """
+    Allocates a unique text memo to each Polaris transaction and records it
+    in the unique-indexed :class:`WyreMemo` table, so an incoming payment is
+    matched to its transaction with a single indexed lookup.
+
+    Memos are ``prefix`` followed by ``length`` base32 characters of the
+    SHA-256 hash of the transaction id. On the (unlikely) collision with a
+    memo already allocated, the hash is salted and computed again.
+
+    :param prefix: A prefix added to every memo.
+    :param length: The number of hash characters in each memo.
+    :param max_attempts: The number of salted candidates tried before giving
+        up.
+    """
+
+    def __init__(self, prefix: str = "", length: int = 16, max_attempts: int = 5):
+        if not 0 < len(prefix) + length <= MAX_TEXT_MEMO_LENGTH:
+            raise ValueError(
+                f"Memos must be 1 to {MAX_TEXT_MEMO_LENGTH} characters long."
+            )
+        self.prefix = prefix
+        self.length = length
+        self.max_attempts = max_attempts
+
+    def _candidate(self, transaction: Transaction, attempt: int) -> str:
+        digest = hashlib.sha256(f"{transaction.id}:{attempt}".encode()).digest()
+        encoded = base64.b32encode(digest).decode().rstrip("=")
+        return f"{self.prefix}{encoded[: self.length]}"
+
+    def allocate(self, transaction: Transaction) -> str:
+        """
+        Allocates the memo of `transaction`, returning the one already
+        allocated if there is one.
+
+        :raises RuntimeError: if no unique memo could be allocated.
+        """
+        for attempt in range(self.max_attempts):
+            memo = self._candidate(transaction, attempt)
+            try:
+                with db_transaction.atomic():
+                    WyreMemo.objects.create(memo=memo, transaction=transaction)
+                return memo
+            except IntegrityError:
+                allocated = WyreMemo.objects.filter(transaction=transaction).first()
+                if allocated is not None:
+                    return allocated.memo
+        raise RuntimeError(
+            f"Unable to allocate a unique memo for transaction {transaction.id}."
+        )
+
+    @staticmethod
+    def get_transaction(memo: str) -> Optional[Transaction]:
+        """
+        Gets the transaction a memo was allocated to.
+        """
+        wyre_memo = (
+            WyreMemo.objects.select_related("transaction").filter(memo=memo).first()
+        )
+        return wyre_memo.transaction if wyre_memo is not None else None
@@ -0,0 +1,73 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TransferSubscriber = Callable[[str, dict], None]
+
+
+class TransferNotifier:
+    """
+    Delivers transfer updates pushed by Wyre (see
+    :func:`polaris_wyre.views.transfer_callback`) to the threads waiting on
+    them in the same process.
+
+    The latest update of up to ``max_updates`` transfers is kept, so an
+    update received between two polls isn't lost.
+    """
+
+    def __init__(self, max_updates: int = 10000):
+        self.max_updates = max_updates
+        self._condition = threading.Condition()
+        self._updates: "OrderedDict[str, dict]" = OrderedDict()
+        self._subscribers: List[TransferSubscriber] = []
+
+    def notify(self, transfer_id: str, transfer_data: dict) -> None:
+        """
+        Records the transfer's update and wakes its waiters and subscribers.
+        """
+        with self._condition:
+            self._updates[transfer_id] = transfer_data
+            self._updates.move_to_end(transfer_id)
+            while len(self._updates) > self.max_updates:
+                self._updates.popitem(last=False)
+            self._condition.notify_all()
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber(transfer_id, transfer_data)
+            except Exception:
+                logger.exception("Transfer notification subscriber failed.")
+
+    def get(self, transfer_id: str) -> Optional[dict]:
+        with self._condition:
+            return self._updates.get(transfer_id)
+
+    def discard(self, transfer_id: str) -> None:
+        with self._condition:
+            self._updates.pop(transfer_id, None)
+
+    def wait(self, transfer_id: str, timeout: Optional[float]) -> Optional[dict]:
+        """
+        Waits up to ``timeout`` seconds for an update of the transfer.
+
+        :return: Returns the update, or ``None`` if none was received.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: transfer_id in self._updates, timeout)
+            return self._updates.get(transfer_id)
+
+    def subscribe(self, subscriber: TransferSubscriber) -> None:
+        with self._condition:
+            self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: TransferSubscriber) -> None:
+        with self._condition:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+
+transfer_notifier = TransferNotifier()
+"""The notifier shared by the Wyre clients and the callback view."""
@@ -0,0 +1,77 @@
+import random
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+
+@dataclass(frozen=True)
+class PollingPolicy:
+    """
+    Describes how often a pending Wyre transfer is polled.
+
+    The interval between polls starts at ``initial_delay`` seconds and is
+    multiplied by ``multiplier`` after each poll, up to ``max_interval``.
+    Each interval is randomized by ``±jitter`` (a fraction of the interval)
+    so transfers created together don't poll Wyre in lockstep. Polling gives
+    up once ``deadline`` seconds have elapsed; ``None`` disables the deadline.
+    """
+
+    initial_delay: float = 1.0
+    multiplier: float = 2.0
+    max_interval: float = 30.0
+    jitter: float = 0.1
+    deadline: Optional[float] = 600.0
+
+    def __post_init__(self):
+        if self.initial_delay < 0 or self.max_interval < 0:
+            raise ValueError("Polling intervals must not be negative.")
+        if self.multiplier < 1:
+            raise ValueError("Polling multiplier must be greater or equal to 1.")
+        if not 0 <= self.jitter <= 1:
+            raise ValueError("Polling jitter must be between 0 and 1.")
+        if self.deadline is not None and self.deadline <= 0:
+            raise ValueError("Polling deadline must be positive.")
+
+    def intervals(self) -> Iterator[float]:
+        """
+        Yields the seconds to wait before each subsequent poll.
+
+        :return: Returns an infinite iterator of jittered intervals.
+        """
+        delay = min(self.initial_delay, self.max_interval)
+        while True:
+            yield self._apply_jitter(delay)
+            delay = min(delay * self.multiplier, self.max_interval)
+
+    def next_interval(
+        self, intervals: Iterator[float], elapsed: float
+    ) -> Optional[float]:
+        """
+        Gets the seconds to wait before the next poll, clamped to the time left
+        until the deadline.
+
+        :param intervals: An iterator returned by :meth:`intervals`.
+        :param elapsed: The seconds elapsed since polling started.
+        :return: Returns the interval, or ``None`` if the deadline has passed.
+        """
+        interval = next(intervals)
+        if self.deadline is None:
+            return interval
+        if elapsed >= self.deadline:
+            return None
+        return min(interval, self.deadline - elapsed)
+
+    def interval_after(self, polls: int) -> float:
+        """
+        Gets the jittered seconds to wait after the given number of polls,
+        for callers that keep a poll count instead of an iterator.
+        """
+        # The exponent is capped so long-running transfers don't overflow.
+        exponent = min(max(polls - 1, 0), 64)
+        delay = min(self.initial_delay * self.multiplier**exponent, self.max_interval)
+        return self._apply_jitter(delay)
+
+    def _apply_jitter(self, delay: float) -> float:
+        if not self.jitter:
+            return delay
+        spread = delay * self.jitter
+        return min(max(delay + random.uniform(-spread, spread), 0), self.max_interval)
@@ -0,0 +1,150 @@
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Describes which failed Wyre requests are retried and how long to wait.
+
+    Only requests flagged as retryable (idempotent GETs, or transfers created
+    with an idempotency key) are retried, up to ``max_retries`` times, when
+    Wyre answers with one of ``retry_statuses`` or the connection fails. The
+    wait honours the ``Retry-After`` header, capped at ``max_retry_after``;
+    without it, an exponential backoff of ``backoff_factor * 2 ** attempt``
+    seconds (with full jitter, capped at ``max_backoff``) is used.
+    """
+
+    max_retries: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30.0
+    retry_statuses: Tuple[int, ...] = (429, 502, 503, 504)
+    respect_retry_after: bool = True
+    max_retry_after: float = 60.0
+
+    def should_retry(self, attempt: int, status_code: Optional[int] = None) -> bool:
+        """
+        :param attempt: The number of retries already made.
+        :param status_code: The response status, or ``None`` if the
+            connection failed.
+        """
+        if attempt >= self.max_retries:
+            return False
+        return status_code is None or status_code in self.retry_statuses
+
+    def wait_time(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Gets the seconds to wait before the next retry.
+
+        :param attempt: The number of retries already made.
+        :param retry_after: The ``Retry-After`` header of the failed response.
+        """
+        if self.respect_retry_after and retry_after:
+            seconds = parse_retry_after(retry_after)
+            if seconds is not None:
+                return min(seconds, self.max_retry_after)
+        backoff = min(self.backoff_factor * 2**attempt, self.max_backoff)
+        return random.uniform(0, backoff)
+
+
+def parse_retry_after(value: str) -> Optional[float]:
+    """
+    Parses a ``Retry-After`` header, given either in seconds or as an HTTP
+    date.
+
+    :return: Returns the seconds to wait, or ``None`` if it can't be parsed.
+    """
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket limiting the client-side request rate to
+    ``rate`` requests per second, with bursts of up to ``capacity`` requests.
+    Share one instance between clients to enforce a single limit for all of
+    them.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive.")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Takes a token, going into debt if the bucket is empty.
+
+        :return: Returns the seconds the caller must wait before sending the
+            request.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available.
+        """
+        wait = self.reserve()
+        if wait:
+            time.sleep(wait)
+
+
+class RetryStats:
+    """
+    Thread-safe counters of the retries made by a client, for monitoring.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.retry_wait = 0.0
+        self.rate_limit_wait = 0.0
+        self.retries_by_reason: Dict[str, int] = {}
+
+    def record_retry(self, reason: str, wait: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.retry_wait += wait
+            self.retries_by_reason[reason] = self.retries_by_reason.get(reason, 0) + 1
+
+    def record_rate_limit_wait(self, wait: float) -> None:
+        with self._lock:
+            self.rate_limit_wait += wait
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "retries": self.retries,
+                "retry_wait": self.retry_wait,
+                "rate_limit_wait": self.rate_limit_wait,
+                "retries_by_reason": dict(self.retries_by_reason),
+            }
@@ -0,0 +1,235 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from polaris_wyre.helpers.exceptions import WyreTransferTimeoutError
+from .polling import PollingPolicy
+
+logger = logging.getLogger(__name__)
+
+TransferCheck = Callable[[str], Optional[str]]
+FinishListener = Callable[[str, int, float], None]
+
+
+class _TrackedTransfer:
+    __slots__ = (
+        "transfer_id",
+        "future",
+        "intervals",
+        "started_at",
+        "polls",
+        "generation",
+        "polling",
+        "woken",
+    )
+
+    def __init__(self, transfer_id: str, intervals: Iterator[float]):
+        self.transfer_id = transfer_id
+        self.future = Future()
+        self.intervals = intervals
+        self.started_at = time.monotonic()
+        self.polls = 0
+        # Heap entries of older generations are stale and skipped.
+        self.generation = 0
+        self.polling = False
+        self.woken = False
+
+
+class TransferTracker:
+    """
+    Polls many pending Wyre transfers from a single scheduler thread.
+
+    Tracked transfers are kept in a heap ordered by the time of their next
+    poll. The scheduler thread sleeps until the earliest one is due and hands
+    the due polls to a pool of ``max_workers`` threads, so the number of
+    threads doesn't grow with the number of transfers in flight.
+
+    :param check_transfer: A callable receiving a transfer id that returns the
+        Stellar transaction id once the transfer is completed, ``None`` while
+        it is pending, and raises if it failed.
+    :param polling_policy: The :class:`PollingPolicy` applied to each transfer.
+    :param on_finished: An optional callable receiving the transfer id, the
+        number of polls and the elapsed seconds once a transfer is resolved.
+    :param max_workers: The number of threads used to poll Wyre.
+    """
+
+    def __init__(
+        self,
+        check_transfer: TransferCheck,
+        polling_policy: PollingPolicy,
+        on_finished: Optional[FinishListener] = None,
+        max_workers: int = 4,
+    ):
+        self.check_transfer = check_transfer
+        self.polling_policy = polling_policy
+        self.on_finished = on_finished
+        self.max_workers = max_workers
+
+        self._condition = threading.Condition()
+        self._heap: List[Tuple[float, int, int, _TrackedTransfer]] = []
+        self._sequence = itertools.count()
+        self._tracked: Dict[str, _TrackedTransfer] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._tracked)
+
+    def track(self, transfer_id: str) -> Future:
+        """
+        Starts tracking the given transfer. Tracking the same transfer twice
+        returns the same future.
+
+        :param: The Wyre's transfer id.
+        :return: Returns a :class:`Future` resolved with the Stellar Network
+            transaction id.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The transfer tracker is closed.")
+            tracked = self._tracked.get(transfer_id)
+            if tracked is not None:
+                return tracked.future
+            tracked = _TrackedTransfer(transfer_id, self.polling_policy.intervals())
+            self._tracked[transfer_id] = tracked
+            self._push(tracked, tracked.started_at)
+            self._start()
+            return tracked.future
+
+    def wake(self, transfer_id: str) -> None:
+        """
+        Polls the transfer right away instead of waiting for its next poll,
+        e.g. because Wyre notified an update of it.
+        """
+        with self._condition:
+            tracked = self._tracked.get(transfer_id)
+            if tracked is None:
+                return
+            if tracked.polling:
+                tracked.woken = True
+            else:
+                self._push(tracked, time.monotonic())
+
+    def close(self, wait: bool = True) -> None:
+        """
+        Stops the scheduler thread. Transfers still pending are cancelled.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            pending = list(self._tracked.values())
+            self._tracked.clear()
+            self._heap.clear()
+            self._condition.notify_all()
+        for tracked in pending:
+            tracked.future.cancel()
+        if self._thread is not None and wait:
+            self._thread.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    def _start(self) -> None:
+        if self._thread is not None:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="wyre-tracker-poll"
+        )
+        self._thread = threading.Thread(
+            target=self._run, name="wyre-tracker", daemon=True
+        )
+        self._thread.start()
+
+    def _push(self, tracked: _TrackedTransfer, due_at: float) -> None:
+        tracked.generation += 1
+        heapq.heappush(
+            self._heap,
+            (due_at, next(self._sequence), tracked.generation, tracked),
+        )
+        self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                due = self._wait_for_due_transfers()
+                if self._closed:
+                    return
+            for tracked in due:
+                self._executor.submit(self._poll, tracked)
+
+    def _wait_for_due_transfers(self) -> List[_TrackedTransfer]:
+        while not self._closed:
+            now = time.monotonic()
+            if self._heap and self._heap[0][0] <= now:
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, generation, tracked = heapq.heappop(self._heap)
+                    if generation == tracked.generation and not tracked.polling:
+                        tracked.polling = True
+                        due.append(tracked)
+                if due:
+                    return due
+                continue
+            timeout = self._heap[0][0] - now if self._heap else None
+            self._condition.wait(timeout)
+        return []
+
+    def _poll(self, tracked: _TrackedTransfer) -> None:
+        with self._condition:
+            tracked.woken = False
+        tracked.polls += 1
+        try:
+            transaction_id = self.check_transfer(tracked.transfer_id)
+        except Exception as exc:
+            self._finish(tracked, exception=exc)
+            return
+        if transaction_id is not None:
+            self._finish(tracked, result=transaction_id)
+            return
+
+        elapsed = time.monotonic() - tracked.started_at
+        interval = self.polling_policy.next_interval(tracked.intervals, elapsed)
+        if interval is None:
+            self._finish(
+                tracked,
+                exception=WyreTransferTimeoutError(
+                    tracked.transfer_id, tracked.polls, elapsed
+                ),
+            )
+            return
+        with self._condition:
+            tracked.polling = False
+            if not self._closed:
+                due_at = time.monotonic() + (0 if tracked.woken else interval)
+                self._push(tracked, due_at)
+
+    def _finish(
+        self,
+        tracked: _TrackedTransfer,
+        result: Optional[str] = None,
+        exception: Optional[BaseException] = None,
+    ) -> None:
+        with self._condition:
+            self._tracked.pop(tracked.transfer_id, None)
+        if self.on_finished is not None:
+            try:
+                self.on_finished(
+                    tracked.transfer_id,
+                    tracked.polls,
+                    time.monotonic() - tracked.started_at,
+                )
+            except Exception:
+                logger.exception("Transfer tracker listener failed.")
+        # Claims the future atomically, since close() may cancel it concurrently.
+        if not tracked.future.set_running_or_notify_cancel():
+            return
+        if exception is not None:
+            tracked.future.set_exception(exception)
+        else:
+            tracked.future.set_result(result)
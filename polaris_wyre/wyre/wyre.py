@@ -1,44 +1,299 @@
-from typing import Tuple
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
 
-from polaris_wyre.wyre.dtos import TransferData
-from .api import TEST_BASE_URL, WyreAPI
+from polaris_wyre.helpers.exceptions import (
+    WyreTransferFailedError,
+    WyreTransferTimeoutError,
+)
+from polaris_wyre.wyre.dtos import Account, Transfer, TransferData
+from .api import TEST_BASE_URL, TRANSFERS_PAGE_SIZE, WyreAPI
+from .cache import TTLCache
+from .breaker import CircuitBreaker
+from .connection import ConnectionSettings
+from .instrumentation import Instrumentation
+from .notifications import TransferNotifier, transfer_notifier
+from .polling import PollingPolicy
+from .retry import RetryPolicy, TokenBucket
+from .tracker import TransferTracker
 
 COMPLETED_STATUS = "COMPLETED"
 FAILED_STATUS = "FAILED"
 
+logger = logging.getLogger(__name__)
+
+PollListener = Callable[[str, int, float], None]
+TransferLookup = Callable[[str], Optional[dict]]
+
+
+def parse_deposit_address(account_data: Mapping) -> Tuple[str, str]:
+    """
+    Gets the Stellar's account address and user id from Wyre's account data.
+    """
+    return Account.of(account_data).stellar_deposit_address
+
+
+def parse_transfer_status(transfer_data: Mapping) -> Optional[str]:
+    """
+    Checks the status of Wyre's transfer data.
+
+    :raises WyreTransferFailedError: if the transfer failed.
+    :return: Returns the Stellar Network transaction id if the transfer is
+        completed, otherwise ``None``.
+    """
+    transfer = Transfer.of(transfer_data)
+    if transfer.status == FAILED_STATUS:
+        raise WyreTransferFailedError(
+            transfer.get("id"), transfer.status, transfer.failure_reason
+        )
+    if transfer.status == COMPLETED_STATUS:
+        return transfer.network_tx_id
+    return None
+
 
 class Wyre:
     def __init__(
-        self, api_token: str = "", account_id: str = "", api_url: str = TEST_BASE_URL
+        self,
+        api_token: str = "",
+        account_id: str = "",
+        api_url: str = TEST_BASE_URL,
+        polling_policy: Optional[PollingPolicy] = None,
+        poll_listener: Optional[PollListener] = None,
+        connection_settings: Optional[ConnectionSettings] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        tracker_workers: int = 4,
+        account_cache: Optional[TTLCache] = None,
+        notify_url: Optional[str] = None,
+        notifier: Optional[TransferNotifier] = None,
+        transfer_lookup: Optional[TransferLookup] = None,
+        lookup_interval: float = 1.0,
+        instrumentation: Optional[Instrumentation] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
     ):
         self.wyre_api = WyreAPI(
-            api_token=api_token, account_id=account_id, api_url=api_url
+            api_token=api_token,
+            account_id=account_id,
+            api_url=api_url,
+            connection_settings=connection_settings,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            notify_url=notify_url,
+            instrumentation=instrumentation,
+            circuit_breaker=circuit_breaker,
         )
+        self.polling_policy = polling_policy or PollingPolicy()
+        self.account_cache = account_cache or TTLCache()
+        self.poll_listener = poll_listener
+        self.tracker_workers = tracker_workers
+        self.notifier = notifier or transfer_notifier
+        self.transfer_lookup = transfer_lookup
+        self.lookup_interval = lookup_interval
+        self._tracker: Optional[TransferTracker] = None
+        self._tracker_lock = threading.Lock()
 
     def get_account(self) -> Tuple[str, str]:
         """
         Gets the Stellar's account address from the Wyre's account information.
+        The address doesn't change, so it is cached by ``self.account_cache``.
 
         :return: Returns a tuple containing the account data and the user id.
         """
+        return self.account_cache.get_or_load(
+            self._account_cache_key, self._load_deposit_address
+        )
+
+    def invalidate_account_cache(self) -> None:
+        """
+        Drops the cached account address, so the next :meth:`get_account`
+        call fetches it from Wyre.
+        """
+        self.account_cache.invalidate(self._account_cache_key)
+
+    @property
+    def _account_cache_key(self) -> str:
+        return f"deposit_address:{self.wyre_api.API_URL}:{self.wyre_api.ACCOUNT_ID}"
+
+    def _load_deposit_address(self) -> Tuple[str, str]:
         response_data = self.wyre_api.get_account()
-        return response_data["depositAddresses"]["XLM"].split(":")
+        return parse_deposit_address(response_data)
 
     def get_stellar_transaction_id(self, transfer_id: str) -> str:
         """
-        Gets the Stellar Network's transaction id.
+        Gets the Stellar Network's transaction id, polling the transfer
+        according to ``self.polling_policy`` until it is completed.
+
+        Between polls, the transfer updates Wyre pushes to ``self.notifier``
+        end the wait right away. When ``self.transfer_lookup`` is set, it is
+        also checked every ``self.lookup_interval`` seconds, so updates
+        received by other processes are picked up without calling Wyre.
+
+        Once polling finishes, successfully or not, ``self.poll_listener`` is
+        called with the transfer id, the number of polls and the elapsed
+        seconds.
 
         :param: The Wyre's transfer id.
+        :raises WyreTransferTimeoutError: if the policy's deadline is reached
+        before the transfer completes.
         :return: Returns a string containing the Stellar Network transaction id.
         """
+        started_at = time.monotonic()
+        intervals = self.polling_policy.intervals()
+        polls = 0
+        try:
+            while True:
+                polls += 1
+                transaction_id = self._check_transfer(transfer_id)
+                if transaction_id is not None:
+                    return transaction_id
+
+                elapsed = time.monotonic() - started_at
+                interval = self.polling_policy.next_interval(intervals, elapsed)
+                if interval is None:
+                    raise WyreTransferTimeoutError(transfer_id, polls, elapsed)
+                self._wait_for_update(transfer_id, interval)
+        finally:
+            self.notifier.discard(transfer_id)
+            self._report_polls(transfer_id, polls, time.monotonic() - started_at)
+
+    def track_transfer(self, transfer_id: str) -> Future:
+        """
+        Tracks the transfer in the shared :class:`TransferTracker` instead of
+        blocking the calling thread while it is pending.
+
+        :param: The Wyre's transfer id.
+        :return: Returns a :class:`Future` resolved with the Stellar Network
+            transaction id, or with the same errors raised by
+            :meth:`get_stellar_transaction_id`.
+        """
+        return self.tracker.track(transfer_id)
+
+    @property
+    def tracker(self) -> TransferTracker:
+        with self._tracker_lock:
+            if self._tracker is None:
+                self._tracker = TransferTracker(
+                    check_transfer=self._check_transfer,
+                    polling_policy=self.polling_policy,
+                    on_finished=self._on_tracker_finished,
+                    max_workers=self.tracker_workers,
+                )
+                self.notifier.subscribe(self._on_notified)
+            return self._tracker
+
+    def close(self) -> None:
+        """
+        Stops the transfer tracker, if it was started.
+        """
+        with self._tracker_lock:
+            tracker, self._tracker = self._tracker, None
+        if tracker is not None:
+            self.notifier.unsubscribe(self._on_notified)
+            tracker.close()
+
+    def _on_notified(self, transfer_id: str, transfer_data: dict) -> None:
+        tracker = self._tracker
+        if tracker is not None:
+            tracker.wake(transfer_id)
+
+    def _on_tracker_finished(self, transfer_id: str, polls: int, elapsed: float):
+        self.notifier.discard(transfer_id)
+        self._report_polls(transfer_id, polls, elapsed)
+
+    def _wait_for_update(self, transfer_id: str, timeout: float) -> None:
+        """
+        Waits up to ``timeout`` seconds, returning early once an update of the
+        transfer is available from the notifier or the transfer lookup.
+        """
+        if self.transfer_lookup is None:
+            self.notifier.wait(transfer_id, timeout)
+            return
+        deadline = time.monotonic() + timeout
         while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            wait = min(self.lookup_interval, remaining)
+            if self.notifier.wait(transfer_id, wait) is not None:
+                return
+            if self.transfer_lookup(transfer_id) is not None:
+                return
+
+    def _check_transfer(self, transfer_id: str) -> Optional[str]:
+        """
+        Checks the transfer's status once, preferring an update pushed by
+        Wyre or found by the transfer lookup over a request to Wyre.
+
+        :param: The Wyre's transfer id.
+        :return: Returns the Stellar Network transaction id if the transfer is
+            completed, otherwise ``None``.
+        """
+        response_data = self.notifier.get(transfer_id)
+        if response_data is None and self.transfer_lookup is not None:
+            response_data = self.transfer_lookup(transfer_id)
+        if response_data is None:
             response_data = self.wyre_api.get_transfer_by_id(transfer_id)
-            if response_data["status"] == FAILED_STATUS:
-                # TODO: improve RuntimeError message with a better description
-                raise RuntimeError("Wyre failed to complete the transfer.")
-            if response_data["status"] == COMPLETED_STATUS:
+        return parse_transfer_status(response_data)
+
+    def _report_polls(self, transfer_id: str, polls: int, elapsed: float) -> None:
+        logger.debug(
+            "Polled Wyre transfer %s %d times in %.2f seconds.",
+            transfer_id,
+            polls,
+            elapsed,
+        )
+        if self.poll_listener is not None:
+            self.poll_listener(transfer_id, polls, elapsed)
+
+    def sync_statuses(
+        self,
+        transfer_ids: Iterable[str],
+        page_size: int = TRANSFERS_PAGE_SIZE,
+        max_pages: Optional[int] = None,
+        scan_all: bool = False,
+    ) -> Dict[str, dict]:
+        """
+        Gets the data of many transfers from the account's transfer history,
+        which takes a request per page instead of a request per transfer.
+        Settled transfers are published to ``self.notifier``, waking the
+        threads waiting on them.
+
+        New transfers are listed first, so by default only the pages that
+        recent transfers fit in are fetched, one more than the transfers
+        need. Older transfers, or those of other accounts, are then left out
+        instead of paging through the whole history.
+
+        :param transfer_ids: The Wyre's transfer ids.
+        :param page_size: The number of transfers fetched per request.
+        :param max_pages: The maximum number of pages fetched. Defaults to
+            the bound above.
+        :param scan_all: Whether to page through the whole history when
+            ``max_pages`` isn't given.
+        :return: Returns a dict mapping the ids of the transfers found in the
+            history to their data. Transfers not found aren't included.
+        """
+        pending = set(transfer_ids)
+        found = {}
+        if not pending:
+            return found
+        if max_pages is None and not scan_all:
+            max_pages = math.ceil(len(pending) / page_size) + 1
+        for transfer_data in self.wyre_api.list_transfers(
+            page_size=page_size, max_pages=max_pages
+        ):
+            transfer_id = transfer_data.get("id")
+            if transfer_id not in pending:
+                continue
+            pending.discard(transfer_id)
+            found[transfer_id] = transfer_data
+            if transfer_data.get("status") in (COMPLETED_STATUS, FAILED_STATUS):
+                self.notifier.notify(transfer_id, transfer_data)
+            if not pending:
                 break
-        return response_data["blockchainTx"]["networkTxId"]
+        return found
 
     def create_transfer(self, transfer_data: TransferData) -> str:
         """
@@ -48,5 +303,4 @@ class Wyre:
         information.
         :return: Returns Wyre's transfer id.
         """
-        response_data = self.wyre_api.create_transfer(transfer_data)
-        return response_data["id"]
+        return Transfer.of(self.wyre_api.create_transfer(transfer_data)).id
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import time
+from typing import Optional, Tuple
+
+from polaris_wyre.helpers.exceptions import WyreTransferTimeoutError
+from polaris_wyre.wyre.dtos import Transfer, TransferData
+from .api import TEST_BASE_URL
+from .api_async import AsyncWyreAPI
+from .breaker import CircuitBreaker
+from .connection import ConnectionSettings
+from .instrumentation import Instrumentation
+from .polling import PollingPolicy
+from .retry import RetryPolicy, TokenBucket
+from .wyre import PollListener, parse_deposit_address, parse_transfer_status
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncWyre:
+    """
+    The asyncio counterpart of :class:`Wyre`. It shares the polling policy,
+    status handling and errors of the sync client.
+    """
+
+    def __init__(
+        self,
+        api_token: str = "",
+        account_id: str = "",
+        api_url: str = TEST_BASE_URL,
+        polling_policy: Optional[PollingPolicy] = None,
+        poll_listener: Optional[PollListener] = None,
+        connection_settings: Optional[ConnectionSettings] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limiter: Optional[TokenBucket] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.wyre_api = AsyncWyreAPI(
+            api_token=api_token,
+            account_id=account_id,
+            api_url=api_url,
+            connection_settings=connection_settings,
+            retry_policy=retry_policy,
+            rate_limiter=rate_limiter,
+            instrumentation=instrumentation,
+            circuit_breaker=circuit_breaker,
+        )
+        self.polling_policy = polling_policy or PollingPolicy()
+        self.poll_listener = poll_listener
+
+    async def close(self) -> None:
+        await self.wyre_api.close()
+
+    async def __aenter__(self) -> "AsyncWyre":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def get_account(self) -> Tuple[str, str]:
+        """
+        Gets the Stellar's account address from the Wyre's account information.
+
+        :return: Returns a tuple containing the account data and the user id.
+        """
+        response_data = await self.wyre_api.get_account()
+        return parse_deposit_address(response_data)
+
+    async def get_stellar_transaction_id(self, transfer_id: str) -> str:
+        """
+        Gets the Stellar Network's transaction id, polling the transfer
+        according to ``self.polling_policy`` until it is completed.
+
+        :param: The Wyre's transfer id.
+        :raises WyreTransferTimeoutError: if the policy's deadline is reached
+        before the transfer completes.
+        :return: Returns a string containing the Stellar Network transaction id.
+        """
+        started_at = time.monotonic()
+        intervals = self.polling_policy.intervals()
+        polls = 0
+        try:
+            while True:
+                polls += 1
+                response_data = await self.wyre_api.get_transfer_by_id(transfer_id)
+                transaction_id = parse_transfer_status(response_data)
+                if transaction_id is not None:
+                    return transaction_id
+
+                elapsed = time.monotonic() - started_at
+                interval = self.polling_policy.next_interval(intervals, elapsed)
+                if interval is None:
+                    raise WyreTransferTimeoutError(transfer_id, polls, elapsed)
+                await asyncio.sleep(interval)
+        finally:
+            elapsed = time.monotonic() - started_at
+            logger.debug(
+                "Polled Wyre transfer %s %d times in %.2f seconds.",
+                transfer_id,
+                polls,
+                elapsed,
+            )
+            if self.poll_listener is not None:
+                self.poll_listener(transfer_id, polls, elapsed)
+
+    async def create_transfer(self, transfer_data: TransferData) -> str:
+        """
+        Builds a transfer based on the given transfer data.
+
+        :param: A :class:`TransferData` instance containing the transfer
+        information.
+        :return: Returns Wyre's transfer id.
+        """
+        transfer = await self.wyre_api.create_transfer(transfer_data)
+        return Transfer.of(transfer).id
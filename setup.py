@@ -52,6 +52,8 @@ setup(
     install_requires=[
         "django-polaris>=1.4.1",
         "requests<3,>=2.0",
+        "aiohttp<4,>=3.7",
     ],
+    extras_require={"orjson": ["orjson>=3"]},
     python_requires=">=3.7",
 )
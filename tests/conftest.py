@@ -10,8 +10,10 @@ from stellar_sdk import Keypair
 from polaris_wyre.wyre import Wyre
 from polaris_wyre.wyre.api import WyreAPI
 from polaris_wyre.wyre.dtos import TransferData
+from polaris_wyre.wyre.polling import PollingPolicy
 
 ALPHABET = string.ascii_uppercase + string.digits
+NO_DELAY_POLLING_POLICY = PollingPolicy(initial_delay=0, jitter=0, deadline=None)
 
 
 def pytest_configure(config):
@@ -35,6 +37,7 @@ def pytest_configure(config):
             "django.contrib.sites",
             "django.contrib.staticfiles",
             "polaris",
+            "polaris_wyre",
         ),
         DATABASES={
             "default": {
@@ -78,8 +81,13 @@ def make_wyre() -> Callable:
     def _make_wyre(
         api_token: str = settings.WYRE_API_TOKEN,
         account_id: str = settings.WYRE_ACCOUNT_ID,
+        polling_policy: PollingPolicy = NO_DELAY_POLLING_POLICY,
     ) -> Wyre:
-        return Wyre(api_token=api_token, account_id=account_id)
+        return Wyre(
+            api_token=api_token,
+            account_id=account_id,
+            polling_policy=polling_policy,
+        )
 
     return _make_wyre
 
@@ -93,8 +101,13 @@ def make_wyre_integration() -> Callable:
     def _make_wyre_integration(
         api_token: str = settings.WYRE_API_TOKEN,
         account_id: str = settings.WYRE_ACCOUNT_ID,
+        polling_policy: PollingPolicy = NO_DELAY_POLLING_POLICY,
     ) -> WyreIntegration:
-        return WyreIntegration(api_token=api_token, account_id=account_id)
+        return WyreIntegration(
+            api_token=api_token,
+            account_id=account_id,
+            polling_policy=polling_policy,
+        )
 
     return _make_wyre_integration
 
@@ -116,3 +129,37 @@ def make_transfer_data() -> Callable:
         return TransferData(currency=currency, amount=amount, destination=destination)
 
     return _make_transfer_data
+
+
+@pytest.fixture
+def make_asset() -> Callable:
+    from polaris.models import Asset
+
+    def _make_asset(code: str = "USDC", significant_decimals: int = 2) -> Asset:
+        return Asset.objects.create(
+            code=code,
+            issuer=Keypair.random().public_key,
+            significant_decimals=significant_decimals,
+        )
+
+    return _make_asset
+
+
+@pytest.fixture
+def make_transaction(make_asset) -> Callable:
+    from polaris.models import Transaction
+
+    def _make_transaction(
+        amount_in: Decimal = Decimal("100"),
+        amount_fee: Decimal = Decimal("3"),
+        **kwargs,
+    ) -> Transaction:
+        stellar_account = Keypair.random().public_key
+        kwargs.setdefault("asset", make_asset())
+        kwargs.setdefault("stellar_account", stellar_account)
+        kwargs.setdefault("to_address", stellar_account)
+        return Transaction.objects.create(
+            amount_in=amount_in, amount_fee=amount_fee, **kwargs
+        )
+
+    return _make_transaction
@@ -1,9 +1,17 @@
+import json
 from decimal import Decimal
 
 import requests
 from rest_framework import status
 
 
+def set_json(response: requests.Response, data: dict) -> None:
+    """
+    Sets the response's body, encoding amounts as JSON numbers like Wyre does.
+    """
+    response._content = json.dumps(data, default=float).encode()
+
+
 def get_account_data(*, account_id: str = "") -> dict:
     return {
         "id": f"{account_id}",
@@ -209,7 +217,7 @@ def get_account_response(
     response.status_code = status_code
     response.reason = reason
     response.url = url
-    response.json = lambda: get_account_data(account_id=account_id)
+    set_json(response, get_account_data(account_id=account_id))
 
     return response
 
@@ -287,8 +295,9 @@ def get_transfer_by_id_response(
     response.status_code = status_code
     response.reason = reason
     response.url = url
-    response.json = lambda: get_transfer_by_id_data(
-        account_id=account_id, transfer_id=transfer_id
+    set_json(
+        response,
+        get_transfer_by_id_data(account_id=account_id, transfer_id=transfer_id),
     )
 
     return response
@@ -345,11 +354,39 @@ def create_transfer_response(
     response.status_code = status_code
     response.reason = reason
     response.url = url
-    response.json = lambda: create_transfer_data(
-        account_id=account_id,
-        currency=currency,
-        amount=amount,
-        destination=destination,
+    set_json(
+        response,
+        create_transfer_data(
+            account_id=account_id,
+            currency=currency,
+            amount=amount,
+            destination=destination,
+        ),
+    )
+
+    return response
+
+
+def get_transfers_response(
+    *,
+    transfers: list,
+    total: int,
+    status_code: int = status.HTTP_200_OK,
+    reason: str = "",
+    url: str = "",
+) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response.url = url
+    set_json(
+        response,
+        {
+            "data": transfers,
+            "position": 0,
+            "recordsTotal": total,
+            "recordsFiltered": total,
+        },
     )
 
     return response
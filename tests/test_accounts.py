@@ -0,0 +1,92 @@
+from decimal import Decimal
+
+import pytest
+
+from polaris_wyre.helpers.exceptions import WyreInsufficientBalanceError
+from polaris_wyre.wyre import Wyre
+from polaris_wyre.wyre.accounts import (
+    AccountPool,
+    BalanceRouting,
+    LeastInFlightRouting,
+    RoundRobinRouting,
+)
+from polaris_wyre.wyre.dtos import Account, TransferData
+
+
+def make_pool(routing=None, account_ids=("AC_1", "AC_2", "AC_3")) -> AccountPool:
+    return AccountPool(
+        [Wyre(api_token="token", account_id=account_id) for account_id in account_ids],
+        routing=routing,
+    )
+
+
+def transfer_data(amount: str = "10") -> TransferData:
+    return TransferData(currency="USDC", amount=Decimal(amount), destination="GA")
+
+
+def test_round_robin_routing():
+    pool = make_pool(RoundRobinRouting())
+
+    account_ids = [pool.acquire(transfer_data()) for _ in range(4)]
+
+    assert account_ids == ["AC_1", "AC_2", "AC_3", "AC_1"]
+    assert pool.in_flight("AC_1") == 2
+    assert pool.ledger is None
+
+
+def test_least_in_flight_routing():
+    pool = make_pool(LeastInFlightRouting())
+
+    with pool.hold("AC_1"):
+        first = pool.acquire(transfer_data())
+        second = pool.acquire(transfer_data())
+        pool.release(first)
+        third = pool.acquire(transfer_data())
+
+    assert (first, second, third) == ("AC_2", "AC_3", "AC_2")
+    assert pool.in_flight("AC_1") == 0
+
+
+def test_balance_routing(mocker):
+    balances = {"AC_1": 15, "AC_2": 25, "AC_3": 0}
+    get_account_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_account",
+        autospec=True,
+        side_effect=lambda api: Account(
+            {
+                "id": api.ACCOUNT_ID,
+                "availableBalances": {"USDC": balances[api.ACCOUNT_ID]},
+            }
+        ),
+    )
+    pool = make_pool(BalanceRouting())
+
+    pool.refresh_balances()
+    account_ids = [pool.acquire(transfer_data()) for _ in range(3)]
+
+    assert account_ids == ["AC_2", "AC_1", "AC_2"]
+    assert pool.ledger.available("AC_2", "USDC") == 5
+    assert get_account_mock.call_count == 3
+    pool.refresh_balances()
+    assert get_account_mock.call_count == 3
+    with pytest.raises(WyreInsufficientBalanceError):
+        pool.acquire(transfer_data("6"))
+    assert sum(pool.in_flight(account_id) for account_id in pool.account_ids) == 3
+
+    pool.refund("AC_1", transfer_data())
+
+    assert pool.acquire(transfer_data("6")) == "AC_1"
+
+
+def test_get_unknown_account():
+    pool = make_pool()
+
+    assert pool.get(None) is pool.primary
+    assert pool.get("AC_2").wyre_api.ACCOUNT_ID == "AC_2"
+    with pytest.raises(KeyError):
+        pool.get("AC_4")
+
+
+def test_duplicated_accounts():
+    with pytest.raises(ValueError):
+        make_pool(account_ids=("AC_1", "AC_1"))
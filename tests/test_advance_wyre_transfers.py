@@ -0,0 +1,176 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+import requests
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from polaris.models import Transaction
+
+from polaris_wyre.helpers.exceptions import WyreAPIError
+from polaris_wyre.models import WyreTransfer
+from polaris_wyre.wyre.integration import WyreIntegration
+from .conftest import NO_DELAY_POLLING_POLICY
+from .mocks import constants
+
+NETWORK_TX_ID = constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE["id"]
+
+
+@pytest.fixture
+def wyre_integration(mocker):
+    wyre_integration = WyreIntegration(
+        polling_policy=NO_DELAY_POLLING_POLICY, deferred_settlement=True
+    )
+    mocker.patch(
+        "polaris.integrations.registered_custody_integration", wyre_integration
+    )
+    mocker.patch("polaris_wyre.wyre.api.WyreAPI.list_transfers", return_value=[])
+    return wyre_integration
+
+
+@pytest.fixture
+def make_created_transfer(make_transaction):
+    def _make_created_transfer(transfer_id: str, **kwargs) -> WyreTransfer:
+        kwargs.setdefault("status", WyreTransfer.STATUS.CREATED)
+        kwargs.setdefault("next_poll_at", timezone.now())
+        return WyreTransfer.objects.create(
+            transaction=make_transaction(
+                kind=Transaction.KIND.deposit,
+                status=Transaction.STATUS.pending_anchor,
+            ),
+            transfer_id=transfer_id,
+            **kwargs,
+        )
+
+    return _make_created_transfer
+
+
+@pytest.fixture
+def horizon(mocker):
+    server_mock = mocker.patch("polaris_wyre.wyre.horizon.Server")
+    server = server_mock.return_value
+    server.transactions.return_value.transaction.return_value.call.return_value = (
+        constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE
+    )
+    return server
+
+
+def completed_transfer(network_tx_id: str = NETWORK_TX_ID) -> dict:
+    return {"status": "COMPLETED", "blockchainTx": {"networkTxId": network_tx_id}}
+
+
+def advance(*args) -> str:
+    stderr = StringIO()
+    call_command("advance_wyre_transfers", "--once", *args, stderr=stderr)
+    return stderr.getvalue()
+
+
+def test_advance_settles_transactions(
+    db, mocker, wyre_integration, make_created_transfer, horizon
+):
+    completed = make_created_transfer("TF_COMPLETED")
+    failed = make_created_transfer("TF_FAILED")
+    pending = make_created_transfer("TF_PENDING")
+    not_due = make_created_transfer(
+        "TF_NOT_DUE", next_poll_at=timezone.now() + timedelta(hours=1)
+    )
+    transfers = {
+        "TF_COMPLETED": completed_transfer(),
+        "TF_FAILED": {"status": "FAILED"},
+        "TF_PENDING": {"status": "PENDING"},
+    }
+    get_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id", side_effect=transfers.get
+    )
+
+    output = advance()
+
+    assert "1 completed, 1 failed, 1 pending" in output
+    assert get_transfer_mock.call_count == 3
+    completed.refresh_from_db()
+    assert completed.status == WyreTransfer.STATUS.COMPLETED
+    assert completed.network_tx_id == NETWORK_TX_ID
+    assert completed.next_poll_at is None
+    assert completed.polls == 1
+    transaction = Transaction.objects.get(pk=completed.transaction_id)
+    assert transaction.status == Transaction.STATUS.completed
+    assert transaction.stellar_transaction_id == NETWORK_TX_ID
+    assert transaction.amount_out == 97
+    failed.refresh_from_db()
+    assert failed.status == WyreTransfer.STATUS.FAILED
+    transaction = Transaction.objects.get(pk=failed.transaction_id)
+    assert transaction.status == Transaction.STATUS.error
+    pending.refresh_from_db()
+    assert pending.status == WyreTransfer.STATUS.PENDING
+    assert pending.next_poll_at is not None
+    assert not_due.transaction.status == Transaction.STATUS.pending_anchor
+
+
+def test_advance_falls_back_when_the_history_fails(
+    db, mocker, wyre_integration, make_created_transfer, horizon
+):
+    completed = make_created_transfer("TF_COMPLETED")
+    unavailable = make_created_transfer("TF_UNAVAILABLE")
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.list_transfers",
+        side_effect=requests.ConnectionError("connection refused"),
+    )
+
+    def get_transfer_by_id(transfer_id):
+        if transfer_id == "TF_UNAVAILABLE":
+            raise requests.Timeout("read timed out")
+        return completed_transfer()
+
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=get_transfer_by_id,
+    )
+
+    output = advance()
+
+    assert "1 completed, 1 error" in output
+    completed.refresh_from_db()
+    assert completed.status == WyreTransfer.STATUS.COMPLETED
+    unavailable.refresh_from_db()
+    assert unavailable.status == WyreTransfer.STATUS.CREATED
+
+
+def test_advance_retries_errors_after_the_lease(
+    db, mocker, wyre_integration, make_created_transfer, horizon
+):
+    wyre_transfer = make_created_transfer("TF_1")
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=WyreAPIError("Wyre is down"),
+    )
+
+    assert "1 error" in advance("--lease", "30")
+
+    wyre_transfer.refresh_from_db()
+    assert wyre_transfer.status == WyreTransfer.STATUS.CREATED
+    assert wyre_transfer.next_poll_at > timezone.now() + timedelta(seconds=20)
+    assert wyre_integration.advance_transfers() == {}
+
+
+def test_advance_settles_transfers_completed_by_callback(
+    db, mocker, wyre_integration, make_created_transfer, horizon
+):
+    wyre_transfer = make_created_transfer("TF_1")
+    WyreTransfer.record_status("TF_1", "COMPLETED", NETWORK_TX_ID)
+    get_transfer_mock = mocker.patch("polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id")
+
+    outcomes = wyre_integration.advance_transfers()
+
+    assert outcomes == {"completed": 1}
+    get_transfer_mock.assert_not_called()
+    wyre_transfer.refresh_from_db()
+    assert wyre_transfer.next_poll_at is None
+    transaction = Transaction.objects.get(pk=wyre_transfer.transaction_id)
+    assert transaction.status == Transaction.STATUS.completed
+
+
+def test_advance_requires_the_wyre_integration(db, mocker):
+    mocker.patch("polaris.integrations.registered_custody_integration", object())
+
+    with pytest.raises(CommandError):
+        advance()
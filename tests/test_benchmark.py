@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from polaris_wyre.testing.benchmark import percentile, run_benchmark, summarize
+
+
+@pytest.mark.parametrize(
+    "percent, expected", [(50, 50), (95, 95), (99, 99), (100, 100), (0, 1)]
+)
+def test_percentile(percent, expected):
+    assert percentile(list(range(1, 101)), percent) == expected
+
+
+def test_percentile_without_values():
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize():
+    summary = summarize([0.003, 0.001, 0.002, 0.004], 2.0, {"Timeout": 1})
+
+    assert summary["operations"] == 4
+    assert summary["errors"] == 1
+    assert summary["error_types"] == {"Timeout": 1}
+    assert summary["throughput"] == 2.0
+    assert summary["mean_ms"] == 2.5
+    assert summary["p50_ms"] == 2.0
+    assert summary["p99_ms"] == 4.0
+    assert summary["max_ms"] == 4.0
+
+
+def test_run_benchmark():
+    calls = []
+    setups = iter(range(10))
+    torn_down = []
+
+    def operation(value):
+        if value == 3:
+            raise ValueError()
+        calls.append((value, threading.current_thread().name))
+
+    summary = run_benchmark(
+        operation,
+        concurrency=3,
+        iterations=10,
+        setup=lambda: next(setups),
+        thread_teardown=lambda: torn_down.append(threading.current_thread().name),
+    )
+
+    assert sorted(value for value, _ in calls) == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+    assert summary["operations"] == 9
+    assert summary["error_types"] == {"ValueError": 1}
+    assert len(torn_down) == 3
+
+
+def test_run_benchmark_at_rate():
+    summary = run_benchmark(lambda: None, concurrency=2, iterations=5, rate=100)
+
+    assert summary["operations"] == 5
+    assert summary["elapsed"] >= 0.04
@@ -0,0 +1,122 @@
+import pytest
+
+from polaris_wyre.helpers.exceptions import WyreCircuitOpenError
+from polaris_wyre.testing.fake_wyre import FakeWyreServer, FakeWyreSettings
+from polaris_wyre.wyre.api import WyreAPI
+from polaris_wyre.wyre.breaker import CircuitBreaker, CircuitBreakerPolicy
+from polaris_wyre.wyre.cache import DjangoCacheBackend
+from polaris_wyre.wyre.retry import RetryPolicy
+
+
+@pytest.fixture
+def clock(mocker):
+    return mocker.patch("polaris_wyre.wyre.breaker.time.time", return_value=1000.0)
+
+
+def test_circuit_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(CircuitBreakerPolicy(failure_threshold=2))
+
+    breaker.record_failure("get_account")
+    breaker.before_request("get_account")
+    breaker.record_failure("get_account")
+
+    assert breaker.state("get_account") == "open"
+    assert breaker.state("get_transfer") == "closed"
+    with pytest.raises(WyreCircuitOpenError) as error:
+        breaker.before_request("get_account")
+    assert error.value.endpoint == "get_account"
+    assert error.value.retry_after == 30
+
+
+def test_success_resets_failures(clock):
+    breaker = CircuitBreaker(CircuitBreakerPolicy(failure_threshold=2))
+
+    breaker.record_failure("get_account")
+    breaker.record_response("get_account", 404)
+    breaker.record_failure("get_account")
+
+    assert breaker.state("get_account") == "closed"
+
+
+def test_half_open_probes(clock):
+    breaker = CircuitBreaker(
+        CircuitBreakerPolicy(failure_threshold=1, open_interval=10, half_open_probes=2)
+    )
+    breaker.record_failure("get_account")
+
+    clock.return_value += 10
+    assert breaker.state("get_account") == "half-open"
+    breaker.before_request("get_account")
+    breaker.before_request("get_account")
+    with pytest.raises(WyreCircuitOpenError):
+        breaker.before_request("get_account")
+
+    breaker.record_response("get_account", 200)
+    assert breaker.state("get_account") == "closed"
+    breaker.before_request("get_account")
+
+
+def test_failed_probe_opens_circuit_again(clock):
+    breaker = CircuitBreaker(
+        CircuitBreakerPolicy(failure_threshold=1, open_interval=10)
+    )
+    breaker.record_failure("get_account")
+
+    clock.return_value += 10
+    breaker.before_request("get_account")
+    breaker.record_response("get_account", 503)
+
+    assert breaker.state("get_account") == "open"
+    with pytest.raises(WyreCircuitOpenError):
+        breaker.before_request("get_account")
+
+
+def test_lost_probes_are_given_up_on(clock):
+    breaker = CircuitBreaker(
+        CircuitBreakerPolicy(failure_threshold=1, open_interval=10)
+    )
+    breaker.record_failure("get_account")
+    clock.return_value += 10
+    breaker.before_request("get_account")
+
+    clock.return_value += 10
+    breaker.before_request("get_account")
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        CircuitBreakerPolicy(failure_threshold=0)
+    with pytest.raises(ValueError):
+        CircuitBreakerPolicy(open_interval=0)
+
+
+def test_circuit_is_shared_through_django_cache(clock, settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    policy = CircuitBreakerPolicy(failure_threshold=1)
+    first = CircuitBreaker(policy, backend=DjangoCacheBackend())
+    second = CircuitBreaker(policy, backend=DjangoCacheBackend())
+
+    first.record_failure("create_transfer")
+
+    with pytest.raises(WyreCircuitOpenError):
+        second.before_request("create_transfer")
+    second.reset("create_transfer")
+    first.before_request("create_transfer")
+
+
+def test_wyre_api_fails_fast_while_open():
+    breaker = CircuitBreaker(CircuitBreakerPolicy(failure_threshold=2))
+    with FakeWyreServer(FakeWyreSettings(error_rate=1)) as server:
+        wyre_api = WyreAPI(
+            api_url=server.url,
+            retry_policy=RetryPolicy(max_retries=5, backoff_factor=0),
+            circuit_breaker=breaker,
+        )
+
+        with pytest.raises(WyreCircuitOpenError):
+            wyre_api.get_account()
+
+        assert server.request_counts[("GET", "v2/account")] == 2
+        assert breaker.state("get_account") == "open"
@@ -0,0 +1,74 @@
+import threading
+import time
+
+from polaris_wyre.wyre.cache import (
+    MISSING,
+    DjangoCacheBackend,
+    LocalCacheBackend,
+    TTLCache,
+)
+
+
+def test_local_backend_expires_entries(mocker):
+    monotonic = mocker.patch("polaris_wyre.wyre.cache.time.monotonic", return_value=0)
+    backend = LocalCacheBackend()
+
+    backend.set("key", "value", ttl=10)
+    assert backend.get("key") == "value"
+
+    monotonic.return_value = 10
+    assert backend.get("key") is MISSING
+
+
+def test_django_backend():
+    backend = DjangoCacheBackend()
+
+    backend.set("key", ("address", "user"), ttl=10)
+    assert backend.get("key") == ("address", "user")
+
+    backend.delete("key")
+    assert backend.get("key") is MISSING
+
+
+def test_get_or_load_caches_value(mocker):
+    loader = mocker.Mock(return_value="value")
+    cache = TTLCache(ttl=10)
+
+    assert cache.get_or_load("key", loader) == "value"
+    assert cache.get_or_load("key", loader) == "value"
+
+    loader.assert_called_once()
+
+
+def test_invalidate(mocker):
+    loader = mocker.Mock(side_effect=["first", "second"])
+    cache = TTLCache(ttl=10)
+
+    assert cache.get_or_load("key", loader) == "first"
+    cache.invalidate("key")
+    assert cache.get_or_load("key", loader) == "second"
+
+
+def test_concurrent_misses_load_once():
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return "value"
+
+    cache = TTLCache(ttl=10)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(cache.get_or_load("key", loader))
+        )
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["value"] * 10
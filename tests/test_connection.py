@@ -0,0 +1,63 @@
+import requests
+
+from polaris_wyre.wyre.api import WyreAPI
+from polaris_wyre.wyre.connection import (
+    ConnectionSettings,
+    WyreHTTPAdapter,
+    get_adapter,
+)
+
+
+def test_adapter_applies_pool_settings():
+    connection_settings = ConnectionSettings(
+        pool_connections=2, pool_maxsize=20, pool_block=True
+    )
+
+    adapter = get_adapter("https://api.testwyre.com", connection_settings)
+
+    assert adapter.poolmanager.connection_pool_kw["maxsize"] == 20
+    assert adapter.poolmanager.connection_pool_kw["block"] is True
+    assert "socket_options" in adapter.poolmanager.connection_pool_kw
+
+
+def test_adapter_applies_default_timeout(mocker):
+    send_mock = mocker.patch("requests.adapters.HTTPAdapter.send")
+    adapter = WyreHTTPAdapter(ConnectionSettings(connect_timeout=1, read_timeout=2))
+    request = requests.Request("GET", "https://api.testwyre.com").prepare()
+
+    adapter.send(request)
+    adapter.send(request, timeout=5)
+
+    assert send_mock.call_args_list == [
+        mocker.call(request, timeout=(1, 2)),
+        mocker.call(request, timeout=5),
+    ]
+
+
+def test_shared_pool_is_reused_per_api_url():
+    connection_settings = ConnectionSettings(share_pool=True)
+
+    first = WyreAPI(api_token="first", connection_settings=connection_settings)
+    second = WyreAPI(api_token="second", connection_settings=connection_settings)
+    other = WyreAPI(
+        api_url="https://api.sendwyre.com", connection_settings=connection_settings
+    )
+
+    assert first.session is not second.session
+    assert first.session.get_adapter(first.API_URL) is second.session.get_adapter(
+        second.API_URL
+    )
+    assert first.session.get_adapter(first.API_URL) is not other.session.get_adapter(
+        other.API_URL
+    )
+    assert first.session.headers["Authorization"] == "Bearer first"
+    assert second.session.headers["Authorization"] == "Bearer second"
+
+
+def test_pool_is_not_shared_by_default():
+    first = WyreAPI()
+    second = WyreAPI()
+
+    assert first.session.get_adapter(first.API_URL) is not second.session.get_adapter(
+        second.API_URL
+    )
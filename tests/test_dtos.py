@@ -0,0 +1,85 @@
+import copy
+from decimal import Decimal
+
+import pytest
+
+from polaris_wyre.wyre import dtos
+from polaris_wyre.wyre.dtos import Account, Transfer, json_loads, to_decimal
+from .mocks import wyre as wyre_mocks
+
+
+def test_account():
+    account = Account(wyre_mocks.get_account_data(account_id="AC_1"))
+
+    assert account.id == "AC_1"
+    assert account.status == "APPROVED"
+    assert account.stellar_deposit_address == (
+        "GD7WXI7AOAK2CIPZVBEFYLS2NQZI2J4WN4HFYQQ4A2OMFVWGWAL3IW7K",
+        "DGXMTLDFRBE",
+    )
+    assert account.available_balances["USD"] == Decimal("21.94")
+    assert account.total_balances["XLM"] == Decimal("25.129329514514772")
+    with pytest.raises(TypeError):
+        account.available_balances["USD"] = Decimal(0)
+
+
+def test_fields_are_decoded_once():
+    transfer = Transfer({"id": "TF_1", "sourceAmount": 5.01001})
+
+    assert transfer.source_amount == Decimal("5.01001")
+    assert transfer.source_amount is transfer.source_amount
+
+
+def test_transfer():
+    transfer = Transfer(wyre_mocks.get_transfer_by_id_data(transfer_id="TF_1"))
+
+    assert transfer.id == "TF_1"
+    assert transfer.status == "COMPLETED"
+    assert transfer.network_tx_id == (
+        "7586ec0223fc193da6fc609b92a62a96ae86258873480d8bc288723e29028cd3"
+    )
+    assert transfer.dest_amount == Decimal("5")
+    assert transfer.dest_currency == transfer.source_currency == "XLM"
+    assert Transfer({"id": "TF_2", "blockchainTx": None}).network_tx_id is None
+
+
+def test_models_are_read_only_mappings():
+    data = {"id": "TF_1", "status": "PENDING", "blockchainTx": {"networkTxId": "a"}}
+    transfer = Transfer(data)
+
+    with pytest.raises(AttributeError):
+        transfer.status = "COMPLETED"
+    with pytest.raises(AttributeError):
+        transfer.extra = True
+    assert not hasattr(transfer, "__dict__")
+    assert transfer == data
+    assert transfer["status"] == transfer.get("status") == "PENDING"
+    assert dict(transfer) == transfer.to_dict() == data
+    assert copy.deepcopy(transfer) == transfer
+    assert Transfer.of(transfer) is transfer
+    assert Transfer.of(data) == transfer
+
+    copied = transfer.to_dict()
+    copied["blockchainTx"]["networkTxId"] = "b"
+    assert transfer.network_tx_id == "a"
+
+
+def test_from_json():
+    transfer = Transfer.from_json(b'{"id": "TF_1", "destAmount": 10.5}')
+
+    assert transfer.dest_amount == Decimal("10.5")
+
+
+@pytest.mark.parametrize("backend", [dtos.orjson, None])
+def test_json_loads_backends(mocker, backend):
+    mocker.patch.object(dtos, "orjson", backend)
+
+    assert json_loads(b'{"amount": 1.5}') == {"amount": 1.5}
+    assert json_loads('{"amount": 1.5}') == {"amount": 1.5}
+
+
+def test_to_decimal():
+    assert to_decimal(None) is None
+    assert to_decimal(0.1) == Decimal("0.1")
+    assert to_decimal("12.30") == Decimal("12.30")
+    assert to_decimal(7) == Decimal(7)
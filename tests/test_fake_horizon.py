@@ -0,0 +1,31 @@
+import pytest
+from stellar_sdk.exceptions import NotFoundError
+
+from polaris_wyre.testing.fake_horizon import FakeHorizonServer, FakeHorizonSettings
+from polaris_wyre.wyre.horizon import HorizonClient, HorizonSettings
+from polaris_wyre.wyre.polling import PollingPolicy
+
+TRANSACTION_HASH = "ab" * 32
+
+
+def test_get_transaction():
+    with FakeHorizonServer() as server:
+        horizon = HorizonClient(horizon_url=server.url)
+        transaction = horizon.get_transaction(TRANSACTION_HASH)
+        horizon.close()
+
+    assert transaction["id"] == TRANSACTION_HASH
+    assert transaction["successful"]
+    assert server.request_counts[("GET", "transactions/:id")] == 1
+
+
+def test_transaction_not_found():
+    horizon_settings = HorizonSettings(
+        num_retries=0,
+        ingestion_policy=PollingPolicy(initial_delay=0, jitter=0, deadline=0.001),
+    )
+    with FakeHorizonServer(FakeHorizonSettings(not_found_rate=1)) as server:
+        horizon = HorizonClient(horizon_settings, horizon_url=server.url)
+        with pytest.raises(NotFoundError):
+            horizon.get_transaction(TRANSACTION_HASH)
+        horizon.close()
@@ -0,0 +1,145 @@
+import pytest
+import requests
+
+from polaris_wyre.helpers.exceptions import WyreAPIError
+from polaris_wyre.testing.fake_wyre import FakeWyreServer, FakeWyreSettings
+from polaris_wyre.wyre import Wyre
+from polaris_wyre.wyre.api import WyreAPI
+from polaris_wyre.wyre.connection import ConnectionSettings
+from polaris_wyre.wyre.retry import RetryPolicy
+from .conftest import NO_DELAY_POLLING_POLICY
+
+NO_RETRY_POLICY = RetryPolicy(max_retries=0)
+
+
+@pytest.fixture
+def fake_wyre():
+    servers = []
+
+    def _fake_wyre(**settings) -> FakeWyreServer:
+        server = FakeWyreServer(FakeWyreSettings(**settings)).start()
+        servers.append(server)
+        return server
+
+    yield _fake_wyre
+    for server in servers:
+        server.stop()
+
+
+def test_get_account(fake_wyre):
+    server = fake_wyre(api_token="token")
+    wyre = Wyre(api_token="token", account_id="AC_1", api_url=server.url)
+
+    stellar_address, user_id = wyre.get_account()
+
+    assert stellar_address == server.settings.stellar_address
+    assert user_id == server.state.user_id
+
+
+def test_rejects_other_tokens(fake_wyre):
+    server = fake_wyre(api_token="token")
+    wyre_api = WyreAPI(api_token="other", api_url=server.url)
+
+    with pytest.raises(WyreAPIError) as exc_info:
+        wyre_api.get_account()
+
+    assert exc_info.value.response.status_code == 401
+
+
+def test_transfers_complete_after_delay(fake_wyre, make_transfer_data):
+    server = fake_wyre(completion_delay=60)
+    wyre_api = WyreAPI(api_url=server.url)
+
+    transfer = wyre_api.create_transfer(make_transfer_data())
+    assert transfer["status"] == "PENDING"
+    assert wyre_api.get_transfer_by_id(transfer["id"])["status"] == "PENDING"
+
+    server.state._transfers[transfer["id"]]["_settles_at"] = 0
+    transfer_data = wyre_api.get_transfer_by_id(transfer["id"])
+    assert transfer_data["status"] == "COMPLETED"
+    assert len(transfer_data["blockchainTx"]["networkTxId"]) == 64
+
+
+def test_transfers_fail(fake_wyre, make_wyre, make_transfer_data):
+    server = fake_wyre(failure_rate=1)
+    wyre = Wyre(api_url=server.url, polling_policy=NO_DELAY_POLLING_POLICY)
+
+    transfer_id = wyre.create_transfer(make_transfer_data())
+
+    with pytest.raises(RuntimeError):
+        wyre.get_stellar_transaction_id(transfer_id)
+
+
+def test_create_transfer_is_idempotent(fake_wyre, make_transfer_data):
+    server = fake_wyre()
+    wyre_api = WyreAPI(api_url=server.url)
+    transfer_data = make_transfer_data()
+    transfer_data.idempotency_key = "polaris:1"
+
+    first = wyre_api.create_transfer(transfer_data)
+    second = wyre_api.create_transfer(transfer_data)
+
+    assert first["id"] == second["id"]
+    assert first["customId"] == "polaris:1"
+
+
+def test_list_transfers(fake_wyre, make_transfer_data):
+    server = fake_wyre()
+    wyre_api = WyreAPI(api_url=server.url)
+    transfer_ids = [
+        wyre_api.create_transfer(make_transfer_data())["id"] for _ in range(5)
+    ]
+
+    listed = [transfer["id"] for transfer in wyre_api.list_transfers(page_size=2)]
+
+    assert listed == transfer_ids[::-1]
+    assert server.request_counts[("GET", "v3/transfers")] == 3
+
+
+def test_get_unknown_transfer(fake_wyre):
+    server = fake_wyre()
+    wyre_api = WyreAPI(api_url=server.url)
+
+    with pytest.raises(WyreAPIError) as exc_info:
+        wyre_api.get_transfer_by_id("TF_UNKNOWN")
+
+    assert exc_info.value.response.status_code == 404
+    assert server.request_counts[("GET", "v3/transfers/:id")] == 1
+
+
+def test_injects_rate_limits(fake_wyre):
+    server = fake_wyre(rate_limit_rate=1, retry_after=7)
+    wyre_api = WyreAPI(api_url=server.url, retry_policy=NO_RETRY_POLICY)
+
+    with pytest.raises(WyreAPIError) as exc_info:
+        wyre_api.get_account()
+
+    assert exc_info.value.response.status_code == 429
+    assert exc_info.value.response.headers["Retry-After"] == "7"
+
+
+def test_injects_errors(fake_wyre):
+    server = fake_wyre(error_rate=1)
+    wyre_api = WyreAPI(api_url=server.url, retry_policy=NO_RETRY_POLICY)
+
+    with pytest.raises(WyreAPIError) as exc_info:
+        wyre_api.get_account()
+
+    assert exc_info.value.response.status_code in (502, 503)
+
+
+def test_injects_timeouts(fake_wyre):
+    server = fake_wyre(timeout_rate=1, timeout_delay=1)
+    wyre_api = WyreAPI(
+        api_url=server.url,
+        retry_policy=NO_RETRY_POLICY,
+        connection_settings=ConnectionSettings(read_timeout=0.1),
+    )
+
+    with pytest.raises(requests.Timeout):
+        wyre_api.get_account()
+
+
+def test_rejects_invalid_rates():
+    with pytest.raises(ValueError):
+        FakeWyreSettings(error_rate=2)
@@ -0,0 +1,75 @@
+import pytest
+from stellar_sdk.client.response import Response
+from stellar_sdk.exceptions import NotFoundError
+
+from polaris_wyre.wyre.horizon import HorizonClient, HorizonSettings
+from polaris_wyre.wyre.polling import PollingPolicy
+
+from .mocks import constants
+
+
+def make_not_found_error() -> NotFoundError:
+    return NotFoundError(
+        Response(
+            status_code=404,
+            text='{"status": 404, "title": "Resource Missing"}',
+            headers={},
+            url="https://horizon-testnet.stellar.org/transactions/abc",
+        )
+    )
+
+
+def test_server_is_reused(mocker):
+    server_mock = mocker.patch("polaris_wyre.wyre.horizon.Server")
+    horizon = HorizonClient(HorizonSettings(pool_size=3))
+
+    assert horizon.server is horizon.server
+    server_mock.assert_called_once()
+    assert server_mock.call_args.kwargs["client"].pool_size == 3
+
+
+def test_server_is_recreated_after_fork(mocker):
+    server_mock = mocker.patch("polaris_wyre.wyre.horizon.Server")
+    getpid_mock = mocker.patch("polaris_wyre.wyre.horizon.os.getpid", return_value=1)
+    horizon = HorizonClient()
+
+    horizon.server
+    getpid_mock.return_value = 2
+    horizon.server
+
+    assert server_mock.call_count == 2
+
+
+def test_get_transaction_waits_for_ingestion(mocker):
+    server_mock = mocker.patch("polaris_wyre.wyre.horizon.Server")
+    call_mock = (
+        server_mock.return_value.transactions.return_value.transaction.return_value.call
+    )
+    call_mock.side_effect = [
+        make_not_found_error(),
+        constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE,
+    ]
+    sleep_mock = mocker.patch("polaris_wyre.wyre.horizon.time.sleep")
+    horizon = HorizonClient(
+        HorizonSettings(ingestion_policy=PollingPolicy(initial_delay=2, jitter=0))
+    )
+
+    assert horizon.get_transaction("abc") == (
+        constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE
+    )
+    sleep_mock.assert_called_once_with(2)
+
+
+def test_get_transaction_not_ingested(mocker):
+    server_mock = mocker.patch("polaris_wyre.wyre.horizon.Server")
+    call_mock = (
+        server_mock.return_value.transactions.return_value.transaction.return_value.call
+    )
+    call_mock.side_effect = make_not_found_error()
+    mocker.patch("polaris_wyre.wyre.horizon.time.sleep")
+    mocker.patch("polaris_wyre.wyre.horizon.time.monotonic", side_effect=[0, 1, 2, 31])
+    horizon = HorizonClient()
+
+    with pytest.raises(NotFoundError):
+        horizon.get_transaction("abc")
+    assert call_mock.call_count == 3
@@ -0,0 +1,169 @@
+import asyncio
+import math
+
+import pytest
+import requests
+
+from polaris_wyre.testing.fake_horizon import FakeHorizonServer
+from polaris_wyre.testing.fake_wyre import FakeWyreServer, FakeWyreSettings
+from polaris_wyre.wyre.api import WyreAPI
+from polaris_wyre.wyre.api_async import AsyncWyreAPI
+from polaris_wyre.wyre.horizon import HorizonClient
+from polaris_wyre.wyre.instrumentation import (
+    NO_INSTRUMENTATION,
+    Histogram,
+    InMemoryInstrumentation,
+    Instrumentation,
+    RequestEvent,
+)
+from polaris_wyre.wyre.retry import RetryPolicy
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.sum == pytest.approx(2.65)
+    assert histogram.percentile(50) == 0.1
+    assert histogram.percentile(75) == 1.0
+    assert histogram.percentile(99) == math.inf
+    assert histogram.snapshot()["buckets"] == {0.1: 2, 1.0: 1, math.inf: 1}
+
+
+def test_empty_histogram():
+    assert Histogram().percentile(50) == 0.0
+
+
+def test_request_event_outcome():
+    assert RequestEvent("get_account", "GET", 0, 0.1, status=200).outcome == "200"
+    assert (
+        RequestEvent("get_account", "GET", 0, 0.1, error="Timeout").outcome == "Timeout"
+    )
+
+
+def test_wyre_api_is_not_instrumented_by_default(mocker):
+    wyre_api = WyreAPI()
+    perf_counter = mocker.patch("polaris_wyre.wyre.api.time.perf_counter")
+    mocker.patch(
+        "requests.Session.get", return_value=mocker.Mock(ok=True, content=b"{}")
+    )
+
+    wyre_api.get_account()
+
+    assert wyre_api.instrumentation is NO_INSTRUMENTATION
+    perf_counter.assert_not_called()
+
+
+def test_wyre_api_instrumentation(make_transfer_data):
+    instrumentation = InMemoryInstrumentation()
+    with FakeWyreServer() as server:
+        wyre_api = WyreAPI(api_url=server.url, instrumentation=instrumentation)
+        wyre_api.get_account()
+        transfer = wyre_api.create_transfer(make_transfer_data())
+        wyre_api.get_transfer_by_id(transfer["id"])
+        with pytest.raises(requests.HTTPError):
+            wyre_api.get_transfer_by_id("TF_UNKNOWN")
+
+    snapshot = instrumentation.snapshot()
+    assert set(snapshot) == {
+        "GET get_account",
+        "POST create_transfer",
+        "GET get_transfer",
+    }
+    assert snapshot["GET get_transfer"]["outcomes"] == {"200": 1, "404": 1}
+    assert snapshot["GET get_transfer"]["duration"]["count"] == 2
+    assert snapshot["GET get_transfer"]["in_flight"] == 0
+    assert snapshot["POST create_transfer"]["bytes_sent"] > 0
+    assert snapshot["GET get_account"]["bytes_sent"] == 0
+    assert snapshot["GET get_account"]["bytes_received"] > 0
+
+
+def test_wyre_api_instrumentation_counts_retries():
+    instrumentation = InMemoryInstrumentation()
+    retry_policy = RetryPolicy(max_retries=2, backoff_factor=0)
+    with FakeWyreServer(FakeWyreSettings(error_rate=1)) as server:
+        wyre_api = WyreAPI(
+            api_url=server.url,
+            retry_policy=retry_policy,
+            instrumentation=instrumentation,
+        )
+        with pytest.raises(requests.HTTPError):
+            wyre_api.get_account()
+
+    measures = instrumentation.snapshot()["GET get_account"]
+    assert measures["duration"]["count"] == 3
+    assert measures["retries"] == 2
+
+
+def test_wyre_api_instrumentation_records_errors(mocker):
+    instrumentation = InMemoryInstrumentation()
+    wyre_api = WyreAPI(
+        retry_policy=RetryPolicy(max_retries=0), instrumentation=instrumentation
+    )
+    mocker.patch("requests.Session.get", side_effect=requests.ConnectTimeout())
+
+    with pytest.raises(requests.ConnectTimeout):
+        wyre_api.get_account()
+
+    measures = instrumentation.snapshot()["GET get_account"]
+    assert measures["outcomes"] == {"ConnectTimeout": 1}
+    assert measures["in_flight"] == 0
+
+
+def test_custom_instrumentation(mocker):
+    class Recorder(Instrumentation):
+        enabled = True
+
+        def __init__(self):
+            self.calls = []
+
+        def before_request(self, endpoint, method, retries):
+            self.calls.append(("before", endpoint, method, retries))
+
+        def after_request(self, event):
+            self.calls.append(("after", event.endpoint, event.status))
+
+    recorder = Recorder()
+    mocker.patch(
+        "requests.Session.get",
+        return_value=mocker.Mock(
+            ok=True, status_code=200, content=b"{}", request=mocker.Mock(body=None)
+        ),
+    )
+
+    WyreAPI(instrumentation=recorder).get_account()
+
+    assert recorder.calls == [
+        ("before", "get_account", "GET", 0),
+        ("after", "get_account", 200),
+    ]
+
+
+def test_async_wyre_api_instrumentation(make_transfer_data):
+    instrumentation = InMemoryInstrumentation()
+
+    async def run(url):
+        async with AsyncWyreAPI(api_url=url, instrumentation=instrumentation) as api:
+            await api.get_account()
+            await api.create_transfer(make_transfer_data())
+
+    with FakeWyreServer() as server:
+        asyncio.run(run(server.url))
+
+    snapshot = instrumentation.snapshot()
+    assert snapshot["GET get_account"]["outcomes"] == {"200": 1}
+    assert snapshot["POST create_transfer"]["bytes_sent"] > 0
+
+
+def test_horizon_instrumentation():
+    instrumentation = InMemoryInstrumentation()
+    with FakeHorizonServer() as server:
+        horizon = HorizonClient(horizon_url=server.url, instrumentation=instrumentation)
+        horizon.get_transaction("ab" * 32)
+        horizon.close()
+
+    measures = instrumentation.snapshot()["GET horizon.get_transaction"]
+    assert measures["outcomes"] == {"200": 1}
@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+import pytest
+
+from polaris_wyre.helpers.exceptions import WyreInsufficientBalanceError
+from polaris_wyre.wyre.ledger import BalanceLedger
+
+
+def test_reserve_and_release():
+    ledger = BalanceLedger()
+    ledger.seed("AC_1", {"USDC": Decimal("10.5"), "XLM": None})
+
+    ledger.reserve("AC_1", "USDC", Decimal("10"))
+
+    assert ledger.available("AC_1", "USDC") == Decimal("0.5")
+    assert ledger.available("AC_1", "XLM") == 0
+    with pytest.raises(WyreInsufficientBalanceError) as error:
+        ledger.reserve("AC_1", "USDC", Decimal("1"))
+    assert error.value.available == Decimal("0.5")
+
+    ledger.release("AC_1", "USDC", Decimal("10"))
+
+    assert ledger.available("AC_1", "USDC") == Decimal("10.5")
+
+
+def test_unseeded_account_is_stale(mocker):
+    monotonic_mock = mocker.patch(
+        "polaris_wyre.wyre.ledger.time.monotonic", return_value=100
+    )
+    ledger = BalanceLedger(refresh_interval=60)
+
+    assert ledger.is_stale("AC_1")
+    with pytest.raises(WyreInsufficientBalanceError):
+        ledger.reserve("AC_1", "USDC", Decimal("1"))
+
+    ledger.seed("AC_1", {"USDC": Decimal("1")})
+
+    assert not ledger.is_stale("AC_1")
+    monotonic_mock.return_value = 160
+    assert ledger.is_stale("AC_1")
+
+
+def test_invalid_refresh_interval():
+    with pytest.raises(ValueError):
+        BalanceLedger(refresh_interval=0)
@@ -0,0 +1,46 @@
+import pytest
+
+from polaris_wyre.models import WyreMemo
+from polaris_wyre.wyre.memo import MemoAllocator
+
+
+def test_allocate_unique_memos(db, make_transaction):
+    allocator = MemoAllocator(prefix="W", length=12)
+    transactions = [make_transaction() for _ in range(20)]
+
+    memos = [allocator.allocate(transaction) for transaction in transactions]
+
+    assert len(set(memos)) == 20
+    assert all(len(memo) == 13 and memo.startswith("W") for memo in memos)
+    for memo, transaction in zip(memos, transactions):
+        assert allocator.get_transaction(memo) == transaction
+
+
+def test_allocate_returns_allocated_memo(db, make_transaction):
+    allocator = MemoAllocator()
+    transaction = make_transaction()
+
+    assert allocator.allocate(transaction) == allocator.allocate(transaction)
+    assert WyreMemo.objects.count() == 1
+
+
+def test_allocate_salts_colliding_memos(db, mocker, make_transaction):
+    allocator = MemoAllocator()
+    first, second = make_transaction(), make_transaction()
+    first_memo = allocator.allocate(first)
+    mocker.patch.object(
+        allocator,
+        "_candidate",
+        side_effect=lambda transaction, attempt: first_memo if attempt == 0 else "B",
+    )
+
+    assert allocator.allocate(second) == "B"
+
+
+def test_get_transaction_unknown_memo(db):
+    assert MemoAllocator.get_transaction("UNKNOWN") is None
+
+
+def test_invalid_memo_length():
+    with pytest.raises(ValueError):
+        MemoAllocator(prefix="PREFIX", length=28)
@@ -0,0 +1,145 @@
+import json
+import os
+
+import pytest
+from django.test import RequestFactory
+
+from polaris_wyre import metrics
+from polaris_wyre.metrics import PrometheusMetrics, collect, render_metrics
+from polaris_wyre.models import WyreTransfer
+from polaris_wyre.views import metrics as metrics_view
+from polaris_wyre.wyre.instrumentation import RequestEvent
+
+
+@pytest.fixture(autouse=True)
+def no_instances(mocker):
+    mocker.patch.object(metrics, "_instances", set())
+
+
+def record(prometheus_metrics: PrometheusMetrics) -> None:
+    prometheus_metrics.before_request("get_account", "GET", 0)
+    prometheus_metrics.after_request(
+        RequestEvent("get_account", "GET", 0, 0.02, status=200)
+    )
+    prometheus_metrics.before_request("create_transfer", "POST", 0)
+    prometheus_metrics.after_polling(3, 1.5)
+    prometheus_metrics.after_settling("COMPLETED", 42.0)
+
+
+def test_render_metrics(db, make_transaction):
+    prometheus_metrics = PrometheusMetrics(directory="")
+    metrics._instances.add(prometheus_metrics)
+    record(prometheus_metrics)
+    WyreTransfer.objects.create(transaction=make_transaction(), transfer_id="TF_1")
+    WyreTransfer.objects.create(
+        transaction=make_transaction(),
+        transfer_id="TF_2",
+        status=WyreTransfer.STATUS.COMPLETED,
+    )
+
+    text = render_metrics()
+
+    assert (
+        'polaris_wyre_requests_total{endpoint="get_account",method="GET",'
+        'outcome="200"} 1' in text
+    )
+    assert (
+        'polaris_wyre_requests_in_flight{endpoint="create_transfer",method="POST"} 1'
+        in text
+    )
+    assert (
+        'polaris_wyre_request_duration_seconds_bucket{endpoint="get_account",'
+        'method="GET",le="0.025"} 1' in text
+    )
+    assert (
+        'polaris_wyre_request_duration_seconds_bucket{endpoint="get_account",'
+        'method="GET",le="+Inf"} 1' in text
+    )
+    assert 'polaris_wyre_transfer_polls_bucket{le="2"} 0' in text
+    assert 'polaris_wyre_transfer_polls_bucket{le="3"} 1' in text
+    assert "polaris_wyre_transfer_polls_sum 3" in text
+    assert 'polaris_wyre_transfer_settle_seconds_count{status="COMPLETED"} 1' in text
+    assert 'polaris_wyre_transfers{status="PENDING"} 1' in text
+    assert 'polaris_wyre_transfers{status="CREATED"} 0' in text
+    assert 'polaris_wyre_transfers{status="COMPLETED"}' not in text
+    assert "# TYPE polaris_wyre_request_duration_seconds histogram" in text
+    assert text.endswith("\n")
+
+
+def test_processes_write_their_own_files(tmp_path):
+    prometheus_metrics = PrometheusMetrics(directory=str(tmp_path), flush_interval=0)
+    record(prometheus_metrics)
+
+    assert os.listdir(tmp_path) == [os.path.basename(prometheus_metrics.path)]
+    with open(prometheus_metrics.path) as state_file:
+        state = json.load(state_file)
+    assert state["pid"] == os.getpid()
+    assert state["requests"] == [["get_account", "GET", "200", 1]]
+
+
+def test_flushes_are_throttled(tmp_path):
+    prometheus_metrics = PrometheusMetrics(directory=str(tmp_path), flush_interval=60)
+    record(prometheus_metrics)
+
+    with open(prometheus_metrics.path) as state_file:
+        state = json.load(state_file)
+    assert state["polls"]["counts"] == [0] * 9
+
+
+def test_collect_merges_processes(mocker):
+    first, second = PrometheusMetrics(directory=""), PrometheusMetrics(directory="")
+    record(first)
+    record(second)
+    dead_state = second.state()
+    dead_state["pid"] = 123456
+    mocker.patch.object(metrics, "is_alive", side_effect=lambda pid: pid != 123456)
+
+    merged = collect([first.state(), dead_state])
+
+    assert merged["requests"][("get_account", "GET", "200")] == 2
+    assert merged["in_flight"][("create_transfer", "POST")] == 1
+    assert merged["durations"][("get_account", "GET")].count == 2
+    assert merged["polls"][()].sum == 6
+    assert merged["settle_durations"][("COMPLETED",)].count == 2
+
+
+def test_render_metrics_reads_directory(db, tmp_path):
+    PrometheusMetrics(directory=str(tmp_path), flush_interval=0).after_polling(3, 1)
+    PrometheusMetrics(directory=str(tmp_path), flush_interval=0).after_polling(5, 1)
+
+    text = render_metrics(str(tmp_path))
+
+    assert "polaris_wyre_transfer_polls_count 2" in text
+    assert "polaris_wyre_transfer_polls_sum 8" in text
+
+
+def test_forked_process_resets_measures(mocker):
+    prometheus_metrics = PrometheusMetrics(directory="")
+    record(prometheus_metrics)
+    mocker.patch("polaris_wyre.metrics.os.getpid", return_value=123456)
+
+    prometheus_metrics.after_polling(1, 0)
+
+    assert prometheus_metrics.polls.count == 1
+    assert not prometheus_metrics.outcomes
+
+
+def test_label_values_are_escaped():
+    assert metrics.format_labels(("endpoint",), ('a"b\\c\n',)) == (
+        '{endpoint="a\\"b\\\\c\\n"}'
+    )
+
+
+def test_metrics_view(db, settings):
+    settings.WYRE_METRICS_TOKEN = "metricstoken"
+    factory = RequestFactory()
+
+    forbidden = metrics_view(factory.get("/wyre/metrics/"))
+    response = metrics_view(
+        factory.get("/wyre/metrics/", HTTP_AUTHORIZATION="Bearer metricstoken")
+    )
+
+    assert forbidden.status_code == 403
+    assert response.status_code == 200
+    assert response["Content-Type"] == metrics.CONTENT_TYPE
+    assert b"polaris_wyre_transfers" in response.content
@@ -0,0 +1,52 @@
+import threading
+
+from polaris_wyre.wyre.notifications import TransferNotifier
+
+
+def test_wait_returns_existing_update():
+    notifier = TransferNotifier()
+    notifier.notify("TF_1", {"status": "COMPLETED"})
+
+    assert notifier.wait("TF_1", timeout=0) == {"status": "COMPLETED"}
+
+
+def test_wait_times_out():
+    notifier = TransferNotifier()
+
+    assert notifier.wait("TF_1", timeout=0.01) is None
+
+
+def test_notify_wakes_waiter():
+    notifier = TransferNotifier()
+    results = []
+    waiter = threading.Thread(
+        target=lambda: results.append(notifier.wait("TF_1", timeout=5))
+    )
+    waiter.start()
+
+    notifier.notify("TF_1", {"status": "FAILED"})
+    waiter.join()
+
+    assert results == [{"status": "FAILED"}]
+
+
+def test_updates_are_bounded():
+    notifier = TransferNotifier(max_updates=2)
+
+    for transfer_id in ("TF_1", "TF_2", "TF_3"):
+        notifier.notify(transfer_id, {"status": "COMPLETED"})
+
+    assert notifier.get("TF_1") is None
+    assert notifier.get("TF_3") is not None
+
+
+def test_subscribers(mocker):
+    notifier = TransferNotifier()
+    subscriber = mocker.Mock()
+    notifier.subscribe(subscriber)
+
+    notifier.notify("TF_1", {"status": "COMPLETED"})
+    notifier.unsubscribe(subscriber)
+    notifier.notify("TF_2", {"status": "COMPLETED"})
+
+    subscriber.assert_called_once_with("TF_1", {"status": "COMPLETED"})
@@ -0,0 +1,48 @@
+import pytest
+
+from polaris_wyre.wyre.polling import PollingPolicy
+
+
+def test_intervals_grow_exponentially_up_to_max_interval():
+    policy = PollingPolicy(initial_delay=1, multiplier=2, max_interval=5, jitter=0)
+    intervals = policy.intervals()
+
+    assert [next(intervals) for _ in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_intervals_are_jittered_within_bounds():
+    policy = PollingPolicy(initial_delay=10, multiplier=1, max_interval=20, jitter=0.5)
+    intervals = policy.intervals()
+
+    for _ in range(100):
+        assert 5 <= next(intervals) <= 15
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"initial_delay": -1},
+        {"multiplier": 0.5},
+        {"jitter": 2},
+        {"deadline": 0},
+    ],
+)
+def test_invalid_policy(kwargs):
+    with pytest.raises(ValueError):
+        PollingPolicy(**kwargs)
+
+
+def test_next_interval_is_clamped_to_deadline():
+    policy = PollingPolicy(initial_delay=4, multiplier=1, jitter=0, deadline=10)
+    intervals = policy.intervals()
+
+    assert policy.next_interval(intervals, elapsed=0) == 4
+    assert policy.next_interval(intervals, elapsed=8) == 2
+    assert policy.next_interval(intervals, elapsed=10) is None
+
+
+def test_interval_after_matches_intervals():
+    policy = PollingPolicy(initial_delay=1, multiplier=2, max_interval=5, jitter=0)
+
+    assert [policy.interval_after(polls) for polls in range(6)] == [1, 1, 2, 4, 5, 5]
+    assert policy.interval_after(10_000) == 5
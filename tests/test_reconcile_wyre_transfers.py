@@ -0,0 +1,170 @@
+import json
+from io import StringIO
+
+import pytest
+import requests
+from django.core.management import CommandError, call_command
+from polaris.models import Transaction
+
+from polaris_wyre.helpers.exceptions import WyreAPIError, WyreCircuitOpenError
+from polaris_wyre.models import WyreTransfer
+
+
+@pytest.fixture
+def wyre_integration(mocker, make_wyre_integration):
+    wyre_integration = make_wyre_integration()
+    mocker.patch(
+        "polaris.integrations.registered_custody_integration", wyre_integration
+    )
+    return wyre_integration
+
+
+@pytest.fixture
+def make_completed_deposit(make_transaction):
+    def _make_completed_deposit(stellar_transaction_id: str = "abc", **kwargs):
+        return make_transaction(
+            kind=Transaction.KIND.deposit,
+            status=Transaction.STATUS.completed,
+            stellar_transaction_id=stellar_transaction_id,
+            **kwargs,
+        )
+
+    return _make_completed_deposit
+
+
+def completed_transfer(network_tx_id: str) -> dict:
+    return {"status": "COMPLETED", "blockchainTx": {"networkTxId": network_tx_id}}
+
+
+def reconcile(*args) -> list:
+    stdout = StringIO()
+    call_command("reconcile_wyre_transfers", *args, stdout=stdout, stderr=StringIO())
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+def test_reconcile_reports_mismatches(
+    db, mocker, wyre_integration, make_completed_deposit, make_transaction
+):
+    matching = make_completed_deposit("abc")
+    WyreTransfer.objects.create(
+        transaction=matching,
+        transfer_id="TF_MATCHING",
+        status=WyreTransfer.STATUS.COMPLETED,
+        network_tx_id="abc",
+    )
+    wrong_hash = make_completed_deposit("abc")
+    WyreTransfer.objects.create(
+        transaction=wrong_hash,
+        transfer_id="TF_WRONG_HASH",
+        status=WyreTransfer.STATUS.COMPLETED,
+        network_tx_id="abc",
+    )
+    untracked = make_completed_deposit()
+    pending = make_transaction(status=Transaction.STATUS.pending_anchor)
+    WyreTransfer.objects.create(transaction=pending, transfer_id="TF_PENDING")
+
+    transfers = {
+        "TF_MATCHING": completed_transfer("abc"),
+        "TF_WRONG_HASH": completed_transfer("def"),
+        "TF_PENDING": completed_transfer("ghi"),
+    }
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id", side_effect=transfers.get
+    )
+
+    lines = {line["transaction_id"]: line for line in reconcile()}
+
+    assert str(matching.id) not in lines
+    assert lines[str(wrong_hash.id)]["issues"] == ["stellar_transaction_mismatch"]
+    assert lines[str(wrong_hash.id)]["wyre"]["network_tx_id"] == "def"
+    assert lines[str(untracked.id)]["issues"] == ["missing_transfer"]
+    assert lines[str(pending.id)]["issues"] == [
+        "status_mismatch",
+        "transaction_not_completed",
+    ]
+
+
+def test_reconcile_reports_wyre_errors(
+    db, mocker, wyre_integration, make_completed_deposit
+):
+    missing = make_completed_deposit()
+    WyreTransfer.objects.create(transaction=missing, transfer_id="TF_MISSING")
+    unavailable = make_completed_deposit()
+    WyreTransfer.objects.create(transaction=unavailable, transfer_id="TF_UNAVAILABLE")
+
+    def get_transfer_by_id(transfer_id):
+        response = mocker.Mock(status_code=404 if transfer_id == "TF_MISSING" else 503)
+        raise WyreAPIError("error", response=response)
+
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=get_transfer_by_id,
+    )
+
+    lines = {line["transaction_id"]: line for line in reconcile()}
+
+    assert lines[str(missing.id)]["issues"] == ["transfer_not_found"]
+    assert lines[str(unavailable.id)]["issues"] == ["wyre_error"]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        requests.ConnectionError("connection refused"),
+        requests.Timeout("read timed out"),
+        WyreCircuitOpenError("transfers", 30),
+    ],
+)
+def test_reconcile_reports_unreachable_wyre(
+    db, mocker, wyre_integration, make_completed_deposit, error
+):
+    transaction = make_completed_deposit()
+    WyreTransfer.objects.create(transaction=transaction, transfer_id="TF_1")
+    mocker.patch("polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id", side_effect=error)
+
+    (line,) = reconcile()
+
+    assert line["issues"] == ["wyre_error"]
+    assert line["error"] == str(error)
+
+
+def test_reconcile_resumes_from_checkpoint(
+    db, tmp_path, mocker, wyre_integration, make_completed_deposit
+):
+    transactions = sorted(
+        (make_completed_deposit() for _ in range(3)), key=lambda tx: tx.pk
+    )
+    checkpoint = tmp_path / "checkpoint.json"
+    output = tmp_path / "report.jsonl"
+
+    reconcile("--chunk-size", "2", "--checkpoint", str(checkpoint))
+    progress = json.loads(checkpoint.read_text())
+    assert progress == {
+        "last_transaction_id": str(transactions[-1].id),
+        "processed": 3,
+        "mismatched": 3,
+    }
+
+    checkpoint.write_text(
+        json.dumps(
+            {
+                "last_transaction_id": str(transactions[0].id),
+                "processed": 1,
+                "mismatched": 1,
+            }
+        )
+    )
+    reconcile("--checkpoint", str(checkpoint), "--output", str(output))
+    reported = [json.loads(line)["transaction_id"] for line in output.open()]
+    assert reported == [str(transaction.id) for transaction in transactions[1:]]
+    assert json.loads(checkpoint.read_text())["processed"] == 3
+
+    reconcile("--checkpoint", str(checkpoint), "--restart", "--output", str(output))
+    assert len(output.read_text().splitlines()) == 5
+
+
+def test_reconcile_requires_wyre_integration(db, mocker):
+    mocker.patch("polaris.integrations.registered_custody_integration", object())
+
+    with pytest.raises(CommandError):
+        reconcile()
@@ -0,0 +1,76 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from polaris_wyre.wyre.retry import (
+    RetryPolicy,
+    RetryStats,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+def test_should_retry():
+    policy = RetryPolicy(max_retries=2)
+
+    assert policy.should_retry(0, 429)
+    assert policy.should_retry(1, 503)
+    assert policy.should_retry(0, None)
+    assert not policy.should_retry(0, 400)
+    assert not policy.should_retry(2, 503)
+
+
+def test_wait_time_honours_retry_after():
+    policy = RetryPolicy(max_retry_after=10)
+
+    assert policy.wait_time(0, "3") == 3
+    assert policy.wait_time(0, "120") == 10
+
+
+def test_wait_time_backoff():
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+
+    for attempt in range(5):
+        assert 0 <= policy.wait_time(attempt) <= min(2**attempt, 5)
+
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+    assert 25 <= parse_retry_after(format_datetime(retry_at, usegmt=True)) <= 30
+    assert parse_retry_after("not a date") is None
+
+
+def test_token_bucket(mocker):
+    monotonic = mocker.patch("polaris_wyre.wyre.retry.time.monotonic", return_value=0)
+    bucket = TokenBucket(rate=2, capacity=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0.5
+    assert bucket.reserve() == 1
+
+    monotonic.return_value = 10
+    assert bucket.reserve() == 0
+
+
+def test_token_bucket_invalid_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_retry_stats():
+    stats = RetryStats()
+
+    stats.record_retry("429", 1.5)
+    stats.record_retry("429", 0.5)
+    stats.record_retry("ConnectionError", 1)
+    stats.record_rate_limit_wait(0.25)
+
+    assert stats.snapshot() == {
+        "retries": 3,
+        "retry_wait": 3,
+        "rate_limit_wait": 0.25,
+        "retries_by_reason": {"429": 2, "ConnectionError": 1},
+    }
@@ -0,0 +1,132 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from polaris_wyre.helpers.exceptions import WyreTransferTimeoutError
+from polaris_wyre.wyre.polling import PollingPolicy
+from polaris_wyre.wyre.tracker import TransferTracker
+
+NO_DELAY_POLLING_POLICY = PollingPolicy(initial_delay=0, jitter=0, deadline=None)
+
+
+def make_check_transfer(statuses: dict):
+    lock = threading.Lock()
+
+    def _check_transfer(transfer_id: str):
+        with lock:
+            remaining = statuses[transfer_id]
+            status = remaining.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return status
+
+    return _check_transfer
+
+
+def test_track_many_transfers():
+    statuses = {
+        f"TF_{index}": [None] * (index % 3) + [f"tx_{index}"] for index in range(50)
+    }
+    finished = []
+    tracker = TransferTracker(
+        check_transfer=make_check_transfer(statuses),
+        polling_policy=NO_DELAY_POLLING_POLICY,
+        on_finished=lambda *args: finished.append(args),
+        max_workers=2,
+    )
+
+    futures = {transfer_id: tracker.track(transfer_id) for transfer_id in statuses}
+
+    for index in range(50):
+        assert futures[f"TF_{index}"].result(timeout=5) == f"tx_{index}"
+    tracker.close()
+
+    polls = {transfer_id: polls for transfer_id, polls, _ in finished}
+    assert polls == {f"TF_{index}": index % 3 + 1 for index in range(50)}
+    assert len(tracker) == 0
+
+
+def test_track_same_transfer_returns_same_future():
+    tracker = TransferTracker(
+        check_transfer=make_check_transfer({"TF_1": [None] * 1000 + ["tx"]}),
+        polling_policy=PollingPolicy(initial_delay=60, deadline=None),
+    )
+
+    assert tracker.track("TF_1") is tracker.track("TF_1")
+    assert len(tracker) == 1
+    tracker.close()
+
+
+def test_track_transfer_error():
+    tracker = TransferTracker(
+        check_transfer=make_check_transfer(
+            {"TF_1": [None, RuntimeError("Wyre failed to complete the transfer.")]}
+        ),
+        polling_policy=NO_DELAY_POLLING_POLICY,
+    )
+
+    with pytest.raises(RuntimeError, match="Wyre failed to complete the transfer."):
+        tracker.track("TF_1").result(timeout=5)
+    tracker.close()
+
+
+def test_track_transfer_timeout():
+    tracker = TransferTracker(
+        check_transfer=lambda transfer_id: None,
+        polling_policy=PollingPolicy(initial_delay=0.01, jitter=0, deadline=0.05),
+    )
+
+    with pytest.raises(WyreTransferTimeoutError):
+        tracker.track("TF_1").result(timeout=5)
+    tracker.close()
+
+
+def test_close_cancels_pending_transfers():
+    tracker = TransferTracker(
+        check_transfer=lambda transfer_id: None,
+        polling_policy=PollingPolicy(initial_delay=60, deadline=None),
+    )
+    future = tracker.track("TF_1")
+
+    tracker.close()
+
+    assert future.cancelled()
+    with pytest.raises(RuntimeError):
+        tracker.track("TF_2")
+
+
+def test_close_while_polling_cancels_the_transfer(caplog):
+    tracker = None
+
+    def check_transfer(transfer_id: str):
+        tracker.close(wait=False)
+        return "tx"
+
+    tracker = TransferTracker(
+        check_transfer=check_transfer, polling_policy=NO_DELAY_POLLING_POLICY
+    )
+    future = tracker.track("TF_1")
+
+    with pytest.raises(CancelledError):
+        future.result(timeout=5)
+    tracker._executor.shutdown(wait=True)
+    assert future.cancelled()
+    assert "Exception" not in caplog.text
+
+
+def test_wake_polls_transfer_right_away():
+    statuses = {"TF_1": [None, "tx"]}
+    tracker = TransferTracker(
+        check_transfer=make_check_transfer(statuses),
+        polling_policy=PollingPolicy(initial_delay=60, jitter=0, deadline=None),
+    )
+    future = tracker.track("TF_1")
+    while statuses["TF_1"] != ["tx"]:
+        time.sleep(0.01)
+
+    tracker.wake("TF_1")
+
+    assert future.result(timeout=5) == "tx"
+    tracker.close()
@@ -0,0 +1,198 @@
+import base64
+import json
+import threading
+
+import pytest
+from django.test import RequestFactory
+
+from polaris_wyre.helpers.exceptions import WyreAPIError
+from polaris_wyre.models import WyreTransfer
+from polaris_wyre.views import transfer_callback
+from polaris_wyre.wyre.integration import WyreIntegration
+from polaris_wyre.wyre.notifications import transfer_notifier
+from polaris_wyre.wyre.polling import PollingPolicy
+
+WEBHOOK_SECRET = "webhooksecret"
+NETWORK_TX_ID = "7586ec0223fc193da6fc609b92a62a96ae86258873480d8bc288723e29028cd3"
+
+
+@pytest.fixture(autouse=True)
+def webhook_secret(settings):
+    settings.WYRE_WEBHOOK_SECRET = WEBHOOK_SECRET
+
+
+@pytest.fixture(autouse=True)
+def wyre_integration(mocker):
+    wyre_integration = WyreIntegration()
+    mocker.patch(
+        "polaris.integrations.registered_custody_integration", wyre_integration
+    )
+    return wyre_integration
+
+
+@pytest.fixture
+def wyre_transfers(mocker):
+    transfers = {}
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id", side_effect=transfers.get
+    )
+    return transfers
+
+
+def basic_authorization(secret: str = WEBHOOK_SECRET) -> str:
+    credentials = base64.b64encode(f"wyre:{secret}".encode()).decode()
+    return f"Basic {credentials}"
+
+
+def post_callback(data, authorization: str = None):
+    if authorization is None:
+        authorization = basic_authorization()
+    request = RequestFactory().post(
+        "/wyre/transfers/callback/",
+        data=json.dumps(data),
+        content_type="application/json",
+        HTTP_AUTHORIZATION=authorization,
+    )
+    return transfer_callback(request)
+
+
+def completed_transfer(transfer_id: str) -> dict:
+    return {
+        "id": transfer_id,
+        "status": "COMPLETED",
+        "blockchainTx": {"networkTxId": NETWORK_TX_ID},
+    }
+
+
+def test_transfer_callback_completed(db, make_transaction, wyre_transfers):
+    wyre_transfer = WyreTransfer.objects.create(
+        transaction=make_transaction(), transfer_id="TF_1"
+    )
+    wyre_transfers["TF_1"] = completed_transfer("TF_1")
+
+    response = post_callback({"id": "TF_1"})
+
+    assert response.status_code == 200
+    wyre_transfer.refresh_from_db()
+    assert wyre_transfer.status == WyreTransfer.STATUS.COMPLETED
+    assert wyre_transfer.network_tx_id == NETWORK_TX_ID
+    assert transfer_notifier.get("TF_1")["status"] == "COMPLETED"
+    transfer_notifier.discard("TF_1")
+
+
+def test_transfer_callback_body_is_not_trusted(db, make_transaction, wyre_transfers):
+    wyre_transfer = WyreTransfer.objects.create(
+        transaction=make_transaction(), transfer_id="TF_1"
+    )
+    wyre_transfers["TF_1"] = {"id": "TF_1", "status": "PENDING"}
+
+    response = post_callback(completed_transfer("TF_1"))
+
+    assert response.status_code == 200
+    wyre_transfer.refresh_from_db()
+    assert wyre_transfer.status == WyreTransfer.STATUS.PENDING
+    assert wyre_transfer.network_tx_id is None
+    assert transfer_notifier.get("TF_1") is None
+
+
+def test_transfer_callback_uses_the_transfer_account(db, mocker, make_transaction):
+    from polaris_wyre.wyre.accounts import WyreAccount
+    from polaris_wyre.wyre.api import WyreAPI
+
+    wyre_integration = WyreIntegration(
+        accounts=[
+            WyreAccount(account_id="AC_1", api_token="token1"),
+            WyreAccount(account_id="AC_2", api_token="token2"),
+        ]
+    )
+    mocker.patch(
+        "polaris.integrations.registered_custody_integration", wyre_integration
+    )
+    get_transfer_mock = mocker.patch.object(
+        WyreAPI,
+        "get_transfer_by_id",
+        autospec=True,
+        return_value={"id": "TF_1", "status": "PENDING"},
+    )
+    WyreTransfer.objects.create(
+        transaction=make_transaction(), transfer_id="TF_1", account_id="AC_2"
+    )
+
+    assert post_callback({"id": "TF_1"}).status_code == 200
+
+    (api, transfer_id), _ = get_transfer_mock.call_args
+    assert (api.ACCOUNT_ID, transfer_id) == ("AC_2", "TF_1")
+
+
+def test_transfer_callback_wyre_error(db, mocker):
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=WyreAPIError("Wyre is down"),
+    )
+
+    assert post_callback({"id": "TF_1"}).status_code == 502
+
+
+@pytest.mark.parametrize(
+    "authorization",
+    [
+        basic_authorization("wrong"),
+        "Bearer wrong",
+        f"Token {WEBHOOK_SECRET}",
+        "Basic not-base64",
+        "",
+    ],
+)
+def test_transfer_callback_invalid_secret(db, wyre_transfers, authorization):
+    response = post_callback({"id": "TF_1"}, authorization=authorization)
+
+    assert response.status_code == 403
+
+
+def test_transfer_callback_bearer_secret(db, wyre_transfers):
+    wyre_transfers["TF_1"] = {"id": "TF_1", "status": "PENDING"}
+
+    response = post_callback({"id": "TF_1"}, authorization=f"Bearer {WEBHOOK_SECRET}")
+
+    assert response.status_code == 200
+
+
+def test_transfer_callback_without_secret(db, settings):
+    settings.WYRE_WEBHOOK_SECRET = ""
+
+    response = post_callback({"id": "TF_1"}, authorization=basic_authorization(""))
+
+    assert response.status_code == 403
+
+
+def test_transfer_callback_bad_request(db):
+    assert post_callback({"status": "COMPLETED"}).status_code == 400
+    assert post_callback(["TF_1"]).status_code == 400
+
+
+def test_transfer_callback_wakes_waiter(db, mocker, make_wyre):
+    get_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        return_value={"status": "PENDING"},
+    )
+    wyre = make_wyre(
+        polling_policy=PollingPolicy(initial_delay=60, jitter=0, deadline=None)
+    )
+    results = []
+    polled = threading.Event()
+    get_transfer_mock.side_effect = lambda transfer_id: (
+        polled.set() or {"status": "PENDING"}
+    )
+    waiter = threading.Thread(
+        target=lambda: results.append(wyre.get_stellar_transaction_id("TF_3"))
+    )
+    waiter.start()
+    assert polled.wait(timeout=5)
+
+    get_transfer_mock.side_effect = None
+    get_transfer_mock.return_value = completed_transfer("TF_3")
+    post_callback({"id": "TF_3"})
+    waiter.join(timeout=5)
+
+    assert results == [NETWORK_TX_ID]
+    assert transfer_notifier.get("TF_3") is None
@@ -1,6 +1,11 @@
 import pytest
 from django.conf import settings
 
+from polaris_wyre.helpers.exceptions import (
+    WyreTransferFailedError,
+    WyreTransferTimeoutError,
+)
+from polaris_wyre.wyre.polling import PollingPolicy
 from .mocks import wyre as wyre_mocks
 
 
@@ -49,15 +54,25 @@ def test_get_stellar_transaction_id_runtime_error(mocker, make_wyre):
             {"status": "PENDING"},
             {"status": "PENDING"},
             {"status": "PENDING"},
-            {"status": "FAILED"},
+            {
+                "id": "TF_ABC1234",
+                "status": "FAILED",
+                "failureReason": "Insufficient funds",
+            },
         ],
     )
 
     wyre = make_wyre()
 
-    with pytest.raises(RuntimeError, match="Wyre failed to complete the transfer."):
+    with pytest.raises(WyreTransferFailedError) as exc_info:
         wyre.get_stellar_transaction_id("TF_ABC1234")
 
+    assert exc_info.value.transfer_id == "TF_ABC1234"
+    assert exc_info.value.failure_reason == "Insufficient funds"
+    assert str(exc_info.value) == (
+        "Wyre failed to complete transfer TF_ABC1234 (FAILED): Insufficient funds."
+    )
+
     wyre_api_mock.assert_called()
 
 
@@ -80,3 +95,124 @@ def test_create_transfer(mocker, make_wyre, make_transfer_data):
     wyre_api_mock.assert_called_with(transfer_data)
 
     assert transfer_id == wyre_api_mock.return_value.get("id")
+
+
+def test_get_stellar_transaction_id_sleeps_between_polls(mocker, make_wyre):
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=[
+            {"status": "PENDING"},
+            {"status": "PENDING"},
+            {"status": "COMPLETED", "blockchainTx": {"networkTxId": "abc"}},
+        ],
+    )
+    wait_mock = mocker.patch("polaris_wyre.wyre.wyre.Wyre._wait_for_update")
+    poll_listener = mocker.Mock()
+
+    wyre = make_wyre(
+        polling_policy=PollingPolicy(initial_delay=1, multiplier=3, jitter=0)
+    )
+    wyre.poll_listener = poll_listener
+
+    assert wyre.get_stellar_transaction_id("TF_ABC1234") == "abc"
+
+    assert wait_mock.call_args_list == [
+        mocker.call("TF_ABC1234", 1),
+        mocker.call("TF_ABC1234", 3),
+    ]
+    poll_listener.assert_called_once_with("TF_ABC1234", 3, mocker.ANY)
+
+
+def test_get_stellar_transaction_id_timeout(mocker, make_wyre):
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        return_value={"status": "PENDING"},
+    )
+    mocker.patch("polaris_wyre.wyre.wyre.Wyre._wait_for_update")
+    mocker.patch("polaris_wyre.wyre.wyre.time.monotonic", side_effect=[0, 5, 11, 11])
+    poll_listener = mocker.Mock()
+
+    wyre = make_wyre(polling_policy=PollingPolicy(initial_delay=1, deadline=10))
+    wyre.poll_listener = poll_listener
+
+    with pytest.raises(WyreTransferTimeoutError) as exc_info:
+        wyre.get_stellar_transaction_id("TF_ABC1234")
+
+    assert exc_info.value.transfer_id == "TF_ABC1234"
+    assert exc_info.value.polls == 2
+    poll_listener.assert_called_once_with("TF_ABC1234", 2, 11)
+
+
+def test_track_transfer(mocker, make_wyre):
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=[
+            {"status": "PENDING"},
+            {"status": "COMPLETED", "blockchainTx": {"networkTxId": "abc"}},
+        ],
+    )
+    poll_listener = mocker.Mock()
+
+    wyre = make_wyre()
+    wyre.poll_listener = poll_listener
+
+    assert wyre.track_transfer("TF_ABC1234").result(timeout=5) == "abc"
+    wyre.close()
+
+    poll_listener.assert_called_once_with("TF_ABC1234", 2, mocker.ANY)
+
+
+def test_get_account_is_cached(mocker, make_wyre, make_wyre_xlm_address):
+    wyre_api_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_account",
+        return_value={"depositAddresses": {"XLM": make_wyre_xlm_address}},
+    )
+
+    wyre = make_wyre()
+
+    assert wyre.get_account() == wyre.get_account()
+    wyre_api_mock.assert_called_once()
+
+    wyre.invalidate_account_cache()
+    wyre.get_account()
+    assert wyre_api_mock.call_count == 2
+
+
+def test_sync_statuses(mocker, make_wyre):
+    history = [
+        {"id": "TF_1", "status": "PENDING"},
+        {"id": "TF_OTHER", "status": "COMPLETED"},
+        {
+            "id": "TF_2",
+            "status": "COMPLETED",
+            "blockchainTx": {"networkTxId": "abc"},
+        },
+        {"id": "TF_3", "status": "FAILED"},
+    ]
+    list_transfers_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.list_transfers", return_value=iter(history)
+    )
+    notifier = mocker.Mock()
+
+    wyre = make_wyre()
+    wyre.notifier = notifier
+    statuses = wyre.sync_statuses(["TF_1", "TF_2", "TF_4"], page_size=50)
+
+    list_transfers_mock.assert_called_once_with(page_size=50, max_pages=2)
+    assert statuses == {"TF_1": history[0], "TF_2": history[2]}
+    notifier.notify.assert_called_once_with("TF_2", history[2])
+
+
+@pytest.mark.parametrize(
+    "kwargs, max_pages",
+    [({}, 3), ({"max_pages": 10}, 10), ({"scan_all": True}, None)],
+)
+def test_sync_statuses_bounds_the_history(mocker, make_wyre, kwargs, max_pages):
+    list_transfers_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.list_transfers", return_value=iter([])
+    )
+
+    wyre = make_wyre()
+    wyre.sync_statuses([f"TF_{index}" for index in range(30)], **kwargs)
+
+    list_transfers_mock.assert_called_once_with(page_size=25, max_pages=max_pages)
@@ -1,6 +1,9 @@
+import threading
+import time
 from urllib.parse import urljoin
 
 import pytest
+import requests
 from django.conf import settings
 from rest_framework import status
 
@@ -182,3 +185,260 @@ def test_create_transfer_bad_request(mocker, make_wyre_api, make_transfer_data):
 
     wyre_request_mock.assert_called_once_with(url, json=data)
     assert wyre_request_mock.return_value.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_get_transfer_by_id_retries_rate_limited_requests(mocker, make_wyre_api):
+    transfer_id = "TF_WXP3YR7JJW8"
+    rate_limited = wyre_mocks.get_transfer_by_id_response(
+        transfer_id=transfer_id,
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        reason="Too Many Requests",
+    )
+    rate_limited.headers["Retry-After"] = "2"
+    unavailable = wyre_mocks.get_transfer_by_id_response(
+        transfer_id=transfer_id,
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        reason="Service Unavailable",
+    )
+    wyre_request_mock = mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        side_effect=[
+            rate_limited,
+            unavailable,
+            wyre_mocks.get_transfer_by_id_response(transfer_id=transfer_id),
+        ],
+    )
+    sleep_mock = mocker.patch("polaris_wyre.wyre.api.time.sleep")
+
+    wyre_api = make_wyre_api()
+    response_data = wyre_api.get_transfer_by_id(transfer_id=transfer_id)
+
+    assert response_data["id"] == transfer_id
+    assert wyre_request_mock.call_count == 3
+    assert sleep_mock.call_args_list[0] == mocker.call(2)
+    stats = wyre_api.retry_stats.snapshot()
+    assert stats["retries"] == 2
+    assert stats["retries_by_reason"] == {"429": 1, "503": 1}
+
+
+def test_get_account_gives_up_after_max_retries(mocker, make_wyre_api):
+    wyre_request_mock = mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        return_value=wyre_mocks.get_account_response(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            reason="Service Unavailable",
+        ),
+    )
+    mocker.patch("polaris_wyre.wyre.api.time.sleep")
+
+    wyre_api = make_wyre_api()
+    with pytest.raises(WyreAPIError, match="503 Error: Service Unavailable"):
+        wyre_api.get_account()
+
+    assert wyre_request_mock.call_count == wyre_api.retry_policy.max_retries + 1
+
+
+def test_create_transfer_is_not_retried_without_idempotency_key(
+    mocker, make_wyre_api, make_transfer_data
+):
+    transfer_data = make_transfer_data()
+    wyre_request_mock = mocker.patch(
+        REQUEST_METHOD_POST_MOCK,
+        return_value=wyre_mocks.create_transfer_response(
+            currency=transfer_data.currency,
+            amount=transfer_data.amount,
+            destination=transfer_data.destination,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            reason="Service Unavailable",
+        ),
+    )
+
+    wyre_api = make_wyre_api()
+    with pytest.raises(WyreAPIError):
+        wyre_api.create_transfer(transfer_data)
+
+    wyre_request_mock.assert_called_once()
+
+
+def test_create_transfer_with_idempotency_key_is_retried(
+    mocker, make_wyre_api, make_transfer_data
+):
+    transfer_data = make_transfer_data()
+    transfer_data.idempotency_key = "polaris:1234"
+    wyre_request_mock = mocker.patch(
+        REQUEST_METHOD_POST_MOCK,
+        side_effect=[
+            requests.ConnectionError(),
+            wyre_mocks.create_transfer_response(
+                currency=transfer_data.currency,
+                amount=transfer_data.amount,
+                destination=transfer_data.destination,
+            ),
+        ],
+    )
+    get_transfers_mock = mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        return_value=wyre_mocks.get_transfers_response(
+            transfers=[{"id": "TF_1", "customId": "polaris:1"}], total=1
+        ),
+    )
+    mocker.patch("polaris_wyre.wyre.api.time.sleep")
+
+    wyre_api = make_wyre_api()
+    wyre_api.create_transfer(transfer_data)
+
+    assert wyre_request_mock.call_count == 2
+    assert wyre_request_mock.call_args.kwargs["json"]["customId"] == "polaris:1234"
+    get_transfers_mock.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    "failure",
+    [requests.ConnectionError(), requests.Timeout()],
+)
+def test_create_transfer_is_not_retried_once_created(
+    mocker, make_wyre_api, make_transfer_data, failure
+):
+    transfer_data = make_transfer_data()
+    transfer_data.idempotency_key = "polaris:1234"
+    wyre_request_mock = mocker.patch(REQUEST_METHOD_POST_MOCK, side_effect=failure)
+    created = {"id": "TF_1", "customId": "polaris:1234", "status": "PENDING"}
+    mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        return_value=wyre_mocks.get_transfers_response(
+            transfers=[{"id": "TF_2", "customId": "polaris:5678"}, created],
+            total=2,
+        ),
+    )
+    mocker.patch("polaris_wyre.wyre.api.time.sleep")
+
+    wyre_api = make_wyre_api()
+    transfer = wyre_api.create_transfer(transfer_data)
+
+    assert transfer.id == "TF_1"
+    wyre_request_mock.assert_called_once()
+
+
+def test_list_transfers_is_paged_lazily(mocker, make_wyre_api):
+    transfers = [{"id": f"TF_{index}", "status": "PENDING"} for index in range(5)]
+    wyre_request_mock = mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        side_effect=[
+            wyre_mocks.get_transfers_response(transfers=transfers[:2], total=5),
+            wyre_mocks.get_transfers_response(transfers=transfers[2:4], total=5),
+            wyre_mocks.get_transfers_response(transfers=transfers[4:], total=5),
+        ],
+    )
+
+    wyre_api = make_wyre_api()
+    iterator = wyre_api.list_transfers(page_size=2)
+
+    assert next(iterator) == transfers[0]
+    assert wyre_request_mock.call_count == 1
+    assert [transfers[0]] + list(iterator) == transfers
+    assert wyre_request_mock.call_args_list == [
+        mocker.call(
+            urljoin(TEST_BASE_URL, "v3/transfers"),
+            params={"offset": offset, "limit": 2},
+        )
+        for offset in (0, 2, 4)
+    ]
+
+
+def test_list_transfers_max_pages(mocker, make_wyre_api):
+    wyre_request_mock = mocker.patch(
+        REQUEST_METHOD_GET_MOCK,
+        return_value=wyre_mocks.get_transfers_response(
+            transfers=[{"id": "TF_1"}, {"id": "TF_2"}], total=100
+        ),
+    )
+
+    wyre_api = make_wyre_api()
+
+    assert len(list(wyre_api.list_transfers(page_size=2, max_pages=3))) == 6
+    assert wyre_request_mock.call_count == 3
+
+
+def call_concurrently(mocker, wyre_api, call, response, callers: int = 4) -> list:
+    """
+    Makes ``callers`` calls while the first one's request is in flight.
+    """
+    started, release = threading.Event(), threading.Event()
+
+    def send(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return response
+
+    wyre_request_mock = mocker.patch(REQUEST_METHOD_GET_MOCK, side_effect=send)
+    outcomes = [None] * callers
+
+    def caller(index):
+        try:
+            outcomes[index] = call(wyre_api)
+        except Exception as exc:
+            outcomes[index] = exc
+
+    threads = [threading.Thread(target=caller, args=(i,)) for i in range(callers)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return wyre_request_mock, outcomes
+
+
+def test_identical_gets_are_coalesced(mocker, make_wyre_api):
+    wyre_request_mock, outcomes = call_concurrently(
+        mocker,
+        make_wyre_api(),
+        lambda wyre_api: wyre_api.get_transfer_by_id("TF_1"),
+        wyre_mocks.get_transfer_by_id_response(),
+    )
+
+    assert wyre_request_mock.call_count == 1
+    assert all(outcome == outcomes[0] for outcome in outcomes)
+    assert len({id(outcome) for outcome in outcomes}) == len(outcomes)
+
+
+def test_coalesced_gets_share_errors(mocker, make_wyre_api):
+    wyre_request_mock, outcomes = call_concurrently(
+        mocker,
+        make_wyre_api(),
+        lambda wyre_api: wyre_api.get_account(),
+        wyre_mocks.get_account_response(
+            status_code=status.HTTP_401_UNAUTHORIZED, reason="Unauthorized"
+        ),
+    )
+
+    assert wyre_request_mock.call_count == 1
+    assert all(isinstance(outcome, WyreAPIError) for outcome in outcomes)
+
+
+def test_coalescing_can_be_disabled(mocker, make_wyre_api):
+    wyre_api = make_wyre_api()
+    wyre_api.coalesce_requests = False
+    wyre_request_mock, _ = call_concurrently(
+        mocker,
+        wyre_api,
+        lambda wyre_api: wyre_api.get_account(),
+        wyre_mocks.get_account_response(),
+    )
+
+    assert wyre_request_mock.call_count == 4
+
+
+def test_different_gets_are_not_coalesced(mocker, make_wyre_api):
+    wyre_api = make_wyre_api()
+    ids = iter(range(4))
+    wyre_request_mock, _ = call_concurrently(
+        mocker,
+        wyre_api,
+        lambda wyre_api: wyre_api.get_transfer_by_id(f"TF_{next(ids)}"),
+        wyre_mocks.get_transfer_by_id_response(),
+    )
+
+    assert wyre_request_mock.call_count == 4
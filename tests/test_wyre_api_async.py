@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from django.conf import settings
+
+from polaris_wyre.helpers.exceptions import WyreAPIError
+from polaris_wyre.wyre.api_async import AsyncWyreAPI
+from .mocks import wyre as wyre_mocks
+
+
+def run_against(routes, coroutine_factory):
+    async def _run():
+        app = web.Application()
+        app.add_routes(routes)
+        async with TestServer(app) as server:
+            async with AsyncWyreAPI(
+                api_token=settings.WYRE_API_TOKEN,
+                account_id=settings.WYRE_ACCOUNT_ID,
+                api_url=str(server.make_url("/")),
+            ) as wyre_api:
+                return await coroutine_factory(wyre_api)
+
+    return asyncio.run(_run())
+
+
+def test_get_account_success():
+    async def get_account(request):
+        assert request.headers["Authorization"] == f"Bearer {settings.WYRE_API_TOKEN}"
+        return web.json_response(
+            wyre_mocks.get_account_data(account_id=settings.WYRE_ACCOUNT_ID)
+        )
+
+    response_data = run_against(
+        [web.get("/v2/account", get_account)],
+        lambda wyre_api: wyre_api.get_account(),
+    )
+
+    assert response_data["id"] == settings.WYRE_ACCOUNT_ID
+
+
+def test_get_transfer_by_id_unauthorized():
+    async def get_transfer(request):
+        return web.Response(status=401, text="denied")
+
+    with pytest.raises(WyreAPIError, match="401 Error: Unauthorized for url .*"):
+        run_against(
+            [web.get("/v3/transfers/{transfer_id}", get_transfer)],
+            lambda wyre_api: wyre_api.get_transfer_by_id("TF_WXP3YR7JJW8"),
+        )
+
+
+def test_create_transfer_success(make_transfer_data):
+    transfer_data = make_transfer_data()
+    received = {}
+
+    async def create_transfer(request):
+        received.update(await request.json())
+        return web.json_response({"id": "TF_GDQ844E2EZG", "status": "PENDING"})
+
+    response_data = run_against(
+        [web.post("/v3/transfers", create_transfer)],
+        lambda wyre_api: wyre_api.create_transfer(transfer_data),
+    )
+
+    assert response_data["id"] == "TF_GDQ844E2EZG"
+    assert received == {
+        "autoConfirm": True,
+        "source": f"account:{settings.WYRE_ACCOUNT_ID}",
+        "sourceCurrency": transfer_data.currency,
+        "sourceAmount": str(transfer_data.amount),
+        "dest": transfer_data.destination,
+        "destCurrency": transfer_data.currency,
+    }
+
+
+def test_create_transfer_is_not_retried_once_created(make_transfer_data):
+    transfer_data = make_transfer_data()
+    transfer_data.idempotency_key = "polaris:1234"
+    posts = []
+
+    async def create_transfer(request):
+        posts.append(await request.json())
+        return web.Response(status=503, text="unavailable")
+
+    async def get_transfers(request):
+        return web.json_response(
+            {"data": [{"id": "TF_1", "customId": "polaris:1234"}], "recordsTotal": 1}
+        )
+
+    transfer = run_against(
+        [
+            web.post("/v3/transfers", create_transfer),
+            web.get("/v3/transfers", get_transfers),
+        ],
+        lambda wyre_api: wyre_api.create_transfer(transfer_data),
+    )
+
+    assert transfer.id == "TF_1"
+    assert len(posts) == 1
+
+
+def test_list_transfers_stops_at_records_total():
+    offsets = []
+
+    async def get_transfers(request):
+        offset = int(request.query["offset"])
+        offsets.append(offset)
+        return web.json_response(
+            {
+                "data": [{"id": f"TF_{offset + index}"} for index in range(2)],
+                "recordsTotal": 4,
+            }
+        )
+
+    async def list_ids(wyre_api):
+        return [transfer.id async for transfer in wyre_api.list_transfers(page_size=2)]
+
+    transfer_ids = run_against([web.get("/v3/transfers", get_transfers)], list_ids)
+
+    assert transfer_ids == ["TF_0", "TF_1", "TF_2", "TF_3"]
+    assert offsets == [0, 2]
+
+
+def test_identical_gets_are_coalesced():
+    requests_received = []
+
+    async def get_transfer(request):
+        requests_received.append(request.match_info["transfer_id"])
+        await asyncio.sleep(0.05)
+        return web.json_response({"id": request.match_info["transfer_id"]})
+
+    async def get_transfers(wyre_api):
+        return await asyncio.gather(
+            *(wyre_api.get_transfer_by_id("TF_1") for _ in range(4)),
+            wyre_api.get_transfer_by_id("TF_2"),
+        )
+
+    responses = run_against(
+        [web.get("/v3/transfers/{transfer_id}", get_transfer)], get_transfers
+    )
+
+    assert sorted(requests_received) == ["TF_1", "TF_2"]
+    assert [response["id"] for response in responses] == ["TF_1"] * 4 + ["TF_2"]
+    assert len({id(response) for response in responses}) == 5
+
+
+def test_cancelled_waiter_does_not_cancel_coalesced_get():
+    async def get_account(request):
+        await asyncio.sleep(0.05)
+        return web.json_response({"id": "AC_1"})
+
+    async def get_accounts(wyre_api):
+        first = asyncio.ensure_future(wyre_api.get_account())
+        second = asyncio.ensure_future(wyre_api.get_account())
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    response_data = run_against([web.get("/v2/account", get_account)], get_accounts)
+
+    assert response_data == {"id": "AC_1"}
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from polaris_wyre.helpers.exceptions import WyreTransferTimeoutError
+from polaris_wyre.wyre import AsyncWyre
+from polaris_wyre.wyre.polling import PollingPolicy
+
+NO_DELAY_POLLING_POLICY = PollingPolicy(initial_delay=0, jitter=0, deadline=None)
+
+
+def test_get_account(mocker, make_wyre_xlm_address):
+    stellar_address, user_id = make_wyre_xlm_address.split(":")
+    mocker.patch(
+        "polaris_wyre.wyre.api_async.AsyncWyreAPI.get_account",
+        return_value={"depositAddresses": {"XLM": make_wyre_xlm_address}},
+    )
+
+    wyre = AsyncWyre()
+
+    assert asyncio.run(wyre.get_account()) == (stellar_address, user_id)
+
+
+def test_get_stellar_transaction_id_success(mocker):
+    mocker.patch(
+        "polaris_wyre.wyre.api_async.AsyncWyreAPI.get_transfer_by_id",
+        side_effect=[
+            {"status": "PENDING"},
+            {"status": "COMPLETED", "blockchainTx": {"networkTxId": "abc"}},
+        ],
+    )
+    poll_listener = mocker.Mock()
+
+    wyre = AsyncWyre(
+        polling_policy=NO_DELAY_POLLING_POLICY, poll_listener=poll_listener
+    )
+
+    assert asyncio.run(wyre.get_stellar_transaction_id("TF_ABC1234")) == "abc"
+    poll_listener.assert_called_once_with("TF_ABC1234", 2, mocker.ANY)
+
+
+def test_get_stellar_transaction_id_runtime_error(mocker):
+    mocker.patch(
+        "polaris_wyre.wyre.api_async.AsyncWyreAPI.get_transfer_by_id",
+        side_effect=[{"status": "PENDING"}, {"status": "FAILED"}],
+    )
+
+    wyre = AsyncWyre(polling_policy=NO_DELAY_POLLING_POLICY)
+
+    with pytest.raises(RuntimeError, match="Wyre failed to complete transfer"):
+        asyncio.run(wyre.get_stellar_transaction_id("TF_ABC1234"))
+
+
+def test_get_stellar_transaction_id_timeout(mocker):
+    mocker.patch(
+        "polaris_wyre.wyre.api_async.AsyncWyreAPI.get_transfer_by_id",
+        return_value={"status": "PENDING"},
+    )
+
+    wyre = AsyncWyre(
+        polling_policy=PollingPolicy(initial_delay=0.01, jitter=0, deadline=0.05)
+    )
+
+    with pytest.raises(WyreTransferTimeoutError):
+        asyncio.run(wyre.get_stellar_transaction_id("TF_ABC1234"))
+
+
+def test_create_transfer(mocker, make_transfer_data):
+    transfer_data = make_transfer_data()
+    wyre_api_mock = mocker.patch(
+        "polaris_wyre.wyre.api_async.AsyncWyreAPI.create_transfer",
+        return_value={"id": "TF_GDQ844E2EZG"},
+    )
+
+    wyre = AsyncWyre()
+
+    assert asyncio.run(wyre.create_transfer(transfer_data)) == "TF_GDQ844E2EZG"
+    wyre_api_mock.assert_called_once_with(transfer_data)
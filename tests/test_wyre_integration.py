@@ -1,7 +1,19 @@
+import pytest
+import requests
+from django.conf import settings
 from polaris.models import Asset, Transaction
 from rest_framework.request import Request
-from stellar_sdk.keypair import Keypair
 
+from polaris_wyre.helpers.exceptions import (
+    WyreTransferFailedError,
+    WyreTransferTimeoutError,
+)
+from polaris_wyre.models import WyreTransfer
+from polaris_wyre.wyre.instrumentation import InMemoryInstrumentation
+from polaris_wyre.wyre.integration import WyreIntegration
+from polaris_wyre.wyre.memo import MemoAllocator
+from polaris_wyre.wyre.polling import PollingPolicy
+from .conftest import NO_DELAY_POLLING_POLICY
 from .mocks import constants
 
 
@@ -47,23 +59,13 @@ def test_save_receiving_account_and_memo(
 
 
 def test_submit_deposit_transaction(
-    db, mocker, make_wyre_integration, make_transfer_data
+    db, mocker, make_wyre_integration, make_transfer_data, make_transaction
 ):
-    destination_address = Keypair.random().public_key
-    asset = mocker.Mock(spec=Asset)
-    transaction = mocker.Mock(spec=Transaction)
-
-    asset.code = "USDC"
-    asset.significant_decimals = 2
-
-    transaction.asset = asset
-    transaction.amount_in = 100
-    transaction.amount_fee = 3
-    transaction.to_address = destination_address
+    transaction = make_transaction()
 
     amount = round(
         transaction.amount_in - transaction.amount_fee,
-        asset.significant_decimals,
+        transaction.asset.significant_decimals,
     )
 
     transfer_data = make_transfer_data(
@@ -71,6 +73,7 @@ def test_submit_deposit_transaction(
         amount=amount,
         destination=f"stellar:{transaction.to_address}",
     )
+    transfer_data.idempotency_key = f"polaris:{transaction.id}"
 
     transfer_id = "TF_GDQ844E2EZG"
 
@@ -94,3 +97,647 @@ def test_submit_deposit_transaction(
     wyre_get_stellar_transaction_id_mock.assert_called_once_with(transfer_id)
 
     assert transaction_info == constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE
+
+
+def mock_horizon_transaction(mocker, response: dict):
+    server_mock = mocker.patch("polaris_wyre.wyre.horizon.Server")
+    server = server_mock.return_value
+    server.transactions.return_value.transaction.return_value.call.return_value = (
+        response
+    )
+    return server
+
+
+def test_submit_deposit_transaction_records_transfer(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    transaction = make_transaction()
+    network_tx_id = constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE["id"]
+
+    mocker.patch("polaris_wyre.wyre.Wyre.create_transfer", return_value="TF_1")
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=[
+            {"status": "PENDING"},
+            {"status": "COMPLETED", "blockchainTx": {"networkTxId": network_tx_id}},
+        ],
+    )
+    server = mock_horizon_transaction(
+        mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE
+    )
+
+    wyre_integration = make_wyre_integration()
+    transaction_info = wyre_integration.submit_deposit_transaction(transaction)
+
+    assert transaction_info == constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE
+    server.transactions.return_value.transaction.assert_called_once_with(network_tx_id)
+    wyre_transfer = WyreTransfer.objects.get(transfer_id="TF_1")
+    assert wyre_transfer.transaction_id == transaction.id
+    assert wyre_transfer.status == WyreTransfer.STATUS.COMPLETED
+    assert wyre_transfer.network_tx_id == network_tx_id
+    assert wyre_transfer.polls == 2
+    assert wyre_transfer.completed_at is not None
+
+
+def test_submit_deposit_transaction_records_failed_transfer(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    transaction = make_transaction()
+
+    mocker.patch("polaris_wyre.wyre.Wyre.create_transfer", return_value="TF_1")
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        return_value={"status": "FAILED"},
+    )
+
+    wyre_integration = make_wyre_integration()
+    with pytest.raises(RuntimeError):
+        wyre_integration.submit_deposit_transaction(transaction)
+
+    wyre_transfer = WyreTransfer.objects.get(transfer_id="TF_1")
+    assert wyre_transfer.status == WyreTransfer.STATUS.FAILED
+    assert wyre_transfer.polls == 1
+
+
+def test_submit_deposit_transaction_instrumentation(db, mocker, make_transaction):
+    instrumentation = InMemoryInstrumentation()
+    mocker.patch("polaris_wyre.wyre.Wyre.create_transfer", return_value="TF_1")
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=[{"status": "PENDING"}, {"status": "FAILED"}],
+    )
+
+    wyre_integration = WyreIntegration(
+        polling_policy=NO_DELAY_POLLING_POLICY, instrumentation=instrumentation
+    )
+    with pytest.raises(RuntimeError):
+        wyre_integration.submit_deposit_transaction(make_transaction())
+
+    assert instrumentation.polls.count == 1
+    assert instrumentation.polls.sum == 2
+    assert instrumentation.settle_durations["FAILED"].count == 1
+
+
+def test_submit_deposit_transaction_reuses_created_transfer(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    transaction = make_transaction()
+    WyreTransfer.objects.create(
+        transaction=transaction,
+        transfer_id="TF_1",
+        idempotency_key=f"polaris:{transaction.id}",
+    )
+
+    create_transfer_mock = mocker.patch("polaris_wyre.wyre.Wyre.create_transfer")
+    mocker.patch(
+        "polaris_wyre.wyre.Wyre.get_stellar_transaction_id", return_value="abc"
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = make_wyre_integration()
+    wyre_integration.submit_deposit_transaction(transaction)
+
+    create_transfer_mock.assert_not_called()
+    assert WyreTransfer.objects.get().network_tx_id == "abc"
+
+
+def test_submit_deposit_transaction_after_failed_transfer(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    transaction = make_transaction()
+    mocker.patch("polaris_wyre.wyre.Wyre.create_transfer", side_effect=["TF_1", "TF_2"])
+    mocker.patch(
+        "polaris_wyre.wyre.Wyre.get_stellar_transaction_id",
+        side_effect=[WyreTransferFailedError("TF_1"), "abc"],
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = make_wyre_integration()
+    with pytest.raises(WyreTransferFailedError):
+        wyre_integration.submit_deposit_transaction(transaction)
+    wyre_integration.submit_deposit_transaction(transaction)
+
+    assert WyreTransfer.objects.get(transfer_id="TF_1").idempotency_key is None
+    assert WyreTransfer.objects.get(transfer_id="TF_2").idempotency_key == (
+        f"polaris:{transaction.id}"
+    )
+
+
+def test_save_receiving_account_and_memo_with_memo_allocator(
+    db, mocker, make_wyre_integration, make_wyre_xlm_address, make_transaction
+):
+    stellar_account_address, user_id = make_wyre_xlm_address.split(":")
+    mocker.patch(
+        "polaris_wyre.wyre.Wyre.get_account",
+        return_value=(stellar_account_address, user_id),
+    )
+    transactions = [make_transaction(), make_transaction()]
+
+    wyre_integration = make_wyre_integration()
+    wyre_integration.memo_allocator = MemoAllocator()
+    for transaction in transactions:
+        wyre_integration.save_receiving_account_and_memo(
+            mocker.Mock(spec=Request), transaction
+        )
+
+    assert transactions[0].memo != transactions[1].memo
+    for transaction in transactions:
+        transaction.refresh_from_db()
+        assert transaction.receiving_anchor_account == stellar_account_address
+        assert MemoAllocator.get_transaction(transaction.memo) == transaction
+
+
+def transfer_id_for(transfer_data) -> str:
+    return "TF_" + transfer_data.idempotency_key.split(":")[1]
+
+
+def test_submit_deposit_transactions(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    transactions = [make_transaction() for _ in range(3)]
+    transfer_ids = [f"TF_{transaction.id}" for transaction in transactions]
+    network_tx_id = constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE["id"]
+
+    mocker.patch("polaris_wyre.wyre.Wyre.create_transfer", side_effect=transfer_id_for)
+    list_transfers_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.list_transfers",
+        side_effect=[
+            [{"id": transfer_id, "status": "PENDING"} for transfer_id in transfer_ids],
+            [
+                {
+                    "id": transfer_id,
+                    "status": "COMPLETED",
+                    "blockchainTx": {"networkTxId": network_tx_id},
+                }
+                for transfer_id in transfer_ids
+            ],
+        ],
+    )
+    get_transfer_mock = mocker.patch("polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id")
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = make_wyre_integration()
+    results = wyre_integration.submit_deposit_transactions(
+        transactions, max_concurrency=2
+    )
+
+    assert [result.transaction for result in results] == transactions
+    assert [result.transfer_id for result in results] == transfer_ids
+    assert all(result.succeeded for result in results)
+    assert all(
+        result.stellar_transaction == constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE
+        for result in results
+    )
+    assert list_transfers_mock.call_count == 2
+    get_transfer_mock.assert_not_called()
+    for wyre_transfer in WyreTransfer.objects.all():
+        assert wyre_transfer.status == WyreTransfer.STATUS.COMPLETED
+        assert wyre_transfer.network_tx_id == network_tx_id
+        assert wyre_transfer.polls == 2
+
+
+def test_submit_deposit_transactions_returns_errors(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    transactions = [make_transaction() for _ in range(3)]
+    error = RuntimeError("Wyre is down.")
+
+    def create_transfer(transfer_data):
+        if transfer_data.idempotency_key == f"polaris:{transactions[0].id}":
+            raise error
+        return transfer_id_for(transfer_data)
+
+    mocker.patch("polaris_wyre.wyre.Wyre.create_transfer", side_effect=create_transfer)
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.list_transfers",
+        return_value=[
+            {"id": f"TF_{transactions[1].id}", "status": "FAILED"},
+            {
+                "id": f"TF_{transactions[2].id}",
+                "status": "COMPLETED",
+                "blockchainTx": {"networkTxId": "abc"},
+            },
+        ],
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = make_wyre_integration()
+    failed, rejected, completed = wyre_integration.submit_deposit_transactions(
+        transactions
+    )
+
+    assert failed.error is error
+    assert failed.transfer_id is None
+    assert isinstance(rejected.error, RuntimeError)
+    assert rejected.stellar_transaction is None
+    assert completed.succeeded
+    assert WyreTransfer.objects.get(transfer_id=f"TF_{transactions[1].id}").status == (
+        WyreTransfer.STATUS.FAILED
+    )
+
+
+def test_submit_deposit_transactions_reuses_created_transfers(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    transaction = make_transaction()
+    WyreTransfer.objects.create(
+        transaction=transaction,
+        transfer_id="TF_1",
+        idempotency_key=f"polaris:{transaction.id}",
+    )
+
+    create_transfer_mock = mocker.patch("polaris_wyre.wyre.Wyre.create_transfer")
+    mocker.patch("polaris_wyre.wyre.api.WyreAPI.list_transfers", return_value=[])
+    get_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        return_value={"status": "COMPLETED", "blockchainTx": {"networkTxId": "abc"}},
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = make_wyre_integration()
+    (result,) = wyre_integration.submit_deposit_transactions([transaction])
+
+    assert result.succeeded
+    assert result.transfer_id == "TF_1"
+    create_transfer_mock.assert_not_called()
+    get_transfer_mock.assert_called_once_with("TF_1")
+
+
+def test_submit_deposit_transactions_skips_locked_transfers(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    from polaris_wyre.helpers.exceptions import WyreTransferInProgressError
+
+    locked, free = make_transaction(), make_transaction()
+    select_for_update_mock = mocker.patch.object(
+        WyreTransfer.objects,
+        "select_for_update",
+        return_value=WyreTransfer.objects.exclude(transaction=locked),
+    )
+    create_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.Wyre.create_transfer", return_value="TF_1"
+    )
+    mocker.patch("polaris_wyre.wyre.api.WyreAPI.list_transfers", return_value=[])
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        return_value={"status": "COMPLETED", "blockchainTx": {"networkTxId": "abc"}},
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = make_wyre_integration()
+    locked_result, free_result, repeated_result = (
+        wyre_integration.submit_deposit_transactions([locked, free, free])
+    )
+
+    select_for_update_mock.assert_called_once_with(skip_locked=True)
+    assert isinstance(locked_result.error, WyreTransferInProgressError)
+    assert free_result.succeeded
+    assert isinstance(repeated_result.error, WyreTransferInProgressError)
+    create_transfer_mock.assert_called_once()
+    assert WyreTransfer.objects.get(transaction=locked).transfer_id is None
+
+
+def test_submit_deposit_transactions_times_out(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    transaction = make_transaction()
+
+    mocker.patch("polaris_wyre.wyre.Wyre.create_transfer", return_value="TF_1")
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.list_transfers",
+        return_value=[{"id": "TF_1", "status": "PENDING"}],
+    )
+
+    wyre_integration = make_wyre_integration(
+        polling_policy=PollingPolicy(initial_delay=0, jitter=0, deadline=0.001)
+    )
+    (result,) = wyre_integration.submit_deposit_transactions([transaction])
+
+    assert isinstance(result.error, WyreTransferTimeoutError)
+    assert WyreTransfer.objects.get().status == WyreTransfer.STATUS.PENDING
+
+
+def test_submit_deposit_transactions_returns_status_errors(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    from polaris_wyre.helpers.exceptions import WyreAPIError
+
+    unavailable, completed = make_transaction(), make_transaction()
+    error = WyreAPIError("Wyre is down.")
+
+    def get_transfer_by_id(transfer_id):
+        if transfer_id == f"TF_{unavailable.id}":
+            raise error
+        return {
+            "id": transfer_id,
+            "status": "COMPLETED",
+            "blockchainTx": {"networkTxId": "abc"},
+        }
+
+    mocker.patch(
+        "polaris_wyre.wyre.Wyre.create_transfer",
+        side_effect=lambda transfer_data: transfer_id_for(transfer_data),
+    )
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.list_transfers",
+        side_effect=requests.ConnectionError("connection refused"),
+    )
+    get_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        side_effect=get_transfer_by_id,
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = make_wyre_integration(
+        polling_policy=PollingPolicy(initial_delay=0.01, jitter=0, deadline=0.02)
+    )
+    first, second = wyre_integration.submit_deposit_transactions(
+        [unavailable, completed]
+    )
+
+    assert first.error is error
+    assert first.transfer_id == f"TF_{unavailable.id}"
+    assert second.succeeded
+    assert get_transfer_mock.call_count > 2
+    assert WyreTransfer.objects.get(transfer_id=first.transfer_id).status == (
+        WyreTransfer.STATUS.PENDING
+    )
+
+
+def test_submit_deposit_transaction_with_deferred_settlement(
+    db, mocker, make_transaction
+):
+    from polaris.exceptions import TransactionSubmissionBlocked
+
+    transaction = make_transaction()
+    create_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.Wyre.create_transfer", return_value="TF_1"
+    )
+    get_transfer_mock = mocker.patch("polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id")
+
+    wyre_integration = WyreIntegration(
+        polling_policy=NO_DELAY_POLLING_POLICY, deferred_settlement=True
+    )
+    with pytest.raises(TransactionSubmissionBlocked):
+        wyre_integration.submit_deposit_transaction(transaction)
+    with pytest.raises(TransactionSubmissionBlocked):
+        wyre_integration.submit_deposit_transaction(transaction)
+
+    create_transfer_mock.assert_called_once()
+    get_transfer_mock.assert_not_called()
+    wyre_transfer = WyreTransfer.objects.get(transfer_id="TF_1")
+    assert wyre_transfer.status == WyreTransfer.STATUS.CREATED
+    assert wyre_transfer.next_poll_at is not None
+
+
+def test_submit_deposit_transaction_with_deferred_settlement_once_settled(
+    db, mocker, make_transaction
+):
+    transaction = make_transaction()
+    WyreTransfer.objects.create(
+        transaction=transaction,
+        transfer_id="TF_1",
+        idempotency_key=f"polaris:{transaction.id}",
+        status=WyreTransfer.STATUS.COMPLETED,
+        network_tx_id="abc",
+    )
+    server = mock_horizon_transaction(
+        mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE
+    )
+
+    wyre_integration = WyreIntegration(deferred_settlement=True)
+    transaction_info = wyre_integration.submit_deposit_transaction(transaction)
+
+    assert transaction_info == constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE
+    server.transactions.return_value.transaction.assert_called_once_with("abc")
+
+
+def test_submit_deposit_transactions_across_accounts(db, mocker, make_transaction):
+    from polaris_wyre.wyre.accounts import WyreAccount
+    from polaris_wyre.wyre.api import WyreAPI
+
+    created = {}
+
+    def create_transfer(api, transfer_data):
+        transfer_id = f"TF_{len(created)}"
+        created[transfer_id] = api.ACCOUNT_ID
+        return {"id": transfer_id}
+
+    def get_transfer_by_id(api, transfer_id):
+        assert created[transfer_id] == api.ACCOUNT_ID
+        return {"status": "COMPLETED", "blockchainTx": {"networkTxId": "abc"}}
+
+    mocker.patch.object(
+        WyreAPI, "create_transfer", autospec=True, side_effect=create_transfer
+    )
+    mocker.patch.object(
+        WyreAPI, "get_transfer_by_id", autospec=True, side_effect=get_transfer_by_id
+    )
+    mocker.patch.object(WyreAPI, "list_transfers", return_value=[])
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = WyreIntegration(
+        polling_policy=NO_DELAY_POLLING_POLICY,
+        accounts=[
+            WyreAccount(account_id="AC_1", api_token="token1"),
+            WyreAccount(account_id="AC_2", api_token="token2"),
+        ],
+    )
+    results = wyre_integration.submit_deposit_transactions(
+        [make_transaction() for _ in range(4)], max_concurrency=1
+    )
+
+    assert all(result.succeeded for result in results)
+    assert sorted(WyreTransfer.objects.values_list("account_id", flat=True)) == [
+        "AC_1",
+        "AC_1",
+        "AC_2",
+        "AC_2",
+    ]
+    for wyre_transfer in WyreTransfer.objects.all():
+        assert created[wyre_transfer.transfer_id] == wyre_transfer.account_id
+    assert wyre_integration.accounts.in_flight("AC_1") == 0
+
+
+def test_submit_deposit_transaction_with_balance_ledger(db, mocker, make_transaction):
+    from polaris.exceptions import TransactionSubmissionBlocked
+
+    from polaris_wyre.helpers.exceptions import WyreInsufficientBalanceError
+    from polaris_wyre.wyre.dtos import Account
+    from polaris_wyre.wyre.ledger import BalanceLedger
+
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_account",
+        return_value=Account({"id": "AC_1", "availableBalances": {"USDC": 150}}),
+    )
+    create_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.Wyre.create_transfer", return_value="TF_1"
+    )
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_transfer_by_id",
+        return_value={"status": "FAILED"},
+    )
+    ledger = BalanceLedger()
+    wyre_integration = WyreIntegration(
+        account_id="AC_1",
+        polling_policy=NO_DELAY_POLLING_POLICY,
+        balance_ledger=ledger,
+    )
+
+    with pytest.raises(RuntimeError):
+        wyre_integration.submit_deposit_transaction(make_transaction())
+    assert ledger.available("AC_1", "USDC") == 150
+
+    create_transfer_mock.side_effect = ["TF_2", "TF_3"]
+    mocker.patch(
+        "polaris_wyre.wyre.Wyre.get_stellar_transaction_id", return_value="abc"
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+    wyre_integration.submit_deposit_transaction(make_transaction())
+    assert ledger.available("AC_1", "USDC") == 53
+
+    with pytest.raises(WyreInsufficientBalanceError):
+        wyre_integration.submit_deposit_transaction(make_transaction())
+    ledger.defer_overdrafts = True
+    with pytest.raises(TransactionSubmissionBlocked):
+        wyre_integration.submit_deposit_transaction(make_transaction())
+
+    assert create_transfer_mock.call_count == 2
+    assert not WyreTransfer.objects.filter(transfer_id=None).exists()
+
+
+def test_submit_deposit_transaction_refunds_only_created_transfers(
+    db, mocker, make_transaction
+):
+    from polaris_wyre.wyre.dtos import Account
+    from polaris_wyre.wyre.ledger import BalanceLedger
+
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_account",
+        return_value=Account({"id": "AC_1", "availableBalances": {"USDC": 150}}),
+    )
+    mocker.patch(
+        "polaris_wyre.wyre.Wyre.get_stellar_transaction_id",
+        side_effect=WyreTransferFailedError("TF_1"),
+    )
+    transaction = make_transaction()
+    WyreTransfer.objects.create(
+        transaction=transaction,
+        transfer_id="TF_1",
+        account_id="AC_1",
+        idempotency_key=f"polaris:{transaction.id}",
+    )
+    ledger = BalanceLedger()
+    wyre_integration = WyreIntegration(
+        account_id="AC_1",
+        polling_policy=NO_DELAY_POLLING_POLICY,
+        balance_ledger=ledger,
+    )
+
+    with pytest.raises(WyreTransferFailedError):
+        wyre_integration.submit_deposit_transaction(transaction)
+
+    assert ledger.available("AC_1", "USDC") == 150
+    assert WyreTransfer.objects.get().status == WyreTransfer.STATUS.FAILED
+
+
+def test_submit_deposit_transactions_blocks_overdrafts(db, mocker, make_transaction):
+    from polaris.exceptions import TransactionSubmissionBlocked
+
+    from polaris_wyre.wyre.dtos import Account
+    from polaris_wyre.wyre.ledger import BalanceLedger
+
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.get_account",
+        return_value=Account({"id": "AC_1", "availableBalances": {"USDC": 50}}),
+    )
+    create_transfer_mock = mocker.patch("polaris_wyre.wyre.Wyre.create_transfer")
+    wyre_integration = WyreIntegration(
+        account_id="AC_1",
+        polling_policy=NO_DELAY_POLLING_POLICY,
+        balance_ledger=BalanceLedger(defer_overdrafts=True),
+    )
+
+    (result,) = wyre_integration.submit_deposit_transactions([make_transaction()])
+
+    assert isinstance(result.error, TransactionSubmissionBlocked)
+    create_transfer_mock.assert_not_called()
+
+
+def test_submit_deposit_transaction_finds_transfer_of_lost_response(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    from polaris_wyre.wyre.dtos import Transfer
+
+    transaction = make_transaction()
+    create_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.Wyre.create_transfer",
+        side_effect=requests.Timeout("read timed out"),
+    )
+    find_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.find_transfer", return_value=None
+    )
+    mocker.patch(
+        "polaris_wyre.wyre.Wyre.get_stellar_transaction_id", return_value="abc"
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+    wyre_integration = make_wyre_integration()
+
+    with pytest.raises(requests.Timeout):
+        wyre_integration.submit_deposit_transaction(transaction)
+
+    find_transfer_mock.assert_not_called()
+    wyre_transfer = WyreTransfer.objects.get()
+    assert wyre_transfer.transfer_id is None
+    assert wyre_transfer.account_id == wyre_integration.wyre.wyre_api.ACCOUNT_ID
+
+    find_transfer_mock.return_value = Transfer({"id": "TF_1"})
+    wyre_integration.submit_deposit_transaction(transaction)
+
+    find_transfer_mock.assert_called_once_with(f"polaris:{transaction.id}")
+    create_transfer_mock.assert_called_once()
+    assert WyreTransfer.objects.get().transfer_id == "TF_1"
+
+
+def test_submit_deposit_transactions_finds_transfers_of_lost_responses(
+    db, mocker, make_wyre_integration, make_transaction
+):
+    from polaris_wyre.wyre.dtos import Transfer
+
+    attempted, lost = make_transaction(), make_transaction()
+    for transaction in (attempted, lost):
+        WyreTransfer.objects.create(
+            transaction=transaction,
+            account_id=settings.WYRE_ACCOUNT_ID,
+            idempotency_key=f"polaris:{transaction.id}",
+        )
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.find_transfer",
+        side_effect=lambda key: (
+            Transfer({"id": f"TF_{lost.id}"}) if key == f"polaris:{lost.id}" else None
+        ),
+    )
+    create_transfer_mock = mocker.patch(
+        "polaris_wyre.wyre.Wyre.create_transfer",
+        side_effect=lambda transfer_data: transfer_id_for(transfer_data),
+    )
+    mocker.patch(
+        "polaris_wyre.wyre.api.WyreAPI.list_transfers",
+        return_value=[
+            {
+                "id": f"TF_{transaction.id}",
+                "status": "COMPLETED",
+                "blockchainTx": {"networkTxId": "abc"},
+            }
+            for transaction in (attempted, lost)
+        ],
+    )
+    mock_horizon_transaction(mocker, constants.STELLAR_TRANSACTION_SUCCESS_RESPONSE)
+
+    wyre_integration = make_wyre_integration()
+    results = wyre_integration.submit_deposit_transactions([attempted, lost])
+
+    assert all(result.succeeded for result in results)
+    create_transfer_mock.assert_called_once()
+    (transfer_data,), _ = create_transfer_mock.call_args
+    assert transfer_data.idempotency_key == f"polaris:{attempted.id}"
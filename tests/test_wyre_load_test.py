@@ -0,0 +1,57 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from polaris.models import Transaction
+
+from polaris_wyre.models import WyreTransfer
+
+
+def test_wyre_load_test(transactional_db, tmp_path):
+    output = tmp_path / "report.json"
+    stdout = StringIO()
+
+    call_command(
+        "wyre_load_test",
+        "--fake",
+        "--deposits=3",
+        "--concurrency=1",
+        "--completion-delay=0",
+        "--poll-interval=0.01",
+        f"--output={output}",
+        stdout=stdout,
+    )
+
+    report = json.loads(output.read_text())
+    assert report["operations"] == 3
+    assert report["errors"] == 0
+    # A transfer is created and polled once per deposit.
+    assert report["wyre_requests_per_deposit"] == 2
+    assert "Submitted 3 deposits" in stdout.getvalue()
+    assert report["requests"]["GET horizon.get_transaction"]["outcomes"] == {"200": 3}
+    assert not Transaction.objects.exists()
+    assert not WyreTransfer.objects.exists()
+
+
+def test_wyre_load_test_keeps_transactions(transactional_db):
+    call_command(
+        "wyre_load_test",
+        "--fake",
+        "--deposits=2",
+        "--concurrency=1",
+        "--completion-delay=0",
+        "--rate=100",
+        "--keep",
+        stdout=StringIO(),
+    )
+
+    assert (
+        WyreTransfer.objects.filter(status=WyreTransfer.STATUS.COMPLETED).count() == 2
+    )
+    assert Transaction.objects.count() == 2
+
+
+def test_wyre_load_test_rejects_invalid_options(db):
+    with pytest.raises(CommandError):
+        call_command("wyre_load_test", "--deposits=0", stdout=StringIO())